@@ -0,0 +1,79 @@
+from dataclasses import dataclass
+
+from django.contrib.auth.models import AbstractBaseUser, AnonymousUser
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import RoleName, Siteadmin, User, user_namespace
+from .utils.versioned_cache import (
+    CacheKey,
+    invalidate_namespaces,
+    invalidate_namespaces_now_and_on_commit,
+)
+
+# Shared by the processes, so this only bounds a write that didn't go through a model signal
+AUTHORIZATION_CONTEXT_TIMEOUT_SECONDS = 300
+
+
+@dataclass(frozen=True, slots=True)
+class AuthorizationContext:
+    """What a user is allowed to do, loaded once and answered in O(1)."""
+
+    role_name: str | None
+    admin_site_ids: frozenset[int]
+
+    @property
+    def is_mega_admin(self):
+        return self.role_name == RoleName.MegaAdmin
+
+    @property
+    def is_forest_steward(self):
+        return self.role_name == RoleName.ForestSteward
+
+    def is_site_admin(self, site_id: int) -> bool:
+        return self.is_mega_admin or site_id in self.admin_site_ids
+
+
+ANONYMOUS_CONTEXT = AuthorizationContext(role_name=None, admin_site_ids=frozenset())
+
+
+def authorization_context_key(user_id: int) -> CacheKey[AuthorizationContext]:
+    return CacheKey(
+        user_namespace(user_id), "authorization_context", AUTHORIZATION_CONTEXT_TIMEOUT_SECONDS
+    )
+
+
+def load_authorization_context(user_id: int):
+    # Not the role of the request's user, which may come from another process' cache
+    return AuthorizationContext(
+        role_name=User.objects.values_list("role__name", flat=True).get(pk=user_id),
+        admin_site_ids=frozenset(
+            Siteadmin.objects.filter(user_id=user_id).values_list("site_id", flat=True)
+        ),
+    )
+
+
+def get_authorization_context(
+    user: AbstractBaseUser | AnonymousUser | None,
+) -> AuthorizationContext:
+    """The authorization context of the user, cached per user id in the shared cache."""
+    if not isinstance(user, User):
+        return ANONYMOUS_CONTEXT
+    return authorization_context_key(user.pk).get_or_set(
+        lambda: load_authorization_context(user.pk)
+    )
+
+
+def invalidate_authorization_context(user_id: int):
+    invalidate_namespaces(user_namespace(user_id))
+
+
+# Also sent for queryset deletes and cascades, unlike Model.delete overrides
+@receiver((post_save, post_delete), sender=Siteadmin)
+def _on_siteadmin_change(instance: Siteadmin, **_kwargs):
+    invalidate_namespaces_now_and_on_commit(user_namespace(instance.user_id))
+
+
+@receiver((post_save, post_delete), sender=User)
+def _on_user_change(instance: User, **_kwargs):
+    invalidate_namespaces_now_and_on_commit(user_namespace(instance.pk))
@@ -0,0 +1,28 @@
+from datetime import timedelta
+from typing import override
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from canopeum_backend.models import ChunkedUpload
+from canopeum_backend.settings import UPLOAD_EXPIRY_HOURS
+
+
+class Command(BaseCommand):
+    help = (
+        f"Delete the uploads started more than {UPLOAD_EXPIRY_HOURS} hours ago "
+        + "that were never completed or attached to a post, along with their stored chunks"
+    )
+
+    @override
+    def handle(self, *args, **kwargs):
+        expired_at = timezone.now() - timedelta(hours=UPLOAD_EXPIRY_HOURS)
+        # Uploads are deleted once attached to a post, the remaining ones are unused
+        stale_uploads = ChunkedUpload.objects.filter(created_at__lt=expired_at).select_related(
+            "asset"
+        )
+        deleted_count = 0
+        for upload in stale_uploads.iterator():
+            upload.cancel()
+            deleted_count += 1
+        self.stdout.write(self.style.SUCCESS(f"{deleted_count} stale upload(s) deleted"))
@@ -0,0 +1,26 @@
+from typing import override
+
+from django.core.management.base import BaseCommand
+
+from canopeum_backend.models import Coordinate, bump_coordinate_versions
+from canopeum_backend.utils.geocoding_service import PENDING_ADDRESS, geocoding_service
+
+
+class Command(BaseCommand):
+    help = "Geocode the coordinates left pending, for instance when a restart lost the worker queue"
+
+    @override
+    def handle(self, *args, **kwargs):
+        pending_coordinates = Coordinate.objects.filter(
+            address=PENDING_ADDRESS, dd_latitude__isnull=False, dd_longitude__isnull=False
+        ).values_list("pk", "dd_latitude", "dd_longitude")
+        filled_count = 0
+        for pk, dd_latitude, dd_longitude in pending_coordinates:
+            # Already filtered out, but values_list doesn't narrow the nullable fields
+            if dd_latitude is None or dd_longitude is None:
+                continue
+            address = geocoding_service.reverse_geocode(dd_latitude, dd_longitude)
+            if Coordinate.objects.filter(pk=pk, address=PENDING_ADDRESS).update(address=address):
+                bump_coordinate_versions(pk)
+                filled_count += 1
+        self.stdout.write(self.style.SUCCESS(f"{filled_count} pending address(es) filled"))
@@ -0,0 +1,35 @@
+from typing import override
+
+from django.core.management.base import BaseCommand
+
+from canopeum_backend.models import Asset, bump_asset_versions
+from canopeum_backend.utils.image_variant_service import image_variant_service
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the downsized variants of the images missing them, "
+        + "for instance those uploaded before variants existed"
+    )
+
+    @override
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all", action="store_true", help="Generate them again for every image"
+        )
+
+    @override
+    def handle(self, *args, **kwargs):
+        assets = Asset.objects.all() if kwargs["all"] else Asset.objects.filter(variant_widths=[])
+        generated_count = 0
+        # Assets may share their stored file
+        for name in assets.values_list("asset", flat=True).distinct():
+            try:
+                widths = image_variant_service.generate(name)
+            except OSError as error:
+                self.stderr.write(f"Skipped {name}: {error}")
+                continue
+            if widths and Asset.objects.filter(asset=name).update(variant_widths=widths):
+                bump_asset_versions(name)
+                generated_count += 1
+        self.stdout.write(self.style.SUCCESS(f"Variants of {generated_count} image(s) generated"))
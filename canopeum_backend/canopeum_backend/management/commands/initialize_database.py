@@ -1,30 +1,39 @@
 # flake8: noqa: S311 -- Accept random int generation for database seeding
 
 import random
-from collections.abc import Iterable
+import time
+from collections import Counter
+from collections.abc import Callable, Iterable, Sequence
 from datetime import timedelta
 from pathlib import Path
-from typing import override
+from typing import TypeVar, override
 
+from django.contrib.auth.hashers import make_password
 from django.core.files import File
+from django.core.files.storage import default_storage
 from django.core.management import call_command
-from django.core.management.base import BaseCommand
-from django.db import ProgrammingError, connection
+from django.core.management.base import BaseCommand, CommandError
+from django.db import ProgrammingError, connection, transaction
+from django.db.models import Max, Model
 from django.utils import timezone
 
 import canopeum_backend.settings
 from canopeum_backend.models import (
     Announcement,
     Asset,
+    AssetBlob,
     Batch,
     Batchfertilizer,
+    Batchmulchlayer,
     BatchSpecies,
     BatchSponsor,
+    ChunkedUpload,
     Comment,
     Contact,
     Coordinate,
     Fertilizertype,
     Internationalization,
+    Like,
     Mulchlayertype,
     Post,
     Role,
@@ -36,10 +45,15 @@ from canopeum_backend.models import (
     Treetype,
     User,
 )
+from canopeum_backend.utils.content_addressed_storage import content_addressed_name, store_blob
+from canopeum_backend.utils.image_variant_service import image_variant_service
 
 seeding_images_path = (
     Path(canopeum_backend.settings.BASE_DIR) / "canopeum_backend" / "seeding" / "images"
 )
+site_image_file_names = ("site_img1.png", "site_img2.jpg", "site_img3.jpg", "site_img4.jpg")
+post_image_file_names = ("canopeum_post_img1.jpg", "canopeum_post_img2.jpg")
+batch_logo_file_names = tuple(f"batch_logo{i}.png" for i in range(1, 8))
 
 tree_type_names = (
     ("Balsam Fir", "Sapin baumier"),
@@ -254,20 +268,23 @@ sponsor_names = [
 ]
 
 
-def create_sponsor_for_batch():
-    image_file_name = f"batch_logo{random.randint(1, 7)}.png"
+def save_seeding_image(file_name: str):
+    """Store a seeding image once, any number of assets can then share its stored name."""
+    with Path.open(seeding_images_path / file_name, "rb") as img_file:
+        image = File(img_file, file_name)
+        name = content_addressed_name(image)
+        # Identical to what a previous run stored, and to an upload of the same image
+        store_blob(default_storage, name, image)
+        return name
 
-    with Path.open(seeding_images_path / image_file_name, "rb") as img_file:
-        django_file = File(img_file)
 
-        asset = Asset()
-        asset.asset.save(image_file_name, django_file, save=True)
-
-        return BatchSponsor.objects.create(
-            name=sponsor_names.pop(random.randint(0, len(sponsor_names) - 1)),
-            url="https://uilogos.co/",
-            logo=asset,
-        )
+def create_sponsor_for_batch(logo_names: Sequence[str]):
+    return BatchSponsor.objects.create(
+        name=sponsor_names.pop(random.randint(0, len(sponsor_names) - 1)),
+        url="https://uilogos.co/",
+        # Share the stored logos rather than writing a copy of the file for every batch
+        logo=Asset.objects.create(asset=random.choice(logo_names)),
+    )
 
 
 def create_species_for_site(site: Site, batches: Iterable[Batch]):
@@ -290,14 +307,14 @@ def create_species_for_site(site: Site, batches: Iterable[Batch]):
                 already_added_tree_type[batch_specie.tree_type.pk] = site_tree_specie
 
 
-def create_batches_for_site(site):
+def create_batches_for_site(site, logo_names: Sequence[str]):
     num_batches = random.randint(3, 8)
     for i in range(num_batches):
         number_of_seed = random.randint(50, 200)
         survived_count = random.randint(100, 200)
         replace_count = random.randint(0, 50)
 
-        sponsor = create_sponsor_for_batch()
+        sponsor = create_sponsor_for_batch(logo_names)
 
         batch = Batch.objects.create(
             name=batch_names[i - 1],
@@ -319,51 +336,351 @@ def create_batches_for_site(site):
         yield batch
 
 
+def to_dms(decimal_degrees: float, positive_hemisphere: str, negative_hemisphere: str):
+    hemisphere = positive_hemisphere if decimal_degrees >= 0 else negative_hemisphere
+    degrees, remaining_seconds = divmod(round(abs(decimal_degrees) * 3600, 1), 3600)
+    minutes, seconds = divmod(remaining_seconds, 60)
+    return f"{int(degrees)}°{int(minutes):02d}'{seconds:04.1f}\"{hemisphere}"
+
+
+synthetic_site_names = (
+    ("Maple", "Cedar", "Birch", "Oak", "Pine", "Willow", "Spruce", "Elm"),
+    ("Grove", "Ridge", "Trail", "Park", "Valley", "Meadow", "Hollow", "Woods"),
+)
+
+synthetic_comment_bodies = (
+    "Wow, I'm very excited to join the team!",
+    "Thanks for helping our planet!",
+    "Beautiful work everyone!",
+    "Can't wait for the next planting day.",
+    "How can I volunteer?",
+)
+
+M = TypeVar("M", bound=Model)
+
+
+class SyntheticDataGenerator:
+    """
+    Generates load-test sized data on top of the reference data, with chunked `bulk_create`.
+
+    Primary keys are assigned upfront since MySQL can't return those of bulk inserted rows,
+    so this must be the only writer, as when seeding a fresh database.
+    """
+
+    def __init__(  # noqa: PLR0913 # One argument per cardinality
+        self,
+        *,
+        sites: int,
+        batches_per_site: int,
+        species_per_batch: int,
+        posts_per_site: int,
+        likes_per_post: int,
+        comments_per_post: int,
+        users: int,
+        chunk_size: int,
+    ):
+        if likes_per_post > users:
+            raise CommandError(f"Can't give {likes_per_post} likes per post with {users} users")
+        if comments_per_post and not users:
+            raise CommandError("Comments need at least one user to write them")
+        self.sites = sites
+        self.batches_per_site = batches_per_site
+        self.species_per_batch = species_per_batch
+        self.posts_per_site = posts_per_site
+        self.likes_per_post = likes_per_post
+        self.comments_per_post = comments_per_post
+        self.users = users
+        self.chunk_size = chunk_size
+        self.next_pks: dict[type[Model], int] = {}
+        self.row_counts = Counter[str]()
+
+    def insert(self, model: type[M], rows: list[M]):
+        manager = model._default_manager  # noqa: SLF001 # Public API despite the underscore
+        if model not in self.next_pks:
+            max_pk = manager.aggregate(max_pk=Max("pk"))["max_pk"]
+            self.next_pks[model] = (max_pk or 0) + 1
+        for pk, row in enumerate(rows, start=self.next_pks[model]):
+            row.pk = pk
+        self.next_pks[model] += len(rows)
+        manager.bulk_create(rows, batch_size=self.chunk_size)
+        self.row_counts[model.__name__] += len(rows)
+        return rows
+
+    def generate(self, on_progress: Callable[[int], None] | None = None):
+        self.site_type_ids = list(Sitetype.objects.values_list("pk", flat=True))
+        self.tree_type_ids = list(Treetype.objects.values_list("pk", flat=True))
+        self.fertilizer_type_ids = list(Fertilizertype.objects.values_list("pk", flat=True))
+        self.mulch_layer_type_ids = list(Mulchlayertype.objects.values_list("pk", flat=True))
+        self.site_image_names = [save_seeding_image(name) for name in site_image_file_names]
+        self.logo_names = [save_seeding_image(name) for name in batch_logo_file_names]
+        self.user_ids = self.create_users()
+
+        # Sized so that the largest table of a group gets about one chunk of rows
+        largest_table_rows_per_site = max(
+            self.batches_per_site * self.species_per_batch,
+            self.posts_per_site * max(self.likes_per_post, self.comments_per_post, 1),
+            1,
+        )
+        sites_per_group = max(self.chunk_size // largest_table_rows_per_site, 1)
+        generated_site_count = 0
+        while generated_site_count < self.sites:
+            group_size = min(sites_per_group, self.sites - generated_site_count)
+            with transaction.atomic():
+                self.create_site_group(group_size)
+            generated_site_count += group_size
+            if on_progress:
+                on_progress(generated_site_count)
+        # Bulk creation skips the references that Asset counts on save
+        AssetBlob.count_references()
+        return self.row_counts
+
+    def create_users(self):
+        # Hashing is what makes creating users slow, they all share the same password
+        password = make_password("password")  # MOCK_PASSWORD
+        role = Role.objects.get(name=RoleName.User)
+        users = self.insert(
+            User,
+            [
+                User(
+                    username=f"user{n}",
+                    email=f"user{n}@example.com",
+                    password=password,
+                    role=role,
+                )
+                for n in range(1, self.users + 1)
+            ],
+        )
+        return [user.pk for user in users]
+
+    def create_site_group(self, site_count: int):
+        coordinates = self.insert(Coordinate, [self.random_coordinate() for _ in range(site_count)])
+        sites = self.insert(
+            Site,
+            [
+                Site(
+                    name=" ".join(random.choice(names) for names in synthetic_site_names),
+                    is_public=random.random() < 0.8,  # noqa: PLR2004
+                    site_type_id=random.choice(self.site_type_ids),
+                    coordinate=coordinate,
+                    description="A synthetic site generated for load testing",
+                    size=str(random.randint(100, 2000)),
+                    research_partnership=random.choice((True, False)),
+                    visible_map=True,
+                    visitor_count=random.randint(0, 500),
+                    contact=contact,
+                    announcement=announcement,
+                    image=image,
+                )
+                for coordinate, contact, announcement, image in zip(
+                    coordinates,
+                    self.insert(
+                        Contact,
+                        [Contact(email="contact@example.com") for _ in range(site_count)],
+                    ),
+                    self.insert(
+                        Announcement,
+                        [Announcement(body="Planting day on Saturday") for _ in range(site_count)],
+                    ),
+                    self.insert(
+                        Asset,
+                        [
+                            Asset(asset=random.choice(self.site_image_names))
+                            for _ in range(site_count)
+                        ],
+                    ),
+                    strict=True,
+                )
+            ],
+        )
+        self.create_batches(sites)
+        self.create_posts(sites)
+
+    def random_coordinate(self):
+        # Somewhere in southern Quebec
+        dd_latitude = round(random.uniform(45, 49), 6)
+        dd_longitude = round(random.uniform(-79, -64), 6)
+        return Coordinate(
+            dms_latitude=to_dms(dd_latitude, "N", "S"),
+            dms_longitude=to_dms(dd_longitude, "E", "W"),
+            dd_latitude=dd_latitude,
+            dd_longitude=dd_longitude,
+            address=f"{random.randint(1, 9999)} Forest Trail, QC",
+        )
+
+    def create_batches(self, sites: list[Site]):
+        batch_sites = [site for site in sites for _ in range(self.batches_per_site)]
+        logos = self.insert(
+            Asset, [Asset(asset=random.choice(self.logo_names)) for _ in batch_sites]
+        )
+        sponsors = self.insert(
+            BatchSponsor,
+            [
+                BatchSponsor(
+                    name=random.choice(sponsor_names), url="https://uilogos.co/", logo=logo
+                )
+                for logo in logos
+            ],
+        )
+        batches = self.insert(
+            Batch,
+            [
+                Batch(
+                    name=batch_names[i % self.batches_per_site % len(batch_names)],
+                    site=site,
+                    size=random.randint(20, 150),
+                    sponsor=sponsor,
+                    soil_condition="Good",
+                    survived_count=random.randint(100, 200),
+                    replace_count=random.randint(0, 50),
+                    total_propagation=random.randint(0, 50),
+                )
+                for i, (site, sponsor) in enumerate(zip(batch_sites, sponsors, strict=True))
+            ],
+        )
+
+        batch_species = self.insert(
+            BatchSpecies,
+            [
+                BatchSpecies(
+                    batch=batch, tree_type_id=tree_type_id, quantity=random.randint(1, 100)
+                )
+                for batch in batches
+                for tree_type_id in random.sample(
+                    self.tree_type_ids, min(self.species_per_batch, len(self.tree_type_ids))
+                )
+            ],
+        )
+        if self.fertilizer_type_ids:
+            self.insert(
+                Batchfertilizer,
+                [
+                    Batchfertilizer(
+                        batch=batch, fertilizer_type_id=random.choice(self.fertilizer_type_ids)
+                    )
+                    for batch in batches
+                ],
+            )
+        if self.mulch_layer_type_ids:
+            self.insert(
+                Batchmulchlayer,
+                [
+                    Batchmulchlayer(
+                        batch=batch, mulch_layer_type_id=random.choice(self.mulch_layer_type_ids)
+                    )
+                    for batch in batches
+                ],
+            )
+
+        # Like create_species_for_site, sites have a bit more than their batches
+        site_quantities = Counter[tuple[int, int]]()
+        for species in batch_species:
+            site_quantities[species.batch.site_id, species.tree_type_id] += species.quantity
+        self.insert(
+            Sitetreespecies,
+            [
+                Sitetreespecies(
+                    site_id=site_id,
+                    tree_type_id=tree_type_id,
+                    quantity=quantity + random.randint(0, 50),
+                )
+                for (site_id, tree_type_id), quantity in site_quantities.items()
+            ],
+        )
+
+    def create_posts(self, sites: list[Site]):
+        posts = self.insert(
+            Post,
+            [
+                Post(
+                    site=site,
+                    body=f"{site.name} has planted {random.randint(100, 1000)} new trees today. "
+                    + "Let's continue to grow our forest!",
+                    # Bulk creation skips the counters that Like and Comment maintain on save
+                    like_count=self.likes_per_post,
+                    comment_count=self.comments_per_post,
+                )
+                for site in sites
+                for _ in range(self.posts_per_site)
+            ],
+        )
+        self.insert(
+            Like,
+            [
+                Like(user_id=user_id, post=post)
+                for post in posts
+                for user_id in random.sample(self.user_ids, self.likes_per_post)
+            ],
+        )
+        self.insert(
+            Comment,
+            [
+                Comment(
+                    body=random.choice(synthetic_comment_bodies),
+                    user_id=random.choice(self.user_ids),
+                    post=post,
+                )
+                for post in posts
+                for _ in range(self.comments_per_post)
+            ],
+        )
+
+
 class Command(BaseCommand):
     help = "Generate Data for the database"
+    assets: dict[str, Asset]
+
+    @override
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--noinput",
+            "--no-input",
+            action="store_false",
+            dest="interactive",
+            help="Erase the existing data without asking for confirmation",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            help="Seed the random generation, so the same seed generates the same data",
+        )
+        generator = parser.add_argument_group(
+            "synthetic data",
+            "Generate sites in bulk instead of the handful of demo sites, for load testing",
+        )
+        generator.add_argument("--sites", type=int, help="Number of sites to generate")
+        generator.add_argument("--batches-per-site", type=int, default=5)
+        generator.add_argument("--species-per-batch", type=int, default=4)
+        generator.add_argument("--posts-per-site", type=int, default=10)
+        generator.add_argument("--likes-per-post", type=int, default=3)
+        generator.add_argument("--comments-per-post", type=int, default=2)
+        generator.add_argument(
+            "--users", type=int, default=100, help="Number of users liking and commenting posts"
+        )
+        generator.add_argument(
+            "--chunk-size", type=int, default=1000, help="Number of rows per bulk insert"
+        )
 
     @override
     def handle(self, *args, **kwargs):
-        self.stdout.write("Are you sure you want to erase all existing data and generate new data?")
-        self.stdout.write("This operation is irreversible and will erase all existing data")
-        self.stdout.write("Type 'yes' to continue, or 'no' to cancel")
-        response = input()
-        if response != "yes":
-            self.stdout.write(self.style.ERROR("Operation cancelled"))
-            return
-        with connection.cursor() as cursor:
-            if cursor.execute("SHOW TABLES;") != 0:
-                self.stdout.write("Erasing existing data...")
-                assets_to_delete = Asset.objects.all()
-                try:
-                    for asset in assets_to_delete:
-                        path = (
-                            Path(canopeum_backend.settings.BASE_DIR)
-                            / "canopeum_backend"
-                            / "media"
-                            / asset.asset.name
-                        )
-                        path.unlink(missing_ok=True)
-                except ProgrammingError:
-                    # Catch old leftover tables that can't be deleted because they don't exist
-                    # This can happen if this script got interrupted in a previous run (CTRL+C)
-                    # It'd be better if the query was lazy fetched so we could iter.next() every
-                    # element and only skip the problematic ones. But this works too.
-                    pass
-                call_command("flush", "--noinput")
-                cursor.execute("SET FOREIGN_KEY_CHECKS = 0;")
-                cursor.execute("SHOW TABLES;")
-                tables = cursor.fetchall()
-                for table in tables:
-                    cursor.execute(f"DROP TABLE IF EXISTS {table[0]};")
-                cursor.execute("SET FOREIGN_KEY_CHECKS = 1;")
-        self.stdout.write(self.style.SUCCESS("Existing data erased"))
+        if kwargs["interactive"]:
+            self.stdout.write(
+                "Are you sure you want to erase all existing data and generate new data?"
+            )
+            self.stdout.write("This operation is irreversible and will erase all existing data")
+            self.stdout.write("Type 'yes' to continue, or 'no' to cancel")
+            response = input()
+            if response != "yes":
+                self.stdout.write(self.style.ERROR("Operation cancelled"))
+                return
+        random.seed(kwargs["seed"])
+        self.erase_existing_data()
 
         self.stdout.write("Migrating database...")
         call_command("makemigrations")
         call_command("migrate")
 
         self.stdout.write("Generating Data")
+        started_at = time.perf_counter()
         self.create_fertilizer_types()
         self.create_mulch_layer_types()
         self.create_tree_types()
@@ -373,10 +690,61 @@ class Command(BaseCommand):
         self.create_roles()
         self.create_users()
 
-        self.create_sites()
+        if kwargs["sites"] is None:
+            self.create_sites()
+            self.create_siteadmins(Site.objects.get(name="Canopeum"))
+        else:
+            self.generate_sites(**kwargs)
+            self.create_siteadmins(Site.objects.order_by("pk")[0])
+        self.stdout.write(
+            self.style.SUCCESS(f"Data Generated in {time.perf_counter() - started_at:.1f}s")
+        )
+
+    def erase_existing_data(self):
+        with connection.cursor() as cursor:
+            if connection.introspection.table_names(cursor):
+                self.stdout.write("Erasing existing data...")
+                try:
+                    # Assets may share their stored file. Its variants go with it.
+                    for asset_name in Asset.objects.values_list("asset", flat=True).distinct():
+                        image_variant_service.delete(asset_name)
+                    # Chunks of the uploads that were never completed
+                    for upload in ChunkedUpload.objects.all():
+                        for index in range(upload.chunk_count):
+                            default_storage.delete(upload.get_chunk_name(index))
+                except ProgrammingError:
+                    # Catch old leftover tables that can't be deleted because they don't exist
+                    # This can happen if this script got interrupted in a previous run (CTRL+C)
+                    # It'd be better if the query was lazy fetched so we could iter.next() every
+                    # element and only skip the problematic ones. But this works too.
+                    pass
+                call_command("flush", "--noinput")
+                # Works on SQLite as well as MySQL, unlike SHOW TABLES and FOREIGN_KEY_CHECKS
+                with connection.constraint_checks_disabled():
+                    for table in connection.introspection.table_names(cursor):
+                        cursor.execute(f"DROP TABLE IF EXISTS {connection.ops.quote_name(table)};")
+        self.stdout.write(self.style.SUCCESS("Existing data erased"))
+
+    def generate_sites(self, **kwargs):
+        site_count: int = kwargs["sites"]
+        if site_count < 1:
+            raise CommandError("Generate at least one site")
+
+        def report_progress(generated_site_count: int):
+            self.stdout.write(f"{generated_site_count}/{site_count} sites generated")
 
-        self.create_siteadmins()
-        self.stdout.write(self.style.SUCCESS("Data Generated"))
+        row_counts = SyntheticDataGenerator(
+            sites=site_count,
+            batches_per_site=kwargs["batches_per_site"],
+            species_per_batch=kwargs["species_per_batch"],
+            posts_per_site=kwargs["posts_per_site"],
+            likes_per_post=kwargs["likes_per_post"],
+            comments_per_post=kwargs["comments_per_post"],
+            users=kwargs["users"],
+            chunk_size=kwargs["chunk_size"],
+        ).generate(report_progress)
+        for model_name, row_count in row_counts.items():
+            self.stdout.write(f"{row_count} {model_name} row(s)")
 
     def create_fertilizer_types(self):
         fertilizer_type_names = (
@@ -442,20 +810,11 @@ class Command(BaseCommand):
             )
 
     def create_assets(self):
-        image_file_names = (
-            "site_img1.png",
-            "site_img2.jpg",
-            "site_img3.jpg",
-            "site_img4.jpg",
-            "canopeum_post_img1.jpg",
-            "canopeum_post_img2.jpg",
-        )
-        for file_name in image_file_names:
-            with Path.open(seeding_images_path / file_name, "rb") as img_file:
-                django_file = File(img_file)
-
-                asset = Asset()
-                asset.asset.save(file_name, django_file, save=True)
+        # Content addressed, so they're looked up by the name of their seeding image
+        self.assets = {
+            file_name: Asset.objects.create(asset=save_seeding_image(file_name))
+            for file_name in site_image_file_names + post_image_file_names
+        }
 
     def create_roles(self):
         for role in RoleName:
@@ -502,6 +861,8 @@ class Command(BaseCommand):
         )
 
     def create_sites(self):
+        logo_names = [save_seeding_image(file_name) for file_name in batch_logo_file_names]
+
         # Canopeum's site
         site1 = Site.objects.create(
             name="Canopeum",
@@ -524,7 +885,7 @@ class Command(BaseCommand):
                 phone="+1 514 741-5008",
                 address="721 Walker avenue, Office 200 Montréal, QC H4C 2H5",
             ),
-            image=Asset.objects.first(),
+            image=self.assets["site_img1.png"],
             announcement=Announcement.objects.create(
                 body="We currently have 20000 healthy seedlings of different species, "
                 + "ready to be planted at any time! "
@@ -532,7 +893,7 @@ class Command(BaseCommand):
                 link="https://www.canopeum-pos.com",
             ),
         )
-        batches = create_batches_for_site(site1)
+        batches = create_batches_for_site(site1, logo_names)
         create_species_for_site(site1, batches)
         post = Post.objects.create(
             site=site1,
@@ -540,7 +901,7 @@ class Command(BaseCommand):
             + "new plants are starting to grow and our volunteers are very dedicated!",
             # share_count=5,
         )
-        post.media.add(*Asset.objects.filter(asset__contains="canopeum_post_img"))
+        post.media.add(*(self.assets[file_name] for file_name in post_image_file_names))
         create_posts_for_site(site1)
         Comment.objects.create(
             body="Wow, I'm very excited to join the team!",
@@ -576,7 +937,7 @@ class Command(BaseCommand):
                 phone="+1 (418) 555-1234",
                 address="123 Forest Trail, Quebec City, QC G1P 3X4",
             ),
-            image=Asset.objects.get(asset__contains="site_img2"),
+            image=self.assets["site_img2.jpg"],
             announcement=Announcement.objects.create(
                 body="Maple Grove Retreat is excited to announce our upcoming Maple Syrup "
                 + "Festival! Join us on March 15th for a day of maple syrup tastings, "
@@ -584,7 +945,7 @@ class Command(BaseCommand):
                 link="https://www.maplegroveretreat.com/events/maple-syrup-festival",
             ),
         )
-        batches = create_batches_for_site(site_2)
+        batches = create_batches_for_site(site_2, logo_names)
         create_species_for_site(site_2, batches)
         create_posts_for_site(site_2)
 
@@ -610,7 +971,7 @@ class Command(BaseCommand):
                 phone="+1 (418) 555-5678",
                 address="456 Lakeview Road, Lac-Saint-Jean, QC G8M 1R9",
             ),
-            image=Asset.objects.get(asset__contains="site_img3"),
+            image=self.assets["site_img3.jpg"],
             announcement=Announcement.objects.create(
                 body="Escape to Lakeside Oasis! "
                 + "Our cozy cabins are now open for winter bookings. "
@@ -619,7 +980,7 @@ class Command(BaseCommand):
                 link="https://www.lakesideoasis.com/winter-getaway",
             ),
         )
-        batches = create_batches_for_site(site_3)
+        batches = create_batches_for_site(site_3, logo_names)
         create_species_for_site(site_3, batches)
         create_posts_for_site(site_3)
 
@@ -645,7 +1006,7 @@ class Command(BaseCommand):
                 phone="+1 (819) 555-9876",
                 address="789 Trailhead Way, Mont-Tremblant, QC J8E 1T7",
             ),
-            image=Asset.objects.get(asset__contains="site_img4"),
+            image=self.assets["site_img4.jpg"],
             announcement=Announcement.objects.create(
                 body="Discover the wonders of Evergreen Trail! "
                 + "Our guided nature walks are now available every weekend. "
@@ -654,16 +1015,16 @@ class Command(BaseCommand):
                 link="https://www.evergreentrail.com/guided-walks",
             ),
         )
-        batches = create_batches_for_site(site_4)
+        batches = create_batches_for_site(site_4, logo_names)
         create_species_for_site(site_4, batches)
         create_posts_for_site(site_4)
 
-    def create_siteadmins(self) -> None:
+    def create_siteadmins(self, site: Site) -> None:
         Siteadmin.objects.create(
             user=User.objects.get(email="tyrion@lannister.com"),
-            site=Site.objects.get(name="Canopeum"),
+            site=site,
         )
         Siteadmin.objects.create(
             user=User.objects.get(email="daenerys@targaryen.com"),
-            site=Site.objects.get(name="Canopeum"),
+            site=site,
         )
@@ -0,0 +1,17 @@
+from typing import override
+
+from django.core.management.base import BaseCommand
+
+from canopeum_backend.models import FeedEntry
+
+
+class Command(BaseCommand):
+    help = (
+        "Recreate the feeds of followed sites from the current followers and posts, "
+        + "needed when enabling FEED_FAN_OUT_ON_WRITE"
+    )
+
+    @override
+    def handle(self, *args, **kwargs):
+        entry_count = FeedEntry.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"{entry_count} feed entries created"))
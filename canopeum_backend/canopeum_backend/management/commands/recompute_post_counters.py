@@ -0,0 +1,43 @@
+from typing import override
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, Q
+
+from canopeum_backend.models import Comment, Like, Post, count_per_post
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized like and comment counters of every post"
+
+    @override
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many posts have drifted counters, without fixing them",
+        )
+
+    @override
+    def handle(self, *args, **kwargs):
+        actual_like_count = count_per_post(Like.objects.all())
+        actual_comment_count = count_per_post(Comment.objects.all())
+
+        with transaction.atomic():
+            drifted_post_count = (
+                Post.objects.annotate(
+                    actual_like_count=actual_like_count,
+                    actual_comment_count=actual_comment_count,
+                )
+                .filter(
+                    ~Q(like_count=F("actual_like_count"))
+                    | ~Q(comment_count=F("actual_comment_count"))
+                )
+                .count()
+            )
+            self.stdout.write(f"{drifted_post_count} post(s) with drifted counters")
+            if kwargs["dry_run"] or drifted_post_count == 0:
+                return
+
+            Post.objects.update(like_count=actual_like_count, comment_count=actual_comment_count)
+        self.stdout.write(self.style.SUCCESS("Post counters recomputed"))
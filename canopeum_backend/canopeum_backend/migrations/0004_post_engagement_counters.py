@@ -0,0 +1,44 @@
+# Generated by Django 5.1 on 2026-10-18 13:54
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_per_post(model):
+    per_post_count = (
+        model.objects.filter(post=OuterRef("pk"))
+        .values("post")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    return Coalesce(Subquery(per_post_count, output_field=models.IntegerField()), 0)
+
+
+def backfill_post_counters(apps, schema_editor):
+    Post = apps.get_model("canopeum_backend", "Post")
+    Post.objects.update(
+        like_count=count_per_post(apps.get_model("canopeum_backend", "Like")),
+        comment_count=count_per_post(apps.get_model("canopeum_backend", "Comment")),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('canopeum_backend', '0003_update_input_fields_char_limits'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='like_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_post_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1 on 2026-10-18 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('canopeum_backend', '0005_post_feed_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='coordinate',
+            index=models.Index(fields=['dd_latitude', 'dd_longitude'], name='coordinate_lat_long_idx'),
+        ),
+    ]
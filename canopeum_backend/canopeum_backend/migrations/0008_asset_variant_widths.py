@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-18 14:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('canopeum_backend', '0007_resource_versions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asset',
+            name='variant_widths',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
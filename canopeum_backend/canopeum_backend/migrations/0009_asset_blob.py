@@ -0,0 +1,34 @@
+# Generated by Django 5.1 on 2026-10-18 14:45
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_asset_blob_references(apps, schema_editor):
+    # Files uploaded before content addressing keep their name, assets never shared them
+    Asset = apps.get_model("canopeum_backend", "Asset")
+    AssetBlob = apps.get_model("canopeum_backend", "AssetBlob")
+    AssetBlob.objects.bulk_create(
+        AssetBlob(name=name, ref_count=ref_count)
+        for name, ref_count in Asset.objects.values("asset")
+        .annotate(ref_count=Count("pk"))
+        .values_list("asset", "ref_count")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('canopeum_backend', '0008_asset_variant_widths'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssetBlob',
+            fields=[
+                ('name', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(count_asset_blob_references, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.1 on 2026-10-18 15:03
+
+from django.db import migrations, models
+from django.db.models import Count, F, Min
+
+
+def delete_duplicate_likes(apps, schema_editor):
+    # Created by concurrent clicks before the constraint, keep the first of each
+    Like = apps.get_model("canopeum_backend", "Like")
+    Post = apps.get_model("canopeum_backend", "Post")
+    duplicates = (
+        Like.objects.values("user", "post")
+        .annotate(first_id=Min("pk"), total=Count("pk"))
+        .filter(total__gt=1)
+    )
+    for duplicate in duplicates:
+        Like.objects.filter(user=duplicate["user"], post=duplicate["post"]).exclude(
+            pk=duplicate["first_id"]
+        ).delete()
+        Post.objects.filter(pk=duplicate["post"]).update(
+            like_count=F("like_count") - (duplicate["total"] - 1)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('canopeum_backend', '0012_feed_entry'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_likes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='like',
+            constraint=models.UniqueConstraint(fields=('user', 'post'), name='unique_like_per_post'),
+        ),
+    ]
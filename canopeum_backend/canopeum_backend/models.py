@@ -1,17 +1,28 @@
 import re
+import uuid
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
 from datetime import UTC, datetime, timedelta
 from enum import auto
+from itertools import batched
 from typing import TYPE_CHECKING, Any, ClassVar, Literal, TypeVar, cast, override
 
-import googlemaps
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.db import close_old_connections, models, transaction
+from django.db.models import Avg, Count, F, Min, OuterRef, Prefetch, Q, Subquery, Sum
+from django.db.models.functions import Cast, Coalesce, Floor
 from django.http import QueryDict
 from django.utils.datastructures import MultiValueDict as django_MultiValueDict
-from googlemaps.geocoding import reverse_geocode
 from rest_framework.request import Request as drf_Request
 
-from .settings import GOOGLE_API_KEY
+from .settings import FEED_FAN_OUT_ON_WRITE, GEOCODE_IN_BACKGROUND
+from .utils.content_addressed_storage import content_addressed_name, store_blob
+from .utils.geocoding_service import PENDING_ADDRESS, geocoding_service
+from .utils.image_variant_service import image_variant_service
+from .utils.versioned_cache import Namespace
 
 # Pyright won't be able to infer all types here, see:
 # https://github.com/typeddjango/django-stubs/issues/579
@@ -20,8 +31,6 @@ from .settings import GOOGLE_API_KEY
 
 LAT_LONG_SEP = re.compile(r"°|\'|\"")
 
-gmaps = googlemaps.Client(key=GOOGLE_API_KEY) if GOOGLE_API_KEY else None
-
 
 class RoleName(models.TextChoices):
     User = auto()
@@ -71,8 +80,177 @@ def upload_to(_, filename):
     return f"{now}{filename}"
 
 
+class AssetBlob(models.Model):
+    """
+    A stored file, shared by every asset with the same content.
+    It is only deleted along with the last asset referencing it.
+    """
+
+    name = models.CharField(primary_key=True, max_length=255)
+    ref_count = models.PositiveIntegerField(default=0)
+
+    @classmethod
+    def acquire(cls, name: str):
+        """Reference the stored file, returns whether it wasn't referenced yet."""
+        # The row stays locked until committed, so it can't be dropped while referenced again
+        blobs = cls.objects.filter(pk=name)
+        if blobs.update(ref_count=F("ref_count") + 1):
+            return False
+        # Concurrent first references both insert, one of them is ignored
+        cls.objects.bulk_create((cls(name=name),), ignore_conflicts=True)
+        blobs.update(ref_count=F("ref_count") + 1)
+        return True
+
+    @classmethod
+    def release(cls, name: str):
+        cls.objects.filter(pk=name, ref_count__gt=0).update(ref_count=F("ref_count") - 1)
+        transaction.on_commit(lambda: cls.drop_if_unreferenced(name))
+
+    @classmethod
+    def drop_if_unreferenced(cls, name: str):
+        with transaction.atomic():
+            deleted_count, _ = cls.objects.filter(pk=name, ref_count=0).delete()
+            if deleted_count:
+                # Before committing, so an upload of the same content waits on the row lock
+                # then stores it again
+                image_variant_service.delete(name)
+
+    @classmethod
+    def count_references(cls):
+        """Count the references again, after assets were created or deleted in bulk."""
+        ref_counts = dict(
+            Asset.objects.values("asset")
+            .annotate(ref_count=Count("pk"))
+            .values_list("asset", "ref_count")
+        )
+        cls.objects.exclude(pk__in=ref_counts).update(ref_count=0)
+        cls.objects.bulk_create(
+            (cls(name=name, ref_count=ref_count) for name, ref_count in ref_counts.items()),
+            update_conflicts=True,
+            unique_fields=("name",),
+            update_fields=("ref_count",),
+        )
+
+
 class Asset(models.Model):
+    # Content addressed once saved, see AssetBlob
     asset = models.FileField(upload_to=upload_to, null=False)
+    # Widths of the downsized WebP variants generated so far, see image_variant_service
+    variant_widths = models.JSONField(default=list, blank=True)
+
+    @override
+    def save(self, *args, **kwargs):
+        created = self._state.adding
+        if not created:
+            super().save(*args, **kwargs)
+            return
+
+        with transaction.atomic(savepoint=False):
+            uploaded_file = None if self.asset._committed else self.asset  # noqa: SLF001
+            if uploaded_file is not None:
+                self.asset = content_addressed_name(uploaded_file)
+            name = self.asset.name
+            is_new_blob = AssetBlob.acquire(name)
+            if uploaded_file is not None:
+                store_blob(self.asset.storage, name, uploaded_file)
+            if not is_new_blob and not self.variant_widths:
+                # Identical files were already uploaded, their variants were generated or will be
+                self.variant_widths = (
+                    Asset.objects.filter(asset=name)
+                    .exclude(variant_widths=[])
+                    .values_list("variant_widths", flat=True)
+                    .first()
+                ) or []
+            super().save(*args, **kwargs)
+
+        if is_new_blob and not self.variant_widths:
+            # Once committed, so that the worker thread can see the new row
+            transaction.on_commit(
+                lambda: image_variant_service.generate_in_background(name, self.fill_variants)
+            )
+
+    @override
+    def delete(self, using=None, keep_parents=False):
+        with transaction.atomic():
+            deleted = super().delete(using, keep_parents)
+            AssetBlob.release(self.asset.name)
+        return deleted
+
+    def fill_variants(self, widths: list[int]):
+        """Called from the image variants worker thread once they are stored."""
+        close_old_connections()
+        # Every asset sharing the stored file shares its variants
+        if Asset.objects.filter(asset=self.asset.name).update(variant_widths=widths):
+            # Queryset updates don't send the signals that bump versions
+            bump_asset_versions(self.asset.name)
+        self.variant_widths = widths
+
+
+class ChunkedUpload(models.Model):
+    """
+    A file uploaded in chunks over several requests, which can be resumed from its offset.
+    Chunks are stored as they arrive, so neither a worker nor its memory is held for the
+    whole transfer. They are joined into an asset once all received.
+    """
+
+    # Also the upload token, only known to its uploader
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, models.CASCADE)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)
+    chunk_count = models.PositiveIntegerField(default=0)
+    asset = models.ForeignKey(Asset, models.SET_NULL, blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def get_chunk_name(self, index: int):
+        return f"uploads/{self.pk}/{index:06d}"
+
+    def append_chunk(self, data: bytes):
+        """
+        Store the chunk at the current offset, then create the asset from all chunks once
+        complete. Expects this upload to be locked, see `select_for_update`.
+        """
+        chunk_name = self.get_chunk_name(self.chunk_count)
+        # Left over by an attempt that was rolled back
+        default_storage.delete(chunk_name)
+        default_storage.save(chunk_name, ContentFile(data))
+        self.offset += len(data)
+        self.chunk_count += 1
+        if self.offset == self.size:
+            self.asset = self.join_chunks()
+        self.save()
+
+    def join_chunks(self):
+        # Spooled to a temporary file, like large multipart uploads. It is hashed from there,
+        # and moved rather than copied by the file system storage.
+        with TemporaryUploadedFile(
+            self.filename, "application/octet-stream", self.size, None
+        ) as joined_file:
+            for index in range(self.chunk_count):
+                with default_storage.open(self.get_chunk_name(index), "rb") as chunk:
+                    for data in chunk.chunks():
+                        joined_file.write(data)
+            asset = Asset.objects.create(asset=joined_file)
+        self.delete_chunks_on_commit()
+        return asset
+
+    def cancel(self):
+        """Delete this upload with its chunks, and its asset if it was completed."""
+        self.delete_chunks_on_commit()
+        with transaction.atomic():
+            self.delete()
+            if self.asset is not None:
+                self.asset.delete()
+
+    def delete_chunks_on_commit(self):
+        chunk_names = [self.get_chunk_name(index) for index in range(self.chunk_count)]
+
+        def delete_chunks():
+            for chunk_name in chunk_names:
+                default_storage.delete(chunk_name)
+
+        transaction.on_commit(delete_chunks)
 
 
 class Contact(models.Model):
@@ -92,8 +270,34 @@ class Coordinate(models.Model):
     dd_longitude = models.DecimalField(max_digits=9, decimal_places=6, blank=True, null=True)
     address = models.TextField(blank=True, null=True)
 
+    class Meta:
+        indexes = (
+            # Viewport queries of the site map, see SiteQuerySet.in_bounding_box
+            models.Index(fields=["dd_latitude", "dd_longitude"], name="coordinate_lat_long_idx"),
+        )
+
     @classmethod
-    def from_dms_lat_long(cls, dms_latitude: str, dms_longitude: str):
+    def from_dms_lat_long(
+        cls,
+        dms_latitude: str,
+        dms_longitude: str,
+        *,
+        geocode_in_background: bool = GEOCODE_IN_BACKGROUND,
+    ):
+        coordinate = cls()
+        coordinate.set_dms_lat_long(
+            dms_latitude, dms_longitude, geocode_in_background=geocode_in_background
+        )
+        return coordinate
+
+    def set_dms_lat_long(
+        self,
+        dms_latitude: str,
+        dms_longitude: str,
+        *,
+        geocode_in_background: bool = GEOCODE_IN_BACKGROUND,
+    ):
+        """Move this coordinate, then save it with the address of its new location."""
         dms_latitude_split = re.split(LAT_LONG_SEP, dms_latitude)
         dd_latitude = (
             float(dms_latitude_split[0])
@@ -112,38 +316,32 @@ class Coordinate(models.Model):
         if dms_longitude_split[3] == "W":
             dd_longitude *= -1
 
-        if gmaps is not None:
-            data_retrieved: list[dict[str, Any]] = reverse_geocode(
-                gmaps,
-                (dd_latitude, dd_longitude),
-                # https://developers.google.com/maps/documentation/geocoding/requests-reverse-geocoding
-                result_type=[
-                    # Gives lots of good civil administrations polygons,
-                    # automatically includes many administrative_area_level
-                    "political",
-                    # Direct address, if possible
-                    "street_address",
-                ],
-            )
-            # Naive way to get the location we want, longer name usually means more precise
-            data_retrieved = sorted(
-                data_retrieved, key=lambda location: len(location["formatted_address"])
-            )
-            formatted_address = (
-                data_retrieved[0]["formatted_address"]
-                if data_retrieved
-                else "Unretrievable location"
-            )
+        if geocode_in_background:
+            address = geocoding_service.get_cached_address(dd_latitude, dd_longitude)
         else:
-            formatted_address = "Missing Google API Key"
-
-        return cls.objects.create(
-            dms_latitude=dms_latitude,
-            dms_longitude=dms_longitude,
-            dd_latitude=dd_latitude,
-            dd_longitude=dd_longitude,
-            address=formatted_address,
-        )
+            address = geocoding_service.reverse_geocode(dd_latitude, dd_longitude)
+
+        self.dms_latitude = dms_latitude
+        self.dms_longitude = dms_longitude
+        self.dd_latitude = dd_latitude
+        self.dd_longitude = dd_longitude
+        self.address = address or PENDING_ADDRESS
+        self.save()
+        if address is None:
+            # Once committed, so that the worker thread can see the new row
+            transaction.on_commit(
+                lambda: geocoding_service.reverse_geocode_in_background(
+                    dd_latitude, dd_longitude, self.fill_pending_address
+                )
+            )
+
+    def fill_pending_address(self, address: str):
+        """Called from the geocoding worker thread once the address is known."""
+        close_old_connections()
+        if Coordinate.objects.filter(pk=self.pk, address=PENDING_ADDRESS).update(address=address):
+            # Queryset updates don't send the signals that bump versions
+            bump_coordinate_versions(self.pk)
+        self.address = address
 
 
 class Internationalization(models.Model):
@@ -155,6 +353,134 @@ class Sitetype(models.Model):
     name = models.ForeignKey(Internationalization, models.DO_NOTHING, blank=True, null=True)
 
 
+def sum_per_site(queryset: models.QuerySet[Any], field: str, site_lookup: str = "site"):
+    """Correlated subquery summing `field` of `queryset` for the outer site row."""
+    per_site_sum = (
+        queryset.filter(**{site_lookup: OuterRef("pk")})
+        .values(site_lookup)
+        .annotate(total=Sum(field))
+        .values("total")
+    )
+    return Coalesce(Subquery(per_site_sum, output_field=models.IntegerField()), 0)
+
+
+class SiteQuerySet(models.QuerySet["Site"]):
+    def with_summary_counts(self):
+        """
+        Annotate the analytics totals of every site in the same query that fetches the sites,
+        so the summary cost doesn't grow with the number of sites and batches.
+        Read them through the `Site.get_*_count` methods.
+        """
+        return self.annotate(
+            annotated_plant_count=sum_per_site(Sitetreespecies.objects.all(), "quantity"),
+            annotated_sponsored_plant_count=sum_per_site(
+                BatchSpecies.objects.all(), "quantity", site_lookup="batch__site"
+            ),
+            annotated_survived_count=sum_per_site(Batch.objects.all(), "survived_count"),
+            annotated_propagation_count=sum_per_site(Batch.objects.all(), "total_propagation"),
+        )
+
+    def in_bounding_box(self, west: float, south: float, east: float, north: float):
+        """
+        Sites whose coordinate is within the bounding box, in decimal degrees.
+        A west edge greater than the east edge crosses the antimeridian.
+        """
+        longitude_filter = Q(coordinate__dd_longitude__gte=west, coordinate__dd_longitude__lte=east)
+        if west > east:
+            longitude_filter = Q(coordinate__dd_longitude__gte=west) | Q(
+                coordinate__dd_longitude__lte=east
+            )
+        return self.filter(
+            longitude_filter,
+            coordinate__dd_latitude__gte=south,
+            coordinate__dd_latitude__lte=north,
+        )
+
+    def grid_clusters(self, cell_size: float):
+        """
+        Group the sites in square grid cells of `cell_size` degrees, in a single aggregation.
+        Every cluster has its `count` of sites, their average `latitude` and `longitude`,
+        and the `site_id` of one of them, to find lone sites.
+        """
+        return (
+            self.exclude(coordinate__dd_latitude=None)
+            .exclude(coordinate__dd_longitude=None)
+            .annotate(
+                cell_row=Floor(Cast("coordinate__dd_latitude", models.FloatField()) / cell_size),
+                cell_column=Floor(
+                    Cast("coordinate__dd_longitude", models.FloatField()) / cell_size
+                ),
+            )
+            .values("cell_row", "cell_column")
+            .annotate(
+                count=Count("pk"),
+                latitude=Avg("coordinate__dd_latitude"),
+                longitude=Avg("coordinate__dd_longitude"),
+                site_id=Min("pk"),
+            )
+            .order_by()
+        )
+
+    def with_batch_details(self):
+        """Prefetch every site's batches with their details. Read them with `Site.get_batches`."""
+        return self.prefetch_related(
+            Prefetch(
+                "batch_set",
+                queryset=Batch.objects.with_details().order_by("-updated_at"),
+                to_attr="prefetched_batches",
+            )
+        )
+
+
+def _get_reference_type(model: type[models.Model], pk: int):
+    # Imported here since the reference data is built from these models
+    from .reference_data import get_reference_type  # noqa: PLC0415
+
+    return get_reference_type(model, pk)  # type: ignore[arg-type]
+
+
+def _sync_typed_relation(
+    model: type[models.Model],
+    parent: Mapping[str, models.Model],
+    type_field: str,
+    quantities: Mapping[int, int | None],
+    rows: Iterable[Any],
+):
+    """
+    Delete, update then create the `rows` of `model` to match `quantities` by type id,
+    only touching the rows that changed. New rows belong to `parent`.
+    Relations without a quantity map their types to None.
+    """
+    manager = model._default_manager  # noqa: SLF001 # Public API despite the underscore
+    deleted_pks: list[int] = []
+    updated_rows: list[Any] = []
+    existing_type_ids: set[int] = set()
+    for row in rows:
+        type_id = getattr(row, type_field)
+        if type_id not in quantities:
+            deleted_pks.append(row.pk)
+            continue
+        existing_type_ids.add(type_id)
+        quantity = quantities[type_id]
+        if quantity is not None and row.quantity != quantity:
+            row.quantity = quantity
+            updated_rows.append(row)
+
+    if deleted_pks:
+        manager.filter(pk__in=deleted_pks).delete()
+    if updated_rows:
+        manager.bulk_update(updated_rows, ["quantity"])
+    created_rows: list[Any] = []
+    for type_id, quantity in quantities.items():
+        if type_id in existing_type_ids:
+            continue
+        row = model(**parent, **{type_field: type_id})
+        if quantity is not None:
+            row.quantity = quantity
+        created_rows.append(row)
+    manager.bulk_create(created_rows)
+
+
 class Site(models.Model):
     name = models.TextField()
     is_public = models.BooleanField(blank=False, null=False, default=False)
@@ -169,20 +495,96 @@ class Site(models.Model):
     announcement = models.ForeignKey(Announcement, models.SET_NULL, blank=True, null=True)
     image = models.ForeignKey(Asset, models.SET_NULL, blank=True, null=True)
 
+    objects = SiteQuerySet.as_manager()
+
+    # Rendered by the site map or deciding who sees a site there, see SITES_VERSION_KEY
+    MAP_FIELDS: ClassVar = ("name", "is_public", "site_type_id", "coordinate_id", "image_id")
+    # None until loaded from the database, or when some of the map fields were deferred
+    _loaded_map_values: tuple[object, ...] | None = None
+
+    @override
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        site = super().from_db(db, field_names, values)
+        site._loaded_map_values = site._get_map_values()  # noqa: SLF001
+        return site
+
+    def _get_map_values(self):
+        deferred_fields = self.get_deferred_fields()
+        if deferred_fields.intersection(self.MAP_FIELDS):
+            return None
+        return tuple(getattr(self, attname) for attname in self.MAP_FIELDS)
+
+    def pop_map_changes(self):
+        """
+        Whether a field shown on the site map changed since the site was loaded or last asked,
+        assumed for new sites and when it can't be told.
+        """
+        map_values = self._get_map_values()
+        changed = map_values is None or map_values != self._loaded_map_values
+        self._loaded_map_values = map_values
+        return changed
+
+    def set_tree_species(self, species: Mapping[int, int], *, created: bool = False):
+        """
+        Make the site's tree species match these quantities by tree type id, in bulk.
+        Only the rows that changed are written, new sites don't read their rows.
+        Raises the DoesNotExist of an unknown tree type before writing anything.
+        """
+        for pk in species:
+            _get_reference_type(Treetype, pk)
+        with transaction.atomic(savepoint=False):
+            rows = [] if created else Sitetreespecies.objects.filter(site=self)
+            _sync_typed_relation(Sitetreespecies, {"site": self}, "tree_type_id", species, rows)
+
+    # The counts below are read from the SiteQuerySet.with_summary_counts annotations when present,
+    # otherwise they fall back to one aggregation query each.
+
     def get_plant_count(self) -> int:
-        site_species = Sitetreespecies.objects.filter(site=self)
-        return sum(specie.quantity for specie in site_species)
+        annotated_count: int | None = getattr(self, "annotated_plant_count", None)
+        if annotated_count is not None:
+            return annotated_count
+        return (
+            Sitetreespecies.objects.filter(site=self).aggregate(total=Sum("quantity"))["total"] or 0
+        )
+
+    def get_sponsored_plant_count(self) -> int:
+        annotated_count: int | None = getattr(self, "annotated_sponsored_plant_count", None)
+        if annotated_count is not None:
+            return annotated_count
+        return (
+            BatchSpecies.objects.filter(batch__site=self).aggregate(total=Sum("quantity"))["total"]
+            or 0
+        )
+
+    def get_survived_count(self) -> int:
+        annotated_count: int | None = getattr(self, "annotated_survived_count", None)
+        if annotated_count is not None:
+            return annotated_count
+        return Batch.objects.filter(site=self).aggregate(total=Sum("survived_count"))["total"] or 0
+
+    def get_propagation_count(self) -> int:
+        annotated_count: int | None = getattr(self, "annotated_propagation_count", None)
+        if annotated_count is not None:
+            return annotated_count
+        return (
+            Batch.objects.filter(site=self).aggregate(total=Sum("total_propagation"))["total"] or 0
+        )
 
     def get_sponsor_progress(self) -> float:
         total_plant_count = self.get_plant_count()
         if total_plant_count == 0:
             return 0
 
-        batches = Batch.objects.filter(site=self)
-        sponsored_plant_count = sum(batch.get_plant_count() for batch in batches)
-
         # Note: We don't cap the progress at 100% so it's obvious if there's a data issue
-        return sponsored_plant_count / total_plant_count * 100
+        return self.get_sponsored_plant_count() / total_plant_count * 100
+
+    def get_batches(self) -> list["Batch"]:
+        """Most recently updated first, read from SiteQuerySet.with_batch_details when present."""
+        prefetched_batches: list[Batch] | None = getattr(self, "prefetched_batches", None)
+        if prefetched_batches is not None:
+            return prefetched_batches
+        return list(Batch.objects.filter(site=self).with_details().order_by("-updated_at"))
 
     @override
     def delete(self, using=None, keep_parents=False):
@@ -211,6 +613,52 @@ class BatchSponsor(models.Model):
     logo = models.ForeignKey(Asset, models.CASCADE)
 
 
+class BatchQuerySet(models.QuerySet["Batch"]):
+    def with_details(self):
+        """
+        Load everything BatchDetailSerializer reads in a fixed number of queries:
+        the sponsor, image, and the five child relations with their types.
+        The type names are read from the in-memory reference data.
+        """
+        return self.select_related("sponsor__logo", "image").prefetch_related(
+            Prefetch(
+                "batchfertilizer_set",
+                queryset=Batchfertilizer.objects.select_related("fertilizer_type"),
+            ),
+            Prefetch(
+                "batchmulchlayer_set",
+                queryset=Batchmulchlayer.objects.select_related("mulch_layer_type"),
+            ),
+            Prefetch(
+                "batchsupportedspecies_set",
+                queryset=BatchSupportedSpecies.objects.select_related("tree_type"),
+            ),
+            Prefetch("batchseed_set", queryset=BatchSeed.objects.select_related("tree_type")),
+            Prefetch("batchspecies_set", queryset=BatchSpecies.objects.select_related("tree_type")),
+        )
+
+
+@dataclass(frozen=True)
+class BatchDetails:
+    """The types a batch is made of by id, with the quantities of its seeds and species."""
+
+    fertilizer_ids: frozenset[int] = frozenset()
+    mulch_layer_ids: frozenset[int] = frozenset()
+    supported_species_ids: frozenset[int] = frozenset()
+    # Quantities by tree type id
+    seeds: Mapping[int, int] = field(default_factory=dict)
+    species: Mapping[int, int] = field(default_factory=dict)
+
+    def validate(self):
+        """Raises the DoesNotExist of the first unknown type, checked against the reference data."""
+        for pk in self.fertilizer_ids:
+            _get_reference_type(Fertilizertype, pk)
+        for pk in self.mulch_layer_ids:
+            _get_reference_type(Mulchlayertype, pk)
+        for pk in {*self.supported_species_ids, *self.seeds, *self.species}:
+            _get_reference_type(Treetype, pk)
+
+
 class Batch(models.Model):
     site = models.ForeignKey(Site, models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True, null=True)
@@ -224,37 +672,37 @@ class Batch(models.Model):
     total_propagation = models.IntegerField(blank=True, null=True)
     image = models.ForeignKey(Asset, models.DO_NOTHING, blank=True, null=True)
 
+    objects = BatchQuerySet.as_manager()
+
     @property
     def total_number_seeds(self):
         return 100
 
-    def add_fertilizer_by_id(self, pk: int):
-        fertilizer_type = Fertilizertype.objects.get(pk=pk)
-        return Batchfertilizer.objects.create(fertilizer_type=fertilizer_type, batch=self)
-
-    def add_mulch_by_id(self, pk: int):
-        mulch_layer_type = Mulchlayertype.objects.get(pk=pk)
-        return Batchmulchlayer.objects.create(mulch_layer_type=mulch_layer_type, batch=self)
-
-    def add_seed_by_id(self, pk: int, quantity: int):
-        tree_type = Treetype.objects.get(pk=pk)
-        return BatchSeed.objects.create(tree_type=tree_type, quantity=quantity, batch=self)
-
-    def add_specie_by_id(self, pk: int, quantity: int):
-        tree_type = Treetype.objects.get(pk=pk)
-        return BatchSpecies.objects.create(tree_type=tree_type, quantity=quantity, batch=self)
-
-    def add_supported_specie_by_id(self, pk: int):
-        tree_type = Treetype.objects.get(pk=pk)
-        return BatchSupportedSpecies.objects.create(tree_type=tree_type, batch=self)
+    def set_details(self, details: "BatchDetails", *, created: bool = False):
+        """
+        Make the child relations match `details`, in a single transaction and in bulk.
+        Only the rows that changed are written, new batches don't read their rows.
+        Raises the DoesNotExist of an unknown type before writing anything.
+        """
+        details.validate()
+        relations: tuple[tuple[type[models.Model], str, Mapping[int, int | None]], ...] = (
+            (Batchfertilizer, "fertilizer_type_id", dict.fromkeys(details.fertilizer_ids)),
+            (Batchmulchlayer, "mulch_layer_type_id", dict.fromkeys(details.mulch_layer_ids)),
+            (BatchSupportedSpecies, "tree_type_id", dict.fromkeys(details.supported_species_ids)),
+            (BatchSeed, "tree_type_id", details.seeds),
+            (BatchSpecies, "tree_type_id", details.species),
+        )
+        with transaction.atomic(savepoint=False):
+            for model, type_field, quantities in relations:
+                rows = [] if created else model._default_manager.filter(batch=self)  # noqa: SLF001
+                _sync_typed_relation(model, {"batch": self}, type_field, quantities, rows)
 
+    # Going through the related managers reuses BatchQuerySet.with_details prefetches
     def get_total_number_seeds(self) -> int:
-        batch_seeds = BatchSeed.objects.filter(batch=self)
-        return sum(seed.quantity for seed in batch_seeds)
+        return sum(seed.quantity for seed in self.batchseed_set.all())
 
     def get_plant_count(self) -> int:
-        batch_species = BatchSpecies.objects.filter(batch=self)
-        return sum(specie.quantity for specie in batch_species)
+        return sum(specie.quantity for specie in self.batchspecies_set.all())
 
 
 class Fertilizertype(models.Model):
@@ -349,6 +797,42 @@ class Post(models.Model):
     # TODO(NicolasDontigny): Add created by user?
     # created_by = models.ForeignKey(User, models.DO_NOTHING, blank=True, null=True)
     media = models.ManyToManyField(Asset, through=PostAsset, blank=True)
+    # Denormalized counters, kept up to date by Like and Comment.
+    # Use the recompute_post_counters command if they ever drift.
+    like_count = models.IntegerField(default=0)
+    comment_count = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = (
+            # Keyset pagination of the feed, see CreatedAtCursorPagination
+            models.Index(fields=["created_at", "id"], name="post_created_at_id_idx"),
+            # The same, for the posts of some sites only, such as the followed ones
+            models.Index(fields=["site", "created_at", "id"], name="post_site_created_at_id_idx"),
+        )
+
+    @override
+    def save(self, *args, **kwargs):
+        is_new = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if is_new and FEED_FAN_OUT_ON_WRITE:
+                FeedEntry.fan_out(self)
+
+
+def count_per_post(queryset: models.QuerySet[Any]):
+    """Correlated subquery counting the rows of `queryset` for the outer post row."""
+    per_post_count = (
+        queryset.filter(post=OuterRef("pk"))
+        .values("post")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    return Coalesce(Subquery(per_post_count, output_field=models.IntegerField()), 0)
+
+
+def increment_post_counter(post_id: int, counter: Literal["like_count", "comment_count"], by: int):
+    updates: dict[str, Any] = {counter: F(counter) + by}
+    Post.objects.filter(pk=post_id).update(**updates)
 
 
 class Comment(models.Model):
@@ -357,6 +841,29 @@ class Comment(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     post = models.ForeignKey(Post, on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = (
+            # Keyset pagination of a post's comments, see CreatedAtCursorPagination
+            models.Index(fields=["post", "created_at"], name="comment_post_created_at_idx"),
+        )
+
+    @override
+    def save(self, *args, **kwargs):
+        is_new = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if is_new:
+                increment_post_counter(self.post_id, "comment_count", 1)
+
+    @override
+    def delete(self, using=None, keep_parents=False):
+        with transaction.atomic():
+            deleted = super().delete(using, keep_parents)
+            # Nothing to decrement if another request already deleted the row
+            if deleted[0]:
+                increment_post_counter(self.post_id, "comment_count", -1)
+            return deleted
+
 
 class Siteadmin(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -382,6 +889,105 @@ class SiteFollower(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     site = models.ForeignKey(Site, on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = (
+            # The sites followed by a user, joined to their posts for the feed
+            models.Index(fields=["user", "site"], name="site_follower_user_site_idx"),
+        )
+
+    @override
+    def save(self, *args, **kwargs):
+        is_new = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if is_new and FEED_FAN_OUT_ON_WRITE:
+                FeedEntry.follow(self.user_id, self.site_id)
+
+    @override
+    def delete(self, using=None, keep_parents=False):
+        with transaction.atomic():
+            deleted = super().delete(using, keep_parents)
+            if FEED_FAN_OUT_ON_WRITE:
+                FeedEntry.unfollow(self.user_id, self.site_id)
+            return deleted
+
+
+# Rows inserted per query when fanning out
+FEED_BATCH_SIZE = 1000
+
+
+class FeedEntry(models.Model):
+    """
+    A post of a site followed by `user`, copied there when posted ("fan-out on write").
+
+    Reading the feed of followed sites is then a single index range over the user's entries,
+    however many sites they follow. Only maintained with `FEED_FAN_OUT_ON_WRITE`,
+    fill them with the `rebuild_feeds` command when enabling it.
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    post = models.ForeignKey(Post, on_delete=models.CASCADE)
+    # Copied from the post, for keyset pagination, see CreatedAtCursorPagination
+    created_at = models.DateTimeField()
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(fields=["user", "post"], name="unique_feed_entry_per_post"),
+        )
+        indexes = (
+            models.Index(
+                fields=["user", "created_at", "id"], name="feed_entry_user_created_at_idx"
+            ),
+        )
+
+    @classmethod
+    def add_entries(cls, entries: Iterable["FeedEntry"]):
+        for batch in batched(entries, FEED_BATCH_SIZE):
+            # Followed twice, or already added concurrently
+            cls.objects.bulk_create(batch, ignore_conflicts=True)
+
+    @classmethod
+    def fan_out(cls, post: Post):
+        """Add a new post to the feed of every follower of its site."""
+        follower_ids = (
+            SiteFollower.objects.filter(site=post.site_id).values_list("user", flat=True).distinct()
+        )
+        cls.add_entries(
+            cls(user_id=user_id, post=post, created_at=post.created_at)
+            for user_id in follower_ids.iterator()
+        )
+
+    @classmethod
+    def follow(cls, user_id: int, site_id: int):
+        """Add the existing posts of a newly followed site to the feed of the user."""
+        posts = Post.objects.filter(site=site_id).values_list("pk", "created_at")
+        cls.add_entries(
+            cls(user_id=user_id, post_id=post_id, created_at=created_at)
+            for post_id, created_at in posts.iterator()
+        )
+
+    @classmethod
+    def unfollow(cls, user_id: int, site_id: int):
+        # Unless the site is still followed through a duplicate
+        if not SiteFollower.objects.filter(user=user_id, site=site_id).exists():
+            cls.objects.filter(user=user_id, post__site=site_id).delete()
+
+    @classmethod
+    def rebuild(cls):
+        """Recreate every entry from the followed sites, such as after enabling the fan-out."""
+        followed_posts = (
+            Post.objects.filter(site__sitefollower__isnull=False)
+            .values_list("site__sitefollower__user", "pk", "created_at")
+            .distinct()
+        )
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.add_entries(
+                cls(user_id=user_id, post_id=post_id, created_at=created_at)
+                for user_id, post_id, created_at in followed_posts.iterator()
+            )
+        return cls.objects.count()
+
 
 class Sitetreespecies(models.Model):
     site = models.ForeignKey(Site, models.CASCADE)
@@ -406,6 +1012,86 @@ class Like(models.Model):
     user = models.ForeignKey(User, models.CASCADE)
     post = models.ForeignKey(Post, models.CASCADE)
 
+    class Meta:
+        constraints = (
+            # Also the index resolving the likes of a page of posts, see PostSerializer.get_context
+            models.UniqueConstraint(fields=["user", "post"], name="unique_like_per_post"),
+        )
+
+    @override
+    def save(self, *args, **kwargs):
+        is_new = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if is_new:
+                increment_post_counter(self.post_id, "like_count", 1)
+
+    @override
+    def delete(self, using=None, keep_parents=False):
+        with transaction.atomic():
+            deleted = super().delete(using, keep_parents)
+            # Nothing to decrement if another request already deleted the row
+            if deleted[0]:
+                increment_post_counter(self.post_id, "like_count", -1)
+            return deleted
+
+
+class ResourceVersion(models.Model):
+    """
+    Change counter of a resource, bumped on every write to it.
+    Versions are cheap to compare, see `resource_versions` for conditional requests.
+    """
+
+    key = models.CharField(primary_key=True, max_length=64)
+    version = models.PositiveBigIntegerField(default=0)
+
+
+SITES_VERSION_KEY = "sites"
+
+
+def site_version_key(site_id: int):
+    return f"site:{site_id}"
+
+
+def bump_resource_versions(*keys: str):
+    unique_keys = set(keys)
+    versions = ResourceVersion.objects.filter(key__in=unique_keys)
+    if not unique_keys or versions.update(version=F("version") + 1) == len(unique_keys):
+        return
+    # First write of some of these resources. Some may have been created concurrently,
+    # bumping again after creating them is fine, versions only need to change.
+    missing_keys = unique_keys - set(versions.values_list("key", flat=True))
+    ResourceVersion.objects.bulk_create(
+        (ResourceVersion(key=key) for key in missing_keys), ignore_conflicts=True
+    )
+    ResourceVersion.objects.filter(key__in=missing_keys).update(version=F("version") + 1)
+
+
+def bump_coordinate_versions(coordinate_id: int):
+    site_ids = Site.objects.filter(coordinate_id=coordinate_id).values_list("pk", flat=True)
+    bump_resource_versions(SITES_VERSION_KEY, *map(site_version_key, site_ids))
+
+
+def bump_asset_versions(asset_name: str):
+    """Bump the sites showing the stored file as their image or as a sponsor logo."""
+    site_ids = {
+        *Site.objects.filter(image__asset=asset_name).values_list("pk", flat=True),
+        *Batch.objects.filter(sponsor__logo__asset=asset_name).values_list("site_id", flat=True),
+    }
+    bump_resource_versions(SITES_VERSION_KEY, *map(site_version_key, site_ids))
+
+
+# Namespaces of the cache shared between processes, invalidated in `shared_cache` and
+# `authorization`
+
+
+def site_namespace(site_id: int) -> Namespace:
+    return f"site:{site_id}"
+
+
+def user_namespace(user_id: int) -> Namespace:
+    return f"user:{user_id}"
+
 
 # Everything under here are type overrides
 
@@ -0,0 +1,72 @@
+import binascii
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from typing import Any, override
+
+from django.db.models import Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class CreatedAtCursorPagination(BasePagination):
+    """
+    Keyset pagination over `(created_at, id)`, newest first.
+
+    Unlike page numbers, there is no COUNT query and every page is a single index range scan,
+    so deep pages cost the same as the first one.
+    The cursor is an opaque token pointing after the last row of the previous page.
+    """
+
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self, page_size: int):
+        self.page_size = page_size
+        self.next_position: tuple[datetime, int] | None = None
+        self.request: Request | None = None
+
+    @staticmethod
+    def encode_cursor(created_at: datetime, pk: int) -> str:
+        return urlsafe_b64encode(f"{created_at.isoformat()}|{pk}".encode()).decode("ascii")
+
+    def decode_cursor(self, encoded: str) -> tuple[datetime, int]:
+        try:
+            created_at, pk = urlsafe_b64decode(encoded.encode("ascii")).decode().split("|")
+            return datetime.fromisoformat(created_at), int(pk)
+        except (binascii.Error, UnicodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message) from None
+
+    @override
+    def paginate_queryset(self, queryset: QuerySet[Any], request: Request, view=None):
+        self.request = request
+        queryset = queryset.order_by("-created_at", "-id")
+
+        encoded_cursor = request.query_params.get(self.cursor_query_param)
+        if encoded_cursor:
+            created_at, pk = self.decode_cursor(encoded_cursor)
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+            )
+
+        # Fetch one extra row to know whether there is a next page, without counting
+        rows = list(queryset[: self.page_size + 1])
+        page = rows[: self.page_size]
+        if len(rows) > self.page_size:
+            self.next_position = (page[-1].created_at, page[-1].pk)
+        return page
+
+    def get_next_link(self):
+        if self.next_position is None or self.request is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.encode_cursor(*self.next_position),
+        )
+
+    @override
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
@@ -6,7 +6,8 @@ from typing import override
 
 from rest_framework import permissions
 
-from .models import Comment, Request, RoleName, Site, Siteadmin
+from .authorization import get_authorization_context
+from .models import Comment, Request, RoleName, Site
 
 
 class DeleteCommentPermission(permissions.BasePermission):
@@ -14,12 +15,9 @@ class DeleteCommentPermission(permissions.BasePermission):
 
     @override
     def has_object_permission(self, request: Request, view, obj: Comment):
-        if request.user.role.name == RoleName.MegaAdmin:
+        if obj.user_id == request.user.pk:
             return True
-        is_admin_for_this_post = obj.post.site.siteadmin_set.filter(
-            user__id__exact=request.user.id
-        ).exists()
-        return is_admin_for_this_post or obj.user == request.user
+        return get_authorization_context(request.user).is_site_admin(obj.post.site_id)
 
 
 class PublicSiteReadPermission(permissions.BasePermission):
@@ -27,14 +25,15 @@ class PublicSiteReadPermission(permissions.BasePermission):
 
     @override
     def has_object_permission(self, request: Request, view, obj: Site) -> bool:
-        if obj.is_public or (request.user.role.name == RoleName.MegaAdmin):
+        if obj.is_public:
             return True
-        if request.user.role.name != RoleName.ForestSteward:
+        authorization = get_authorization_context(request.user)
+        if authorization.is_mega_admin:
+            return True
+        if not authorization.is_forest_steward:
             return False
 
-        return (
-            Siteadmin.objects.filter(user__id__exact=request.user.pk).filter(site=obj.pk).exists()
-        )
+        return obj.pk in authorization.admin_site_ids
 
 
 class SiteAdminPermission(permissions.BasePermission):
@@ -42,11 +41,7 @@ class SiteAdminPermission(permissions.BasePermission):
 
     @override
     def has_object_permission(self, request: Request, view, obj: Site) -> bool:
-        if request.user.role.name == RoleName.MegaAdmin:
-            return True
-        return (
-            Siteadmin.objects.filter(user__id__exact=request.user.id).filter(site=obj.pk).exists()
-        )
+        return get_authorization_context(request.user).is_site_admin(obj.pk)
 
 
 class MegaAdminOrForestStewardPermission(permissions.BasePermission):
@@ -55,7 +50,10 @@ class MegaAdminOrForestStewardPermission(permissions.BasePermission):
     # About the type ignore: Base permission return type is Literal True but should be bool
     @override
     def has_permission(self, request: Request, view):
-        return request.user.role.name in {RoleName.MegaAdmin, RoleName.ForestSteward}
+        return get_authorization_context(request.user).role_name in {
+            RoleName.MegaAdmin,
+            RoleName.ForestSteward,
+        }
 
 
 class MegaAdminPermission(permissions.BasePermission):
@@ -63,7 +61,7 @@ class MegaAdminPermission(permissions.BasePermission):
 
     @override
     def has_permission(self, request: Request, view):
-        return request.user.role.name == RoleName.MegaAdmin
+        return get_authorization_context(request.user).is_mega_admin
 
 
 READONLY_METHODS = {"GET", "HEAD", "OPTIONS"}
@@ -79,7 +77,7 @@ class MegaAdminPermissionReadOnly(permissions.BasePermission):
     def has_permission(self, request: Request, view):
         if request.method in READONLY_METHODS:
             return True
-        return request.user.role.name == RoleName.MegaAdmin
+        return get_authorization_context(request.user).is_mega_admin
 
 
 class CurrentUserPermission(permissions.BasePermission):
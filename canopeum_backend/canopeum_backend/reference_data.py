@@ -0,0 +1,132 @@
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import TypeAlias
+
+from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import (
+    Fertilizertype,
+    Internationalization,
+    Mulchlayertype,
+    ResourceVersion,
+    Sitetype,
+    Treetype,
+)
+from .resource_versions import (
+    FERTILIZER_TYPES_VERSION_KEY,
+    MULCH_LAYER_TYPES_VERSION_KEY,
+    SITE_TYPES_VERSION_KEY,
+    TREE_TYPES_VERSION_KEY,
+)
+from .utils.versioned_registry import VersionedRegistry
+
+# Bounds how long another process can serve stale reference data, signals only reach this one
+REFERENCE_DATA_REVALIDATE_AFTER_SECONDS = 30
+
+ReferenceModel: TypeAlias = type[Treetype | Sitetype | Fertilizertype | Mulchlayertype]
+
+
+@dataclass(frozen=True, slots=True)
+class Translation:
+    en: str | None
+    fr: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class ReferenceType:
+    """A row of a reference table. Serializes like its model, names are resolved by their id."""
+
+    id: int
+    name_id: int | None
+
+
+@dataclass(frozen=True, slots=True)
+class ReferenceData:
+    """The reference tables and their names, ordered by id."""
+
+    tree_types: Mapping[int, ReferenceType]
+    site_types: Mapping[int, ReferenceType]
+    fertilizer_types: Mapping[int, ReferenceType]
+    mulch_layer_types: Mapping[int, ReferenceType]
+    names: Mapping[int, Translation]
+
+    def table(self, model: ReferenceModel) -> Mapping[int, ReferenceType]:
+        return getattr(self, TABLE_NAMES[model])  # type: ignore[no-any-return]
+
+
+TABLE_NAMES: dict[ReferenceModel, str] = {
+    Treetype: "tree_types",
+    Sitetype: "site_types",
+    Fertilizertype: "fertilizer_types",
+    Mulchlayertype: "mulch_layer_types",
+}
+
+
+def load_reference_data() -> ReferenceData:
+    names: dict[int, Translation] = {}
+    tables: dict[str, dict[int, ReferenceType]] = {}
+    for model, table_name in TABLE_NAMES.items():
+        # The names are joined in, one query per table
+        rows = model.objects.order_by("pk").values_list("pk", "name_id", "name__en", "name__fr")
+        tables[table_name] = {}
+        for pk, name_id, en, fr in rows:
+            tables[table_name][pk] = ReferenceType(id=pk, name_id=name_id)
+            if name_id is not None:
+                names[name_id] = Translation(en=en, fr=fr)
+    return ReferenceData(**tables, names=names)
+
+
+def get_reference_data_version():
+    keys = (
+        TREE_TYPES_VERSION_KEY,
+        SITE_TYPES_VERSION_KEY,
+        FERTILIZER_TYPES_VERSION_KEY,
+        MULCH_LAYER_TYPES_VERSION_KEY,
+    )
+    versions = dict(ResourceVersion.objects.filter(key__in=keys).values_list("key", "version"))
+    return tuple(versions.get(key, 0) for key in keys)
+
+
+reference_data = VersionedRegistry(
+    load_reference_data, get_reference_data_version, REFERENCE_DATA_REVALIDATE_AFTER_SECONDS
+)
+
+
+def get_reference_type(model: ReferenceModel, pk: int | str):
+    """
+    The row of this reference table, reloading once if it isn't known yet,
+    since another process could have just created it.
+    Raises the model's DoesNotExist like `model.objects.get(pk=pk)`.
+    """
+    pk = int(pk)
+    reference_type = reference_data.get().table(model).get(pk)
+    if reference_type is None:
+        reference_type = reference_data.refresh().table(model).get(pk)
+    if reference_type is None:
+        raise model.DoesNotExist(f"{model.__name__} matching query does not exist.")
+    return reference_type
+
+
+def get_translation(name_id: int | None) -> Translation | None:
+    """The translated name of a reference table row, None if it doesn't have one."""
+    if name_id is None:
+        return None
+    translation = reference_data.get().names.get(name_id)
+    if translation is None:
+        translation = reference_data.refresh().names.get(name_id)
+    return translation
+
+
+# Also sent for queryset deletes and cascades, unlike Model.delete overrides.
+# New names are only used once a reference table row points to them.
+@receiver((post_save, post_delete), sender=Treetype)
+@receiver((post_save, post_delete), sender=Sitetype)
+@receiver((post_save, post_delete), sender=Fertilizertype)
+@receiver((post_save, post_delete), sender=Mulchlayertype)
+@receiver((post_save, post_delete), sender=Internationalization)
+def _on_reference_data_change(sender: type[models.Model], *, created: bool = False, **_kwargs):
+    if created and sender is Internationalization:
+        return
+    reference_data.invalidate_now_and_on_commit()
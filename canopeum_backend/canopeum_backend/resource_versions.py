@@ -0,0 +1,157 @@
+import hashlib
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import (
+    SITES_VERSION_KEY,
+    Announcement,
+    Batch,
+    BatchSponsor,
+    Contact,
+    Coordinate,
+    Fertilizertype,
+    Internationalization,
+    Mulchlayertype,
+    Request,
+    ResourceVersion,
+    Site,
+    Sitetype,
+    Treetype,
+    Widget,
+    bump_coordinate_versions,
+    bump_resource_versions,
+    site_version_key,
+)
+
+TREE_TYPES_VERSION_KEY = "tree_types"
+SITE_TYPES_VERSION_KEY = "site_types"
+FERTILIZER_TYPES_VERSION_KEY = "fertilizer_types"
+MULCH_LAYER_TYPES_VERSION_KEY = "mulch_layer_types"
+
+
+def get_etag(*keys: str, extra: object = None):
+    """
+    An opaque ETag of the current versions of these resources, read in a single query.
+    `extra` is anything else the response depends on, like who is asking. Its repr must be stable.
+    """
+    versions = dict(ResourceVersion.objects.filter(key__in=keys).values_list("key", "version"))
+    token = repr(([(key, versions.get(key, 0)) for key in keys], extra))
+    return quote_etag(hashlib.blake2b(token.encode(), digest_size=12).hexdigest())
+
+
+def is_not_modified(request: Request, etag: str):
+    """Whether the If-None-Match header already has this ETag, using the weak comparison of GETs."""
+    if_none_match = request.headers.get("If-None-Match")
+    if not if_none_match:
+        return False
+    client_etags = parse_etags(if_none_match)
+    return "*" in client_etags or etag in (
+        client_etag.removeprefix("W/") for client_etag in client_etags
+    )
+
+
+def conditional_headers(etag: str):
+    # Clients revalidate every time, but can then skip downloading unchanged responses
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+def not_modified_response(etag: str):
+    return Response(status=status.HTTP_304_NOT_MODIFIED, headers=conditional_headers(etag))
+
+
+# Also sent for queryset deletes and cascades, unlike Model.delete overrides.
+# Queryset updates don't send any signal, bump the versions explicitly next to them.
+# Referenced rows are skipped when created, saving what references them bumps the versions.
+
+
+@receiver((post_save, post_delete), sender=Treetype)
+def _on_tree_type_change(**_kwargs):
+    bump_resource_versions(TREE_TYPES_VERSION_KEY)
+
+
+@receiver((post_save, post_delete), sender=Sitetype)
+def _on_site_type_change(**_kwargs):
+    bump_resource_versions(SITE_TYPES_VERSION_KEY)
+
+
+@receiver((post_save, post_delete), sender=Fertilizertype)
+def _on_fertilizer_type_change(**_kwargs):
+    bump_resource_versions(FERTILIZER_TYPES_VERSION_KEY)
+
+
+@receiver((post_save, post_delete), sender=Mulchlayertype)
+def _on_mulch_layer_type_change(**_kwargs):
+    bump_resource_versions(MULCH_LAYER_TYPES_VERSION_KEY)
+
+
+@receiver((post_save, post_delete), sender=Internationalization)
+def _on_internationalization_change(*, created: bool = False, **_kwargs):
+    if created:
+        return
+    # Names of any of the reference tables
+    bump_resource_versions(
+        TREE_TYPES_VERSION_KEY,
+        SITE_TYPES_VERSION_KEY,
+        FERTILIZER_TYPES_VERSION_KEY,
+        MULCH_LAYER_TYPES_VERSION_KEY,
+    )
+
+
+@receiver(post_save, sender=Site)
+def _on_site_save(instance: Site, **_kwargs):
+    # Every site edit would otherwise contend on the single row of the whole map
+    if instance.pop_map_changes():
+        bump_resource_versions(SITES_VERSION_KEY, site_version_key(instance.pk))
+    else:
+        bump_resource_versions(site_version_key(instance.pk))
+
+
+@receiver(post_delete, sender=Site)
+def _on_site_delete(instance: Site, **_kwargs):
+    bump_resource_versions(SITES_VERSION_KEY, site_version_key(instance.pk))
+
+
+@receiver((post_save, post_delete), sender=Coordinate)
+def _on_coordinate_change(instance: Coordinate, *, created: bool = False, **_kwargs):
+    if created:
+        return
+    bump_coordinate_versions(instance.pk)
+
+
+@receiver((post_save, post_delete), sender=Contact)
+def _on_contact_change(instance: Contact, *, created: bool = False, **_kwargs):
+    if created:
+        return
+    site_ids = Site.objects.filter(contact_id=instance.pk).values_list("pk", flat=True)
+    bump_resource_versions(*map(site_version_key, site_ids))
+
+
+@receiver((post_save, post_delete), sender=Announcement)
+def _on_announcement_change(instance: Announcement, *, created: bool = False, **_kwargs):
+    if created:
+        return
+    site_ids = Site.objects.filter(announcement_id=instance.pk).values_list("pk", flat=True)
+    bump_resource_versions(*map(site_version_key, site_ids))
+
+
+@receiver((post_save, post_delete), sender=Batch)
+def _on_batch_change(instance: Batch, **_kwargs):
+    bump_resource_versions(site_version_key(instance.site_id))
+
+
+@receiver((post_save, post_delete), sender=BatchSponsor)
+def _on_batch_sponsor_change(instance: BatchSponsor, *, created: bool = False, **_kwargs):
+    if created:
+        return
+    site_ids = Batch.objects.filter(sponsor_id=instance.pk).values_list("site_id", flat=True)
+    bump_resource_versions(*map(site_version_key, site_ids))
+
+
+@receiver((post_save, post_delete), sender=Widget)
+def _on_widget_change(instance: Widget, **_kwargs):
+    if instance.site_id is not None:
+        bump_resource_versions(site_version_key(instance.site_id))
@@ -1,7 +1,7 @@
 # Pyright does not support duck-typed Meta inner-class
 # pyright: reportIncompatibleVariableOverride=false
 
-from collections.abc import Mapping
+from collections.abc import Iterable, Mapping
 from decimal import Decimal
 from typing import Any, override
 
@@ -15,12 +15,10 @@ from .models import (
     Announcement,
     Asset,
     Batch,
-    Batchfertilizer,
-    Batchmulchlayer,
     BatchSeed,
     BatchSpecies,
     BatchSponsor,
-    BatchSupportedSpecies,
+    ChunkedUpload,
     Comment,
     Contact,
     Coordinate,
@@ -29,6 +27,7 @@ from .models import (
     Like,
     Mulchlayertype,
     Post,
+    Request,
     Role,
     RoleName,
     Site,
@@ -41,6 +40,9 @@ from .models import (
     UserInvitation,
     Widget,
 )
+from .reference_data import Translation, get_reference_type, get_translation
+from .settings import UPLOAD_MAX_SIZE
+from .utils.image_variant_service import variant_name
 from .utils.weather_service import get_weather_data
 
 
@@ -147,13 +149,14 @@ class UserSerializer(serializers.ModelSerializer[User]):
     def get_role(self, obj: User) -> RoleName:
         return RoleName.from_string(obj.role.name)  # type: ignore[no-any-return] # mypy false-positive
 
+    # Going through the related managers lets callers prefetch these for many users at once
     def get_admin_site_ids(self, obj: User) -> list[int]:
-        return [siteadmin.site.pk for siteadmin in Siteadmin.objects.filter(user=obj)]
+        return [siteadmin.site_id for siteadmin in obj.siteadmin_set.all()]
 
     def get_followed_site_ids(self, obj: User) -> list[int]:
         if obj.role.name == RoleName.MegaAdmin:
-            return [site.pk for site in Site.objects.all()]
-        return [site_follower.site.pk for site_follower in SiteFollower.objects.filter(user=obj)]
+            return list(Site.objects.values_list("pk", flat=True))
+        return [site_follower.site_id for site_follower in obj.sitefollower_set.all()]
 
 
 # Note about Any: Generic is the type of "instance", not set here
@@ -204,11 +207,17 @@ class TranslatableSerializerMixin(serializers.Serializer[Any]):
         abstract = True
         fields = ("en", "fr")
 
+    def get_translation(self, obj) -> Translation | None:
+        # Resolved by id from the in-memory reference data, without loading the relation
+        return get_translation(getattr(obj, f"{self.__translate_key__}_id"))
+
     def get_en(self, obj):
-        return InternationalizationSerializer(getattr(obj, self.__translate_key__)).data.get("en")
+        translation = self.get_translation(obj)
+        return translation.en if translation else None
 
     def get_fr(self, obj):
-        return InternationalizationSerializer(getattr(obj, self.__translate_key__)).data.get("fr")
+        translation = self.get_translation(obj)
+        return translation.fr if translation else None
 
 
 class SiteTypeSerializer(serializers.ModelSerializer[Sitetype], TranslatableSerializerMixin):
@@ -255,22 +264,46 @@ class SitetreespeciesSerializer(
     serializers.ModelSerializer[Sitetreespecies], TranslatableSerializerMixin
 ):
     id = serializers.SerializerMethodField()
-    __translate_key__ = "tree_type"
 
     class Meta:
         model = Sitetreespecies
         fields = ("id", "quantity", *TranslatableSerializerMixin.Meta.fields)
 
-    def get_id(self, obj) -> int:
-        return TreeTypeSerializer(obj.tree_type).data.get("id", None)  # type: ignore[no-any-return]
+    def get_id(self, obj: Sitetreespecies) -> int:
+        return obj.tree_type_id
+
+    @override
+    def get_translation(self, obj: Sitetreespecies):
+        # The name of its tree type
+        return get_translation(get_reference_type(Treetype, obj.tree_type_id).name_id)
+
+
+# Note about Any: Generic is the type of "instance", not set here
+class AssetVariantSerializer(serializers.Serializer[Any]):
+    width = serializers.IntegerField()
+    url = serializers.CharField()
 
 
 class AssetSerializer(serializers.ModelSerializer[Asset]):
     asset = serializers.FileField()
+    variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Asset
-        fields = ("id", "asset")
+        fields = ("id", "asset", "variants")
+
+    @extend_schema_field(AssetVariantSerializer(many=True))
+    def get_variants(self, obj: Asset):
+        """Downsized WebP copies of the image, narrowest first. Empty until generated."""
+        request = self.context.get("request")
+        variants = []
+        for width in obj.variant_widths:
+            url = obj.asset.storage.url(variant_name(obj.asset.name, width))
+            # Absolute like the url of the original, see serializers.FileField
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            variants.append({"width": width, "url": url})
+        return variants
 
     @override
     def to_internal_value(self, data):
@@ -352,17 +385,18 @@ class BatchSponsorSerializer(serializers.ModelSerializer[BatchSponsor]):
         instance.name = validated_data.get("name", instance.name)
         instance.url = validated_data.get("url", instance.url)
         logo_data = validated_data.get("logo")
+        old_logo = None
         if logo_data is not None:
             logo_serializer = AssetSerializer(data=logo_data)
             logo_serializer.is_valid()
-            old_logo_asset_to_delete = Asset.objects.get(pk=instance.logo.pk)
+            old_logo = instance.logo
             instance.logo = logo_serializer.save()
-            if old_logo_asset_to_delete is not None:
-                # TODO(NicolasDontigny): The old image file is not deleted from the media folder;
-                # Figure out if that is something we want to do
-                old_logo_asset_to_delete.delete()
 
         instance.save()
+        if old_logo is not None:
+            # Only once the sponsor stopped referencing it, deleting cascades to the sponsor.
+            # Its stored file is only deleted along with the last asset sharing it.
+            old_logo.delete()
         return instance
 
 
@@ -393,7 +427,7 @@ class SiteSocialSerializer(serializers.ModelSerializer[Site]):
 
     @extend_schema_field(BatchSponsorSerializer(many=True))
     def get_sponsors(self, obj: Site):
-        batches = Batch.objects.filter(site=obj)
+        batches = Batch.objects.filter(site=obj).select_related("sponsor__logo")
         sponsors = [batch.sponsor for batch in batches]
         return BatchSponsorSerializer(sponsors, many=True).data
 
@@ -443,49 +477,48 @@ class BatchDetailSerializer(serializers.ModelSerializer[Batch]):
         model = Batch
         fields = "__all__"
 
+    # All getters go through the related managers so they read from BatchQuerySet.with_details
+
     @extend_schema_field(FertilizerTypeSerializer(many=True))
     def get_fertilizers(self, obj: Batch):
-        batch_fertilizers = Batchfertilizer.objects.filter(batch=obj)
         fertilizer_types = [
-            batch_fertilizer.fertilizer_type for batch_fertilizer in batch_fertilizers
+            batch_fertilizer.fertilizer_type for batch_fertilizer in obj.batchfertilizer_set.all()
         ]
-
         return FertilizerTypeSerializer(fertilizer_types, many=True).data
 
     @extend_schema_field(MulchLayerTypeSerializer(many=True))
     def get_mulch_layers(self, obj: Batch):
-        batch_mulch_layers = Batchmulchlayer.objects.filter(batch=obj)
         mulch_layer_types = [
-            batch_mulch_layer.mulch_layer_type for batch_mulch_layer in batch_mulch_layers
+            batch_mulch_layer.mulch_layer_type
+            for batch_mulch_layer in obj.batchmulchlayer_set.all()
         ]
         return MulchLayerTypeSerializer(mulch_layer_types, many=True).data
 
     @extend_schema_field(TreeTypeSerializer(many=True))
     def get_supported_species(self, obj: Batch):
-        batch_supported_species_list = BatchSupportedSpecies.objects.filter(batch=obj)
         supported_species_types = [
             batch_supported_species.tree_type
-            for batch_supported_species in batch_supported_species_list
+            for batch_supported_species in obj.batchsupportedspecies_set.all()
         ]
         return TreeTypeSerializer(supported_species_types, many=True).data
 
     @extend_schema_field(BatchSeedSerializer(many=True))
     def get_seeds(self, obj: Batch):
-        return BatchSeedSerializer(BatchSeed.objects.filter(batch=obj), many=True).data
+        return BatchSeedSerializer(obj.batchseed_set.all(), many=True).data
 
     def get_total_number_seeds(self, obj: Batch) -> int:
         return obj.get_total_number_seeds()
 
     @extend_schema_field(BatchSpeciesSerializer(many=True))
     def get_species(self, obj: Batch):
-        return BatchSpeciesSerializer(BatchSpecies.objects.filter(batch=obj), many=True).data
+        return BatchSpeciesSerializer(obj.batchspecies_set.all(), many=True).data
 
     def get_plant_count(self, obj: Batch) -> int:
         return obj.get_plant_count()
 
     @extend_schema_field(BatchSponsorSerializer)
     def get_sponsor(self, obj: Batch):
-        return BatchSponsorSerializer(BatchSponsor.objects.get(batch=obj)).data
+        return BatchSponsorSerializer(obj.sponsor).data
 
 
 class SiteAdminSerializer(serializers.ModelSerializer[Siteadmin]):
@@ -572,17 +605,14 @@ class SiteSummarySerializer(serializers.ModelSerializer[Site]):
         return obj.get_sponsor_progress()
 
     def get_survived_count(self, obj: Site) -> int:
-        batches = Batch.objects.filter(site=obj)
-        return sum(batch.survived_count or 0 for batch in batches)
+        return obj.get_survived_count()
 
     def get_propagation_count(self, obj: Site) -> int:
-        batches = Batch.objects.filter(site=obj)
-        return sum(batch.total_propagation or 0 for batch in batches)
+        return obj.get_propagation_count()
 
     @extend_schema_field(BatchDetailSerializer(many=True))
-    def get_batches(self, obj):
-        batches = obj.batch_set.all().order_by("-updated_at")
-        return BatchDetailSerializer(batches, many=True).data
+    def get_batches(self, obj: Site):
+        return BatchDetailSerializer(obj.get_batches(), many=True).data
 
 
 class SiteSummaryDetailSerializer(serializers.ModelSerializer[Site]):
@@ -622,16 +652,14 @@ class SiteSummaryDetailSerializer(serializers.ModelSerializer[Site]):
         return obj.get_sponsor_progress()
 
     def get_survived_count(self, obj: Site) -> int:
-        batches = Batch.objects.filter(site=obj)
-        return sum(batch.survived_count or 0 for batch in batches)
+        return obj.get_survived_count()
 
     def get_propagation_count(self, obj: Site) -> int:
-        batches = Batch.objects.filter(site=obj)
-        return sum(batch.total_propagation or 0 for batch in batches)
+        return obj.get_propagation_count()
 
     @extend_schema_field(BatchSponsorSerializer(many=True))
-    def get_sponsors(self, obj):
-        batches = Batch.objects.filter(site=obj)
+    def get_sponsors(self, obj: Site):
+        batches = sorted(obj.get_batches(), key=lambda batch: batch.pk)
         sponsors = [batch.sponsor for batch in batches]
         return BatchSponsorSerializer(sponsors, many=True).data
 
@@ -641,9 +669,8 @@ class SiteSummaryDetailSerializer(serializers.ModelSerializer[Site]):
         return WeatherSerializer(weather).data
 
     @extend_schema_field(BatchDetailSerializer(many=True))
-    def get_batches(self, obj):
-        batches = obj.batch_set.all().order_by("-updated_at")
-        return BatchDetailSerializer(batches, many=True).data
+    def get_batches(self, obj: Site):
+        return BatchDetailSerializer(obj.get_batches(), many=True).data
 
 
 class SiteMapSerializer(serializers.ModelSerializer[Site]):
@@ -656,6 +683,19 @@ class SiteMapSerializer(serializers.ModelSerializer[Site]):
         fields = ("id", "name", "site_type", "coordinate", "image")
 
 
+# Note about Any: Generic is the type of "instance", not set here
+class SiteMapClusterSerializer(serializers.Serializer[Any]):
+    latitude = serializers.FloatField()
+    longitude = serializers.FloatField()
+    count = serializers.IntegerField()
+
+
+# Note about Any: Generic is the type of "instance", not set here
+class SiteMapViewportSerializer(serializers.Serializer[Any]):
+    sites = SiteMapSerializer(many=True)
+    clusters = SiteMapClusterSerializer(many=True)
+
+
 class SiteOverviewSerializer(serializers.ModelSerializer[Site]):
     image = AssetSerializer()
 
@@ -670,10 +710,19 @@ class PostPostSerializer(serializers.ModelSerializer[Post]):
         fields = ("site", "body", "media")
 
 
+class ChunkedUploadSerializer(serializers.ModelSerializer[ChunkedUpload]):
+    size = serializers.IntegerField(min_value=1, max_value=UPLOAD_MAX_SIZE)
+
+    class Meta:
+        model = ChunkedUpload
+        fields = ("id", "filename", "size", "offset", "asset")
+        read_only_fields = ("id", "offset", "asset")
+
+
 class PostSerializer(serializers.ModelSerializer[Post]):
     site = SiteOverviewSerializer()
-    comment_count = serializers.SerializerMethodField()
-    like_count = serializers.SerializerMethodField()
+    comment_count = serializers.IntegerField(read_only=True)
+    like_count = serializers.IntegerField(read_only=True)
     has_liked = serializers.SerializerMethodField()
     media = AssetSerializer(many=True)
 
@@ -691,15 +740,20 @@ class PostSerializer(serializers.ModelSerializer[Post]):
             "media",
         )
 
-    @extend_schema_field(serializers.IntegerField())
-    def get_comment_count(self, obj):
-        return obj.comment_set.count()
-
-    @extend_schema_field(serializers.IntegerField())
-    def get_like_count(self, obj: Post):
-        return Like.objects.filter(post=obj).count()
+    @staticmethod
+    def get_context(request: Request, posts: Iterable[Post]):
+        """The context to serialize `posts` with, their likes resolved in a single query."""
+        user = request.user
+        liked_post_ids: set[int] = set()
+        if not user.is_anonymous:
+            liked_posts = Like.objects.filter(user=user, post__in=[post.pk for post in posts])
+            liked_post_ids.update(liked_posts.values_list("post", flat=True))
+        return {"request": request, "liked_post_ids": liked_post_ids}
 
     def get_has_liked(self, obj: Post) -> bool:
+        liked_post_ids = self.context.get("liked_post_ids")
+        if liked_post_ids is not None:
+            return obj.pk in liked_post_ids
         user = self.context["request"].user
         if user.is_anonymous:
             return False
@@ -708,7 +762,8 @@ class PostSerializer(serializers.ModelSerializer[Post]):
 
 # Note about Any: Generic is the type of "instance", not set here
 class PostPaginationSerializer(serializers.Serializer[Any]):
-    count = serializers.IntegerField()
+    # Not counted with cursor pagination
+    count = serializers.IntegerField(required=False)
     next = serializers.CharField(required=False)
     previous = serializers.CharField(required=False)
     results = PostSerializer(many=True)
@@ -733,12 +788,21 @@ class CommentSerializer(serializers.ModelSerializer[Comment]):
         fields = ("id", "body", "author_id", "author_username", "created_at")
 
     def get_author_id(self, obj: Comment) -> int:
-        return obj.user.id
+        return obj.user_id
 
     def get_author_username(self, obj: Comment):
         return obj.user.username
 
 
+# Note about Any: Generic is the type of "instance", not set here
+class CommentPaginationSerializer(serializers.Serializer[Any]):
+    next = serializers.CharField(required=False)
+    results = CommentSerializer(many=True)
+
+    class Meta:
+        fields = ("next", "results")
+
+
 class LikePostSerializer(serializers.ModelSerializer[Like]):
     class Meta:
         model = Like
@@ -82,7 +82,7 @@ CORS_ALLOWED_ORIGINS = [
     "https://releaftrees.life",
 ]
 
-CORS_ALLOW_HEADERS = (*default_headers, "Access-Control-Allow-Origin")
+CORS_ALLOW_HEADERS = (*default_headers, "Access-Control-Allow-Origin", "Upload-Offset")
 
 CORS_ORIGIN_WHITELIST = [
     "http://localhost:5173",
@@ -101,7 +101,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    "djangorestframework_camel_case.middleware.CamelCaseMiddleWare",
+    "canopeum_backend.camel_case.CamelCaseMiddleWare",
 ]
 
 
@@ -125,20 +125,28 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "canopeum_backend.wsgi.application"
 
+# "json" or "orjson", the latter renders large responses several times faster
+# but needs `orjson` installed, which isn't a dependency
+JSON_RENDERER = get_secret("JSON_RENDERER_CANOPEUM", "json")
+JSON_RENDERER_CLASSES = {
+    "json": "canopeum_backend.camel_case.CamelCaseJSONRenderer",
+    "orjson": "canopeum_backend.camel_case.CamelCaseORJSONRenderer",
+}
+
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_RENDERER_CLASSES": [
-        "djangorestframework_camel_case.render.CamelCaseJSONRenderer",
-        "djangorestframework_camel_case.render.CamelCaseBrowsableAPIRenderer",
+        JSON_RENDERER_CLASSES[JSON_RENDERER],
+        "canopeum_backend.camel_case.CamelCaseBrowsableAPIRenderer",
     ],
     "DEFAULT_PARSER_CLASSES": [
-        "djangorestframework_camel_case.parser.CamelCaseJSONParser",
-        "djangorestframework_camel_case.parser.CamelCaseFormParser",
+        "canopeum_backend.camel_case.CamelCaseJSONParser",
+        "canopeum_backend.camel_case.CamelCaseFormParser",
         # TODO: Figure out why this breaks *some* Views' API generation (adds multiple body params)
-        # "djangorestframework_camel_case.parser.CamelCaseMultiPartParser",
+        # "canopeum_backend.camel_case.CamelCaseMultiPartParser",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "canopeum_backend.authentication.CachedUserJWTAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
@@ -194,6 +202,26 @@ DATABASES = {
     ),
 }
 
+# Cache shared by the worker processes, see `canopeum_backend.utils.versioned_cache`
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# A Redis URL, like redis://localhost:6379.
+# Otherwise, and when running Django tests, every process has its own in-memory cache.
+CACHE_URL = get_secret("CACHE_URL_CANOPEUM", "")
+CACHES = {
+    "default": (
+        {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "OPTIONS": {"MAX_ENTRIES": 10_000},
+        }
+        if sys.argv[1] == "test" or not CACHE_URL
+        else {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_URL,
+            "KEY_PREFIX": "canopeum",
+        }
+    ),
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -232,6 +260,13 @@ STATIC_URL = "static/"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "canopeum_backend/media"
 
+# Resumable uploads of post media, see ChunkedUpload.
+# A chunk is read in memory, so its maximum size caps the memory held per upload.
+UPLOAD_MAX_SIZE = int(get_secret("UPLOAD_MAX_SIZE_CANOPEUM", str(500 * 1024 * 1024)))
+UPLOAD_CHUNK_MAX_SIZE = 8 * 1024 * 1024
+# Unfinished or unused uploads are deleted after that by `delete_stale_uploads`
+UPLOAD_EXPIRY_HOURS = 24
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -240,3 +275,18 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 APPEND_SLASH = False
 
 GOOGLE_API_KEY = get_secret("GOOGLE_API_KEY_CANOPEUM", "")
+# "google" or "fake", the latter works offline
+GEOCODER = get_secret("GEOCODER_CANOPEUM", "google")
+# Save sites right away with a pending address, filled in by a background worker
+GEOCODE_IN_BACKGROUND = get_secret("GEOCODE_IN_BACKGROUND_CANOPEUM", "False") == "True"
+
+# Copy new posts to the feed of the followers of their site ("fan-out on write"),
+# so reading the feed of followed sites doesn't depend on how many are followed.
+# Fill the feeds with `rebuild_feeds` when enabling it.
+FEED_FAN_OUT_ON_WRITE = get_secret("FEED_FAN_OUT_ON_WRITE_CANOPEUM", "False") == "True"
+
+# "pillow", "none" or "fake", generates the downsized variants of uploaded images
+IMAGE_RESIZER = get_secret("IMAGE_RESIZER_CANOPEUM", "pillow")
+
+# Can be pointed to a local stub server for testing
+OPEN_METEO_URL = get_secret("OPEN_METEO_URL_CANOPEUM", "https://api.open-meteo.com/v1/forecast")
@@ -0,0 +1,86 @@
+from collections.abc import Mapping, Sequence
+from typing import TypedDict
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Batch, Site, site_namespace
+from .utils.versioned_cache import (
+    CacheKey,
+    get_many_or_set,
+    invalidate_namespaces_now_and_on_commit,
+)
+
+# Bounds how long a write that didn't go through a model signal can be missed
+SITE_SUMMARY_COUNTS_TIMEOUT_SECONDS = 24 * 3600
+
+
+class SiteSummaryCounts(TypedDict):
+    plant_count: int
+    sponsored_plant_count: int
+    survived_count: int
+    propagation_count: int
+
+
+def site_summary_counts_key(site_id: int) -> CacheKey[SiteSummaryCounts]:
+    return CacheKey(site_namespace(site_id), "summary_counts", SITE_SUMMARY_COUNTS_TIMEOUT_SECONDS)
+
+
+def _load_site_summary_counts(site_ids: Mapping[CacheKey[SiteSummaryCounts], int]):
+    rows = (
+        Site.objects.filter(pk__in=site_ids.values())
+        .with_summary_counts()
+        .values_list(
+            "pk",
+            "annotated_plant_count",
+            "annotated_sponsored_plant_count",
+            "annotated_survived_count",
+            "annotated_propagation_count",
+        )
+    )
+    counts = {
+        pk: SiteSummaryCounts(
+            plant_count=plant_count,
+            sponsored_plant_count=sponsored_plant_count,
+            survived_count=survived_count,
+            propagation_count=propagation_count,
+        )
+        for pk, plant_count, sponsored_plant_count, survived_count, propagation_count in rows
+    }
+    return {key: counts[site_id] for key, site_id in site_ids.items()}
+
+
+def prefetch_site_summary_counts(sites: Sequence[Site]):
+    """
+    Set the analytics totals read by the `Site.get_*_count` methods, like
+    `SiteQuerySet.with_summary_counts` does, from the shared cache when possible.
+    The missing ones are aggregated in a single query.
+    """
+    sites_by_key = {site_summary_counts_key(site.pk): site for site in sites}
+    counts = get_many_or_set(
+        sites_by_key.keys(),
+        lambda missing_keys: _load_site_summary_counts({
+            key: sites_by_key[key].pk for key in missing_keys
+        }),
+    )
+    for site in sites:
+        for name, count in counts[site_summary_counts_key(site.pk)].items():
+            setattr(site, f"annotated_{name}", count)
+    return sites
+
+
+# Only the summary totals are cached under a site, so only the tables they're aggregated from
+# invalidate it. Also sent for queryset deletes and cascades, unlike Model.delete overrides.
+# Listening to the rows of large tables would prevent their fast deletes, so they aren't:
+# the species of sites and batches are written in the same transaction as saving their site
+# or batch, which invalidates the namespace again once committed.
+
+
+@receiver((post_save, post_delete), sender=Site)
+def _on_site_change(instance: Site, **_kwargs):
+    invalidate_namespaces_now_and_on_commit(site_namespace(instance.pk))
+
+
+@receiver((post_save, post_delete), sender=Batch)
+def _on_batch_change(instance: Batch, **_kwargs):
+    invalidate_namespaces_now_and_on_commit(site_namespace(instance.site_id))
@@ -0,0 +1,54 @@
+from dataclasses import dataclass
+
+MAX_LATITUDE = 90
+MAX_LONGITUDE = 180
+MAX_ZOOM = 22
+# From this zoom level on, the map shows every site instead of clusters
+CLUSTER_MAX_ZOOM = 12
+# Clustering cells are a quarter of a map tile wide, about 64 pixels on 256 pixels tiles
+CELLS_PER_TILE = 4
+
+
+@dataclass(frozen=True, slots=True)
+class MapViewport:
+    """The part of the map being looked at, in decimal degrees, and its zoom level."""
+
+    west: float
+    south: float
+    east: float
+    north: float
+    zoom: int
+
+    @classmethod
+    def parse(cls, bbox: str | None, zoom: str | None):
+        """Parse a `west,south,east,north` bbox and a zoom level, None when they're invalid."""
+        if bbox is None or zoom is None or not zoom.isdecimal():
+            return None
+        try:
+            west, south, east, north = map(float, bbox.split(","))
+        except ValueError:
+            return None
+        # Also rejects nan and infinities
+        if (
+            not (
+                -MAX_LONGITUDE <= west <= MAX_LONGITUDE
+                and -MAX_LONGITUDE <= east <= MAX_LONGITUDE
+                and -MAX_LATITUDE <= south <= north <= MAX_LATITUDE
+            )
+            or int(zoom) > MAX_ZOOM
+        ):
+            return None
+        return cls(west, south, east, north, int(zoom))
+
+    @property
+    def bounding_box(self):
+        return (self.west, self.south, self.east, self.north)
+
+    @property
+    def is_clustered(self):
+        return self.zoom < CLUSTER_MAX_ZOOM
+
+    @property
+    def cell_size(self):
+        """Width of the clustering cells in degrees, halving with every zoom level like tiles."""
+        return 360 / 2**self.zoom / CELLS_PER_TILE
@@ -15,6 +15,13 @@ urlpatterns = [
     # Post
     path("social/posts/", views.PostListAPIView.as_view(), name="post-list"),
     path("social/posts/<int:postId>/", views.PostDetailAPIView.as_view(), name="post-detail"),
+    # Upload
+    path("social/uploads/", views.ChunkedUploadListAPIView.as_view(), name="upload-list"),
+    path(
+        "social/uploads/<uuid:uploadId>/",
+        views.ChunkedUploadDetailAPIView.as_view(),
+        name="upload-detail",
+    ),
     # Comment
     path(
         "social/posts/<int:postId>/comments/",
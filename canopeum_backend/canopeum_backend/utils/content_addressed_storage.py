@@ -0,0 +1,33 @@
+import hashlib
+from pathlib import PurePosixPath
+from typing import Any
+
+from django.core.files import File  # Only generic in the stubs, hence the quoted annotations
+from django.core.files.storage import Storage
+
+# Uploads are hashed from their temporary file in chunks, never loaded in memory at once
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+def content_addressed_name(file: "File[Any]"):
+    """
+    `blobs/<first 2 characters>/<SHA-256 of the content><extension>`,
+    so identical files share one stored name however they were named when uploaded.
+    """
+    digest = hashlib.sha256()
+    for chunk in file.chunks(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+    file.seek(0)
+    hexdigest = digest.hexdigest()
+    suffix = PurePosixPath(file.name or "").suffix.lower()
+    return f"blobs/{hexdigest[:2]}/{hexdigest}{suffix}"
+
+
+def store_blob(storage: Storage, name: str, file: "File[Any]"):
+    """Store the content under its content addressed `name`, unless it already is."""
+    if storage.exists(name):
+        return
+    stored_name = storage.save(name, file)
+    if stored_name != name:
+        # Stored concurrently, the storage suffixed this identical copy
+        storage.delete(stored_name)
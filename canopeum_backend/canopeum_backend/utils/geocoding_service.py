@@ -0,0 +1,171 @@
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Executor, ThreadPoolExecutor
+from decimal import Decimal
+from typing import Any, Protocol, TypeAlias
+
+import googlemaps
+from googlemaps.geocoding import reverse_geocode
+
+from canopeum_backend.settings import GEOCODER, GOOGLE_API_KEY
+from canopeum_backend.utils.versioned_cache import CacheKey
+
+logger = logging.getLogger(__name__)
+
+# 4 decimals is ~11m, finer than what the DMS coordinates entered for a site usually are
+ADDRESS_CELL_DECIMALS = 4
+ADDRESS_CACHE_SIZE = 4096
+# Addresses hardly ever change, this mostly lets unused ones leave the shared cache
+ADDRESS_SHARED_TIMEOUT_SECONDS = 30 * 24 * 3600
+PENDING_ADDRESS = "Pending location"
+UNRETRIEVABLE_ADDRESS = "Unretrievable location"
+
+AddressCell: TypeAlias = tuple[float, float]
+
+
+class Geocoder(Protocol):
+    """Finds the address of coordinates upstream. Swap it to work offline."""
+
+    def reverse_geocode(self, latitude: float, longitude: float) -> str: ...
+
+
+class GoogleGeocoder:
+    def __init__(self, api_key: str = GOOGLE_API_KEY):
+        self.client = googlemaps.Client(key=api_key) if api_key else None
+
+    def reverse_geocode(self, latitude: float, longitude: float) -> str:
+        if self.client is None:
+            return "Missing Google API Key"
+
+        data_retrieved: list[dict[str, Any]] = reverse_geocode(
+            self.client,
+            (latitude, longitude),
+            # https://developers.google.com/maps/documentation/geocoding/requests-reverse-geocoding
+            result_type=[
+                # Gives lots of good civil administrations polygons,
+                # automatically includes many administrative_area_level
+                "political",
+                # Direct address, if possible
+                "street_address",
+            ],
+        )
+        # Naive way to get the location we want, longer name usually means more precise
+        data_retrieved = sorted(
+            data_retrieved, key=lambda location: len(location["formatted_address"])
+        )
+        formatted_address: str = (
+            data_retrieved[0]["formatted_address"] if data_retrieved else UNRETRIEVABLE_ADDRESS
+        )
+        return formatted_address
+
+
+class FakeGeocoder:
+    """Deterministic offline geocoder, for tests and local development without an API key."""
+
+    def __init__(self):
+        self.lookups: list[AddressCell] = []
+
+    def reverse_geocode(self, latitude: float, longitude: float) -> str:
+        self.lookups.append((latitude, longitude))
+        return f"Near {latitude:.4f}, {longitude:.4f}"
+
+
+GEOCODERS: dict[str, Callable[[], Geocoder]] = {
+    "google": GoogleGeocoder,
+    "fake": FakeGeocoder,
+}
+
+
+def to_address_cell(latitude: float | Decimal, longitude: float | Decimal) -> AddressCell:
+    return (
+        round(float(latitude), ADDRESS_CELL_DECIMALS),
+        round(float(longitude), ADDRESS_CELL_DECIMALS),
+    )
+
+
+def address_key(cell: AddressCell) -> CacheKey[str]:
+    return CacheKey("addresses", "{},{}".format(*cell), ADDRESS_SHARED_TIMEOUT_SECONDS)
+
+
+class GeocodingService:
+    """
+    Reverse geocoding with an in-memory LRU cache per rounded coordinates.
+    When `shared`, the addresses missing from it are then looked up in the cache shared
+    with the other processes, before asking the geocoder.
+
+    Lookups can also run in the background, so saving a site doesn't block on the geocoder.
+    """
+
+    def __init__(
+        self,
+        geocoder: Geocoder,
+        executor: Executor | None = None,
+        cache_size: int = ADDRESS_CACHE_SIZE,
+        *,
+        shared: bool = False,
+    ):
+        self.geocoder = geocoder
+        self.shared = shared
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="geocoding"
+        )
+        self.cache_size = cache_size
+        self._addresses: OrderedDict[AddressCell, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_cached_address(
+        self, latitude: float | Decimal, longitude: float | Decimal
+    ) -> str | None:
+        cell = to_address_cell(latitude, longitude)
+        with self._lock:
+            address = self._addresses.get(cell)
+            if address is not None:
+                self._addresses.move_to_end(cell)
+        return address
+
+    def reverse_geocode(self, latitude: float | Decimal, longitude: float | Decimal) -> str:
+        """The address of the coordinates, from the cache if possible."""
+        address = self.get_cached_address(latitude, longitude)
+        if address is not None:
+            return address
+
+        cell = to_address_cell(latitude, longitude)
+        if self.shared:
+            address = address_key(cell).get_or_set(lambda: self.geocoder.reverse_geocode(*cell))
+        else:
+            address = self.geocoder.reverse_geocode(*cell)
+        with self._lock:
+            self._addresses[cell] = address
+            if len(self._addresses) > self.cache_size:
+                self._addresses.popitem(last=False)
+        return address
+
+    def reverse_geocode_in_background(
+        self,
+        latitude: float | Decimal,
+        longitude: float | Decimal,
+        on_address: Callable[[str], object],
+    ):
+        """Look the address up in the background then hand it to `on_address`."""
+        self.executor.submit(self._reverse_geocode_job, latitude, longitude, on_address)
+
+    def _reverse_geocode_job(
+        self,
+        latitude: float | Decimal,
+        longitude: float | Decimal,
+        on_address: Callable[[str], object],
+    ):
+        try:
+            on_address(self.reverse_geocode(latitude, longitude))
+        except Exception:
+            # The address stays pending, `fill_pending_addresses` can retry it
+            logger.exception("Could not geocode %s, %s", latitude, longitude)
+
+
+geocoding_service = GeocodingService(
+    GEOCODERS[GEOCODER](),
+    # Without an API key, Google gives a placeholder that shouldn't outlive the process
+    shared=GEOCODER != "google" or bool(GOOGLE_API_KEY),
+)
@@ -0,0 +1,144 @@
+import logging
+from collections.abc import Callable, Iterable
+from concurrent.futures import Executor, ThreadPoolExecutor
+from io import BytesIO
+from typing import IO, Protocol
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import Storage, default_storage
+
+from canopeum_backend.settings import IMAGE_RESIZER
+
+logger = logging.getLogger(__name__)
+
+# Thumbnails, phone screens and desktop screens
+VARIANT_WIDTHS = (160, 480, 1280)
+WEBP_QUALITY = 80
+
+
+def variant_name(name: str, width: int):
+    """Where the variant of the stored file `name` is stored, next to the other variants."""
+    return f"variants/{name}-{width}w.webp"
+
+
+class ImageResizer(Protocol):
+    """Downsizes images to WebP. Swap it to run without Pillow."""
+
+    def resize(self, image_file: IO[bytes], widths: Iterable[int]) -> dict[int, bytes]:
+        """
+        The WebP encoded image for each width narrower than the original,
+        none if the file isn't an image.
+        """
+        ...
+
+
+class PillowResizer:
+    def resize(self, image_file: IO[bytes], widths: Iterable[int]) -> dict[int, bytes]:
+        from PIL import Image, ImageOps, UnidentifiedImageError  # noqa: PLC0415 # Only in workers
+
+        try:
+            image: Image.Image = Image.open(image_file)
+            image.load()
+        except UnidentifiedImageError:
+            return {}
+        # Photos from phones are often stored sideways with an orientation tag
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in {"RGB", "RGBA"}:
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+
+        variants: dict[int, bytes] = {}
+        for width in sorted(widths):
+            if width >= image.width:
+                break
+            height = max(1, round(image.height * width / image.width))
+            output = BytesIO()
+            image.resize((width, height), Image.Resampling.LANCZOS).save(
+                output, "WEBP", quality=WEBP_QUALITY
+            )
+            variants[width] = output.getvalue()
+        return variants
+
+
+class NoResizer:
+    """Keeps only the original files, for environments without Pillow."""
+
+    def resize(self, image_file: IO[bytes], widths: Iterable[int]) -> dict[int, bytes]:
+        return {}
+
+
+class FakeResizer:
+    """Deterministic resizer for tests, every file is an image 1000px wide."""
+
+    ORIGINAL_WIDTH = 1000
+
+    def __init__(self):
+        self.resized: list[bytes] = []
+
+    def resize(self, image_file: IO[bytes], widths: Iterable[int]) -> dict[int, bytes]:
+        content = image_file.read()
+        self.resized.append(content)
+        return {
+            width: f"{width}w ".encode() + content
+            for width in widths
+            if width < self.ORIGINAL_WIDTH
+        }
+
+
+RESIZERS: dict[str, Callable[[], ImageResizer]] = {
+    "pillow": PillowResizer,
+    "none": NoResizer,
+    "fake": FakeResizer,
+}
+
+
+class ImageVariantService:
+    """
+    Stores downsized WebP variants of uploaded images, so clients can download a fraction
+    of the bytes of the original. They are generated in the background after an upload.
+    """
+
+    def __init__(
+        self,
+        resizer: ImageResizer,
+        storage: Storage | None = None,
+        executor: Executor | None = None,
+        widths: Iterable[int] = VARIANT_WIDTHS,
+    ):
+        self.resizer = resizer
+        self.storage = storage or default_storage
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="image-variants"
+        )
+        self.widths = tuple(widths)
+
+    def generate(self, name: str):
+        """Store the variants of the stored file `name`, returns their widths."""
+        with self.storage.open(name, "rb") as image_file:
+            variants = self.resizer.resize(image_file, self.widths)
+        for width, content in variants.items():
+            path = variant_name(name, width)
+            # Generating again must not pile up copies with random suffixes
+            if self.storage.exists(path):
+                self.storage.delete(path)
+            self.storage.save(path, ContentFile(content))
+        return sorted(variants)
+
+    def delete(self, name: str):
+        """Delete the variants of the stored file `name`, along with the file itself."""
+        for width in self.widths:
+            self.storage.delete(variant_name(name, width))
+        self.storage.delete(name)
+
+    def generate_in_background(self, name: str, on_widths: Callable[[list[int]], object]):
+        """Generate the variants in the background then hand their widths to `on_widths`."""
+        self.executor.submit(self._generate_job, name, on_widths)
+
+    def _generate_job(self, name: str, on_widths: Callable[[list[int]], object]):
+        try:
+            on_widths(self.generate(name))
+        except Exception:
+            # The original is still served, `generate_image_variants` can retry it
+            logger.exception("Could not generate the variants of %s", name)
+
+
+image_variant_service = ImageVariantService(RESIZERS[IMAGE_RESIZER]())
@@ -0,0 +1,50 @@
+import threading
+import time
+from collections.abc import Callable, Hashable
+from typing import Generic, TypeVar
+
+from django.db import transaction
+
+_K = TypeVar("_K", bound=Hashable)
+_V = TypeVar("_V")
+
+
+class TTLCache(Generic[_K, _V]):
+    """Thread-safe in-process mapping whose entries expire after `ttl` seconds."""
+
+    def __init__(self, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: dict[_K, tuple[_V, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: _K) -> _V | None:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or self.clock() - entry[1] >= self.ttl:
+            return None
+        return entry[0]
+
+    def get_or_load(self, key: _K, load: Callable[[], _V]) -> _V:
+        value = self.get(key)
+        if value is None:
+            # Timestamped before loading, so a slow load can't extend the entry's lifetime
+            loaded_at = self.clock()
+            value = load()
+            with self._lock:
+                self._entries[key] = (value, loaded_at)
+        return value
+
+    def pop(self, key: _K):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def invalidate_now_and_on_commit(cache: TTLCache[_K, _V], key: _K):
+    cache.pop(key)
+    # Another request could have cached the old rows before this transaction commits
+    transaction.on_commit(lambda: cache.pop(key))
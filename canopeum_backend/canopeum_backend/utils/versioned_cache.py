@@ -0,0 +1,95 @@
+"""
+Values shared between the worker processes through Django's cache, see `CACHES` in settings.
+
+Keys are typed and grouped in namespaces, like every key of a site. Each namespace has a version
+stored next to its keys: invalidating the namespace forgets its version, so all of its keys are
+missed at once without having to find them. The orphaned values expire on their own.
+"""
+
+import time
+from collections.abc import Callable, Collection, Iterable, Mapping
+from dataclasses import dataclass
+from typing import Any, Generic, TypeAlias, TypeVar
+
+from django.core.cache import cache
+from django.db import transaction
+
+Namespace: TypeAlias = str
+
+_T = TypeVar("_T")
+
+
+@dataclass(frozen=True, slots=True)
+class CacheKey(Generic[_T]):
+    """A value of type `_T` in a namespace, kept at most `timeout` seconds."""
+
+    namespace: Namespace
+    name: str
+    timeout: float
+
+    def get_or_set(self, load: Callable[[], _T]) -> _T:
+        return get_many_or_set([self], lambda _missing: {self: load()})[self]
+
+
+def _version_key(namespace: Namespace):
+    return f"{namespace}:version"
+
+
+def get_namespace_versions(namespaces: Iterable[Namespace]) -> dict[Namespace, int]:
+    version_keys = {namespace: _version_key(namespace) for namespace in namespaces}
+    versions = cache.get_many(version_keys.values())
+    for version_key in version_keys.values():
+        if version_key in versions:
+            continue
+        # A clock rather than a counter, so a forgotten version is never reused
+        version = time.time_ns()
+        if not cache.add(version_key, version, timeout=None):
+            # Another process started the namespace first
+            version = cache.get(version_key, version)
+        versions[version_key] = version
+    return {namespace: versions[version_key] for namespace, version_key in version_keys.items()}
+
+
+def _to_cache_keys(keys: Iterable[CacheKey[_T]]):
+    keys = list(keys)
+    versions = get_namespace_versions({key.namespace for key in keys})
+    return {key: f"{key.namespace}:{versions[key.namespace]}:{key.name}" for key in keys}
+
+
+def get_many_or_set(
+    keys: Collection[CacheKey[_T]],
+    load_missing: Callable[[list[CacheKey[_T]]], Mapping[CacheKey[_T], _T]],
+) -> dict[CacheKey[_T], _T]:
+    """
+    The values of the keys, in two round trips to the cache.
+    The missing ones are loaded together by `load_missing` then stored.
+    """
+    cache_keys = _to_cache_keys(keys)
+    stored_values: dict[str, Any] = cache.get_many(cache_keys.values())
+    values = {
+        key: stored_values[cache_key]
+        for key, cache_key in cache_keys.items()
+        if cache_key in stored_values
+    }
+    missing_keys = [key for key in cache_keys if key not in values]
+    if not missing_keys:
+        return values
+
+    loaded_values = load_missing(missing_keys)
+    # Stored under the versions read before loading, so an invalidation in between wins
+    values_by_timeout: dict[float, dict[str, _T]] = {}
+    for key, value in loaded_values.items():
+        values_by_timeout.setdefault(key.timeout, {})[cache_keys[key]] = value
+    for timeout, timeout_values in values_by_timeout.items():
+        cache.set_many(timeout_values, timeout)
+    return values | dict(loaded_values)
+
+
+def invalidate_namespaces(*namespaces: Namespace):
+    cache.delete_many([_version_key(namespace) for namespace in namespaces])
+
+
+def invalidate_namespaces_now_and_on_commit(*namespaces: Namespace):
+    invalidate_namespaces(*namespaces)
+    # Another process could have cached the old rows before this transaction commits
+    transaction.on_commit(lambda: invalidate_namespaces(*namespaces))
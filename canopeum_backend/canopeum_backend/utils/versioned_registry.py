@@ -0,0 +1,81 @@
+import threading
+import time
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+from django.db import transaction
+
+_T = TypeVar("_T")
+
+
+@dataclass(frozen=True, slots=True)
+class _Entry(Generic[_T]):
+    snapshot: _T
+    version: Hashable
+    checked_at: float
+
+
+class VersionedRegistry(Generic[_T]):
+    """
+    Thread-safe in-process snapshot of rarely changing data, loaded once and kept until invalidated.
+
+    Invalidating only reaches this process, so after `revalidate_after` seconds the snapshot is
+    checked against `get_version`, which is expected to be a lot cheaper than `load`,
+    and only reloaded when another process changed it.
+    """
+
+    def __init__(
+        self,
+        load: Callable[[], _T],
+        get_version: Callable[[], Hashable],
+        revalidate_after: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.load = load
+        self.get_version = get_version
+        self.revalidate_after = revalidate_after
+        self.clock = clock
+        self._entry: _Entry[_T] | None = None
+        # Incremented on invalidation, so a load that started before can't store its stale snapshot
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self) -> _T:
+        with self._lock:
+            entry, generation = self._entry, self._generation
+        if entry is None:
+            return self.refresh()
+        checked_at = self.clock()
+        if checked_at - entry.checked_at < self.revalidate_after:
+            return entry.snapshot
+        if self.get_version() != entry.version:
+            return self.refresh()
+        self._store(generation, _Entry(entry.snapshot, entry.version, checked_at))
+        return entry.snapshot
+
+    def refresh(self) -> _T:
+        """Reload the snapshot, for example when it is missing something that was just created."""
+        with self._lock:
+            generation = self._generation
+        checked_at = self.clock()
+        # Read before loading, so a write during the load is caught by the next revalidation
+        version = self.get_version()
+        snapshot = self.load()
+        self._store(generation, _Entry(snapshot, version, checked_at))
+        return snapshot
+
+    def invalidate(self):
+        with self._lock:
+            self._entry = None
+            self._generation += 1
+
+    def invalidate_now_and_on_commit(self):
+        self.invalidate()
+        # Another request could have loaded the old rows before this transaction commits
+        transaction.on_commit(self.invalidate)
+
+    def _store(self, generation: int, entry: _Entry[_T]):
+        with self._lock:
+            if self._generation == generation:
+                self._entry = entry
@@ -1,7 +1,22 @@
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from concurrent.futures import Executor, ThreadPoolExecutor
+from decimal import Decimal
+from itertools import batched, starmap
+from typing import Protocol, TypeAlias, TypedDict
+
 import openmeteo_requests
 import requests_cache
+from openmeteo_sdk.WeatherApiResponse import WeatherApiResponse
 from retry_requests import retry
 
+from canopeum_backend.settings import OPEN_METEO_URL
+from canopeum_backend.utils.versioned_cache import CacheKey, get_many_or_set
+
+logger = logging.getLogger(__name__)
+
 WMO_Categories = {
     0: "Clear sky",
     1: "Mainly clear",
@@ -33,38 +48,207 @@ WMO_Categories = {
     99: "Thunderstorm with heavy hail",
 }
 
+# Weather doesn't meaningfully change within a 0.1° (~11km) cell, so nearby sites share an entry
+GRID_CELL_DECIMALS = 1
+CACHE_TTL_SECONDS = 3600
+# Keeps the multi-location request URLs at a reasonable length
+LOCATIONS_PER_REQUEST = 100
+
+GridCell: TypeAlias = tuple[float, float]
+SiteCoordinates: TypeAlias = Mapping[int, tuple[float | Decimal, float | Decimal]]
+
+
+class Weather(TypedDict):
+    temperature: float
+    humidity: float
+    description: str
+
+
+UNKNOWN_WEATHER = Weather(temperature=0.0, humidity=0.0, description="Unknown weather")
+
 
-def get_weather_data(latitude: float, longitude: float):
-    cache_session = requests_cache.CachedSession(".cache", expire_after=3600)
-    retry_session = retry(cache_session, retries=5, backoff_factor=0.2)
-    openmeteo = openmeteo_requests.Client(session=retry_session)
+class WeatherTransport(Protocol):
+    """Fetches the current weather upstream. Swap it to test against a stub."""
 
-    url = "https://api.open-meteo.com/v1/forecast"
-    params = {
-        "latitude": latitude,
-        "longitude": longitude,
-        "current": ["temperature_2m", "relative_humidity_2m", "weathercode"],
-    }
-    responses = openmeteo.weather_api(url, params=params)
+    def fetch(self, cells: Sequence[GridCell]) -> list[Weather]:
+        """The weather of every cell, in the same order, in as few upstream calls as possible."""
+        ...
 
-    current_temperature = 0.0
-    current_relative_humidity = 0.0
-    current_description = "Unknown weather"
 
-    response = responses[0]
+def parse_current_weather(response: WeatherApiResponse) -> Weather:
+    weather = UNKNOWN_WEATHER.copy()
     current = response.Current()
     if current is not None:
         if temperature_variable := current.Variables(0):
-            current_temperature = round(temperature_variable.Value(), 3)
+            weather["temperature"] = round(temperature_variable.Value(), 3)
         if humidity_variable := current.Variables(1):
-            current_relative_humidity = round(humidity_variable.Value(), 3)
+            weather["humidity"] = round(humidity_variable.Value(), 3)
         if weathercode_variable := current.Variables(2):
-            current_description = WMO_Categories.get(
-                int(weathercode_variable.Value()), "Unknown weather"
+            weather["description"] = WMO_Categories.get(
+                int(weathercode_variable.Value()), UNKNOWN_WEATHER["description"]
+            )
+    return weather
+
+
+class OpenMeteoTransport:
+    def __init__(self, url: str = OPEN_METEO_URL):
+        self.url = url
+        self._client: openmeteo_requests.Client | None = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self):
+        # A single session for the whole process, so connections and the HTTP cache are reused
+        with self._client_lock:
+            if self._client is None:
+                cache_session = requests_cache.CachedSession(".cache", expire_after=3600)
+                retry_session = retry(cache_session, retries=5, backoff_factor=0.2)
+                self._client = openmeteo_requests.Client(session=retry_session)
+            return self._client
+
+    def fetch(self, cells: Sequence[GridCell]) -> list[Weather]:
+        weathers: list[Weather] = []
+        # Open-Meteo accepts lists of coordinates and answers in the same order
+        for chunk in batched(cells, LOCATIONS_PER_REQUEST):
+            params = {
+                "latitude": [latitude for latitude, _ in chunk],
+                "longitude": [longitude for _, longitude in chunk],
+                "current": ["temperature_2m", "relative_humidity_2m", "weathercode"],
+            }
+            responses = self.client.weather_api(self.url, params=params)
+            weathers.extend(parse_current_weather(response) for response in responses)
+        return weathers
+
+
+def to_grid_cell(latitude: float | Decimal, longitude: float | Decimal) -> GridCell:
+    return (round(float(latitude), GRID_CELL_DECIMALS), round(float(longitude), GRID_CELL_DECIMALS))
+
+
+def weather_key(cell: GridCell, ttl: float) -> CacheKey[Weather]:
+    # Half the TTL, since a process then keeps its copy of the cell for the whole TTL
+    return CacheKey("weather", "{},{}".format(*cell), ttl / 2)
+
+
+class WeatherService:
+    """
+    In-memory weather cache per grid cell.
+
+    The request path only ever reads from the cache. Missing or stale cells are refreshed in the
+    background, so a slow or failing upstream never blocks a request.
+    When `shared`, refreshes first look for cells fetched by other processes in the shared cache.
+    """
+
+    def __init__(
+        self,
+        transport: WeatherTransport,
+        ttl: float = CACHE_TTL_SECONDS,
+        executor: Executor | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        *,
+        shared: bool = False,
+    ):
+        self.transport = transport
+        self.shared = shared
+        self.ttl = ttl
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="weather-refresh"
+        )
+        self.clock = clock
+        self._entries: dict[GridCell, tuple[Weather, float]] = {}
+        self._refreshing: set[GridCell] = set()
+        self._lock = threading.Lock()
+
+    def _is_fresh(self, entry: tuple[Weather, float] | None):
+        return entry is not None and self.clock() - entry[1] < self.ttl
+
+    def get_cached_weather(self, latitude: float | Decimal, longitude: float | Decimal):
+        """The last known weather of the cell, or None. Schedules a refresh if missing or stale."""
+        cell = to_grid_cell(latitude, longitude)
+        with self._lock:
+            entry = self._entries.get(cell)
+        if not self._is_fresh(entry):
+            self.schedule_refresh([cell])
+        return None if entry is None else entry[0]
+
+    def schedule_refresh(self, cells: Iterable[GridCell]):
+        cells_to_refresh = self._claim_stale_cells(cells)
+        if cells_to_refresh:
+            self.executor.submit(self._refresh, cells_to_refresh)
+
+    def schedule_refresh_for_sites(self, site_coordinates: SiteCoordinates):
+        """Refresh every missing or stale cell of these sites in the background, in bulk."""
+        self.schedule_refresh(starmap(to_grid_cell, site_coordinates.values()))
+
+    def refresh(self, latitude: float | Decimal, longitude: float | Decimal) -> Weather:
+        """Fetch and cache the weather of the cell synchronously."""
+        cell = to_grid_cell(latitude, longitude)
+        return self._refresh([cell]).get(cell, UNKNOWN_WEATHER)
+
+    def get_weather_for_sites(self, site_coordinates: SiteCoordinates) -> dict[int, Weather]:
+        """
+        The weather of every site, by site id. Missing or stale cells are fetched synchronously,
+        deduplicated and in bulk, so this only costs a handful of upstream calls.
+        Meant for warm-up jobs and bulk listings rather than the request path.
+        """
+        site_cells = {
+            site_id: to_grid_cell(*coordinates) for site_id, coordinates in site_coordinates.items()
+        }
+        self._refresh(self._claim_stale_cells(site_cells.values()))
+        with self._lock:
+            return {
+                site_id: self._entries[cell][0] if cell in self._entries else UNKNOWN_WEATHER
+                for site_id, cell in site_cells.items()
+            }
+
+    def _claim_stale_cells(self, cells: Iterable[GridCell]):
+        """Mark the missing or stale cells that aren't already being refreshed as refreshing."""
+        with self._lock:
+            stale_cells = [
+                cell
+                for cell in dict.fromkeys(cells)
+                if cell not in self._refreshing and not self._is_fresh(self._entries.get(cell))
+            ]
+            self._refreshing.update(stale_cells)
+        return stale_cells
+
+    def _refresh(self, cells: list[GridCell]) -> dict[GridCell, Weather]:
+        if not cells:
+            return {}
+        try:
+            weathers = self._fetch(cells)
+        except Exception:
+            logger.exception("Could not refresh the weather of %s grid cell(s)", len(cells))
+            # Keep serving the stale entries, the next read will retry
+            return {}
+        finally:
+            with self._lock:
+                self._refreshing.difference_update(cells)
+        fetched_at = self.clock()
+        with self._lock:
+            self._entries.update(
+                (cell, (weather, fetched_at)) for cell, weather in weathers.items()
             )
+        return weathers
+
+    def _fetch(self, cells: list[GridCell]) -> dict[GridCell, Weather]:
+        if not self.shared:
+            return dict(zip(cells, self.transport.fetch(cells), strict=True))
+        cells_by_key = {weather_key(cell, self.ttl): cell for cell in cells}
+        weathers = get_many_or_set(
+            cells_by_key.keys(),
+            lambda missing_keys: dict(
+                zip(
+                    missing_keys,
+                    self.transport.fetch([cells_by_key[key] for key in missing_keys]),
+                    strict=True,
+                )
+            ),
+        )
+        return {cells_by_key[key]: weather for key, weather in weathers.items()}
+
+
+weather_service = WeatherService(OpenMeteoTransport(), shared=True)
+
 
-    return {
-        "temperature": current_temperature,
-        "humidity": current_relative_humidity,
-        "description": current_description,
-    }
+def get_weather_data(latitude: float | Decimal, longitude: float | Decimal) -> Weather:
+    return weather_service.get_cached_weather(latitude, longitude) or UNKNOWN_WEATHER
@@ -4,20 +4,15 @@ from copy import deepcopy
 from typing import cast
 
 from django.contrib.auth import authenticate
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.files.uploadedfile import UploadedFile
 from django.core.paginator import Paginator
-from django.db.models import Q
+from django.db import IntegrityError, transaction
+from django.db.models import Prefetch, Q
 from django.http import QueryDict
-
-# TODO: Figure out why setting CamelCaseMultiPartParser as a DEFAULT_PARSER_CLASSES
-# breaks *some* Views' API generation (adds multiple body params)
-# (then we won't need to import these as it'll simply be default)
-from djangorestframework_camel_case.parser import (
-    CamelCaseFormParser,
-    CamelCaseJSONParser,
-    CamelCaseMultiPartParser,
-)
 from drf_spectacular.types import OpenApiTypes
-from drf_spectacular.utils import OpenApiParameter, extend_schema
+from drf_spectacular.utils import OpenApiParameter, PolymorphicProxySerializer, extend_schema
 from rest_framework import status
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import AllowAny, IsAuthenticatedOrReadOnly
@@ -36,32 +31,49 @@ from canopeum_backend.permissions import (
     SiteAdminPermission,
 )
 
+from .authorization import get_authorization_context
+
+# TODO: Figure out why setting CamelCaseMultiPartParser as a DEFAULT_PARSER_CLASSES
+# breaks *some* Views' API generation (adds multiple body params)
+# (then we won't need to import these as it'll simply be default)
+from .camel_case import CamelCaseFormParser, CamelCaseJSONParser, CamelCaseMultiPartParser
 from .models import (
+    SITES_VERSION_KEY,
     Announcement,
     Batch,
-    Batchfertilizer,
-    Batchmulchlayer,
-    BatchSeed,
-    BatchSpecies,
-    BatchSupportedSpecies,
+    BatchDetails,
+    ChunkedUpload,
     Comment,
     Contact,
     Coordinate,
-    Fertilizertype,
+    FeedEntry,
     Like,
-    Mulchlayertype,
     Post,
     Request,
     RoleName,
     Site,
     Siteadmin,
     SiteFollower,
-    Sitetreespecies,
+    SiteQuerySet,
     Sitetype,
     Treetype,
     User,
     UserInvitation,
     Widget,
+    bump_resource_versions,
+    site_version_key,
+)
+from .pagination import CreatedAtCursorPagination
+from .reference_data import get_reference_type, reference_data
+from .resource_versions import (
+    FERTILIZER_TYPES_VERSION_KEY,
+    MULCH_LAYER_TYPES_VERSION_KEY,
+    SITE_TYPES_VERSION_KEY,
+    TREE_TYPES_VERSION_KEY,
+    conditional_headers,
+    get_etag,
+    is_not_modified,
+    not_modified_response,
 )
 from .serializers import (
     AnnouncementSerializer,
@@ -69,6 +81,8 @@ from .serializers import (
     BatchDetailSerializer,
     BatchSponsorSerializer,
     ChangePasswordSerializer,
+    ChunkedUploadSerializer,
+    CommentPaginationSerializer,
     CommentSerializer,
     ContactSerializer,
     CreateCommentSerializer,
@@ -85,6 +99,7 @@ from .serializers import (
     SiteAdminsSerializer,
     SiteAdminUpdateRequestSerializer,
     SiteMapSerializer,
+    SiteMapViewportSerializer,
     SitePostSerializer,
     SiteSerializer,
     SiteSocialSerializer,
@@ -99,29 +114,49 @@ from .serializers import (
     UserTokenSerializer,
     WidgetSerializer,
 )
+from .settings import FEED_FAN_OUT_ON_WRITE, UPLOAD_CHUNK_MAX_SIZE
+from .shared_cache import prefetch_site_summary_counts
+from .site_map import CLUSTER_MAX_ZOOM, MapViewport
+from .utils.weather_service import weather_service
 
 
 def get_public_sites_unless_admin(user: User | None):
-    if isinstance(user, User) and user.role.name == RoleName.MegaAdmin:
+    authorization = get_authorization_context(user)
+    if authorization.is_mega_admin:
         sites = Site.objects.all()
-    elif isinstance(user, User) and user.role.name == RoleName.ForestSteward:
-        admin_site_ids = [siteadmin.site.pk for siteadmin in Siteadmin.objects.filter(user=user)]
-        sites = Site.objects.filter(Q(id__in=admin_site_ids) | Q(is_public=True))
+    elif authorization.is_forest_steward:
+        sites = Site.objects.filter(Q(id__in=authorization.admin_site_ids) | Q(is_public=True))
     else:
         sites = Site.objects.filter(is_public=True)
     return sites
 
 
 def get_admin_sites(user: User):
-    if user.role.name == RoleName.MegaAdmin:
+    authorization = get_authorization_context(user)
+    if authorization.is_mega_admin:
         return Site.objects.all()
-    if user.role.name == RoleName.ForestSteward:
-        admin_site_ids = [siteadmin.site.pk for siteadmin in Siteadmin.objects.filter(user=user)]
-        return Site.objects.filter(Q(id__in=admin_site_ids))
+    if authorization.is_forest_steward:
+        return Site.objects.filter(Q(id__in=authorization.admin_site_ids))
 
     return None
 
 
+def with_site_summary_data(sites: SiteQuerySet):
+    """
+    Load everything the site summary serializers need in a fixed number of queries,
+    except for their totals shared between processes, see `prefetch_site_summary_counts`.
+    """
+    return (
+        sites.with_batch_details()
+        .select_related("site_type", "coordinate")
+        .prefetch_related(
+            Prefetch("siteadmin_set", queryset=Siteadmin.objects.select_related("user__role")),
+            "siteadmin_set__user__siteadmin_set",
+            "siteadmin_set__user__sitefollower_set",
+        )
+    )
+
+
 class LoginAPIView(APIView):
     permission_classes = (AllowAny,)
 
@@ -186,17 +221,27 @@ class TreeSpeciesAPIView(APIView):
 
     @extend_schema(responses=TreeTypeSerializer(many=True), operation_id="tree_species")
     def get(self, request: Request):
-        tree_species = Treetype.objects.all()
-        serializer = TreeTypeSerializer(tree_species, many=True)
-        return Response(serializer.data)
+        etag = get_etag(TREE_TYPES_VERSION_KEY)
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
+
+        tree_species = reference_data.get().tree_types.values()
+        # Reference types serialize like the rows of their model
+        serializer = TreeTypeSerializer(tree_species, many=True)  # type: ignore[arg-type]
+        return Response(serializer.data, headers=conditional_headers(etag))
 
 
 class SiteTypesAPIView(APIView):
     @extend_schema(responses=SiteTypeSerializer(many=True), operation_id="site_types")
     def get(self, request: Request):
-        tree_species = Sitetype.objects.all()
-        serializer = SiteTypeSerializer(tree_species, many=True)
-        return Response(serializer.data)
+        etag = get_etag(SITE_TYPES_VERSION_KEY)
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
+
+        site_types = reference_data.get().site_types.values()
+        # Reference types serialize like the rows of their model
+        serializer = SiteTypeSerializer(site_types, many=True)  # type: ignore[arg-type]
+        return Response(serializer.data, headers=conditional_headers(etag))
 
 
 class FertilizerListAPIView(APIView):
@@ -205,10 +250,15 @@ class FertilizerListAPIView(APIView):
     @extend_schema(
         responses=FertilizerTypeSerializer(many=True), operation_id="fertilizer_allTypes"
     )
-    def get(self, request):
-        fertilizer_types = Fertilizertype.objects.all()
-        serializer = FertilizerTypeSerializer(fertilizer_types, many=True)
-        return Response(serializer.data)
+    def get(self, request: Request):
+        etag = get_etag(FERTILIZER_TYPES_VERSION_KEY)
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
+
+        fertilizer_types = reference_data.get().fertilizer_types.values()
+        # Reference types serialize like the rows of their model
+        serializer = FertilizerTypeSerializer(fertilizer_types, many=True)  # type: ignore[arg-type]
+        return Response(serializer.data, headers=conditional_headers(etag))
 
 
 class MulchLayerListAPIView(APIView):
@@ -217,10 +267,15 @@ class MulchLayerListAPIView(APIView):
     @extend_schema(
         responses=MulchLayerTypeSerializer(many=True), operation_id="mulchLayer_allTypes"
     )
-    def get(self, request):
-        mulch_layer_types = Mulchlayertype.objects.all()
-        serializer = MulchLayerTypeSerializer(mulch_layer_types, many=True)
-        return Response(serializer.data)
+    def get(self, request: Request):
+        etag = get_etag(MULCH_LAYER_TYPES_VERSION_KEY)
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
+
+        mulch_layer_types = reference_data.get().mulch_layer_types.values()
+        # Reference types serialize like the rows of their model
+        serializer = MulchLayerTypeSerializer(mulch_layer_types, many=True)  # type: ignore[arg-type]
+        return Response(serializer.data, headers=conditional_headers(etag))
 
 
 SITE_SCHEMA = {
@@ -251,6 +306,19 @@ SITE_SCHEMA = {
 }
 
 
+def parse_tree_species(request: Request):
+    """
+    The site's tree species quantities by tree type id from its multipart form,
+    checked against the reference data.
+    Raises ValueError, KeyError or TypeError when malformed, or Treetype.DoesNotExist.
+    """
+    species = [json.loads(specie) for specie in request.data.getlist("species", [])]
+    quantities = {int(specie["id"]): specie["quantity"] for specie in species}
+    for pk in quantities:
+        get_reference_type(Treetype, pk)
+    return quantities
+
+
 class SiteListAPIView(APIView):
     permission_classes = (MegaAdminPermission,)
     parser_classes = (CamelCaseJSONParser, CamelCaseFormParser, CamelCaseMultiPartParser)
@@ -268,14 +336,19 @@ class SiteListAPIView(APIView):
         responses={201: SiteSerializer},
         operation_id="site_create",
     )
+    @transaction.atomic
     def post(self, request: Request):
+        try:
+            site_type = get_reference_type(Sitetype, request.data["site_type"])
+            species = parse_tree_species(request)
+        except (ValueError, KeyError, TypeError, ObjectDoesNotExist) as e:
+            return Response(data={"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
         asset = AssetSerializer(data=request.data)
         if not asset.is_valid():
             return Response(data=asset.errors, status=status.HTTP_400_BAD_REQUEST)
         image = asset.save()
 
-        site_type = Sitetype.objects.get(pk=request.data["site_type"])
-
         # TODO: Move call to from_dms_lat_long in the serializer
         coordinate = Coordinate.from_dms_lat_long(
             request.data["latitude"], request.data["longitude"]
@@ -287,20 +360,16 @@ class SiteListAPIView(APIView):
         if serializer.is_valid():
             site = serializer.save(
                 image=image,
-                site_type=site_type,
+                site_type_id=site_type.id,
                 coordinate=coordinate,
                 announcement=announcement,
                 contact=contact,
                 visitor_count=0,
             )
-            for tree_type_json in request.data.getlist("species"):
-                tree_type_obj = json.loads(tree_type_json)
-                tree_type = Treetype.objects.get(pk=tree_type_obj["id"])
-                Sitetreespecies.objects.create(
-                    site=site, tree_type=tree_type, quantity=tree_type_obj["quantity"]
-                )
+            site.set_tree_species(species, created=True)
 
             return Response(serializer.data, status=status.HTTP_201_CREATED)
+        transaction.set_rollback(True)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
@@ -325,12 +394,22 @@ class SiteDetailAPIView(APIView):
         responses=SiteSerializer,
         operation_id="site_update",
     )
+    @transaction.atomic
     def patch(self, request: Request, siteId):
         try:
-            site = Site.objects.get(pk=siteId)
+            site = Site.objects.select_related(
+                "site_type", "coordinate", "contact", "announcement"
+            ).get(pk=siteId)
         except Site.DoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
 
+        try:
+            site_type = get_reference_type(Sitetype, request.data["site_type"])
+            species = parse_tree_species(request)
+            latitude, longitude = request.data["latitude"], request.data["longitude"]
+        except (ValueError, KeyError, TypeError, ObjectDoesNotExist) as e:
+            return Response(data={"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
         if request.data.get("image") is None:
             image = site.image
         else:
@@ -339,35 +418,27 @@ class SiteDetailAPIView(APIView):
                 return Response(data=asset.errors, status=status.HTTP_400_BAD_REQUEST)
             image = asset.save()
 
-        site_type = Sitetype.objects.get(pk=request.data["site_type"])
-
-        # TODO: Move call to from_dms_lat_long in the serializer
-        coordinate = Coordinate.from_dms_lat_long(
-            request.data["latitude"], request.data["longitude"]
-        )
-        announcement = Announcement.objects.create()
-        contact = Contact.objects.create()
+        # The existing related rows are kept, only geocoding again when the site moved
+        related: dict[str, Coordinate | Announcement | Contact] = {}
+        coordinate = site.coordinate
+        if coordinate is None:
+            # TODO: Move call to from_dms_lat_long in the serializer
+            related["coordinate"] = Coordinate.from_dms_lat_long(latitude, longitude)
+        elif (coordinate.dms_latitude, coordinate.dms_longitude) != (latitude, longitude):
+            coordinate.set_dms_lat_long(latitude, longitude)
+        if site.announcement_id is None:
+            related["announcement"] = Announcement.objects.create()
+        if site.contact_id is None:
+            related["contact"] = Contact.objects.create()
 
         serializer = SiteSerializer(site, data=request.data, partial=True)
         if serializer.is_valid():
             site = serializer.save(
-                image=image,
-                site_type=site_type,
-                coordinate=coordinate,
-                announcement=announcement,
-                contact=contact,
-                visitor_count=0,
+                image=image, site_type_id=site_type.id, visitor_count=0, **related
             )
-
-            Sitetreespecies.objects.filter(site=site).delete()
-
-            for tree_type_json in request.data.getlist("species"):
-                tree_type_obj = json.loads(tree_type_json)
-                tree_type = Treetype.objects.get(pk=tree_type_obj["id"])
-                Sitetreespecies.objects.create(
-                    site=site, tree_type=tree_type, quantity=tree_type_obj["quantity"]
-                )
+            site.set_tree_species(species)
             return Response(serializer.data, status=status.HTTP_200_OK)
+        transaction.set_rollback(True)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     @extend_schema(responses={status.HTTP_204_NO_CONTENT: None}, operation_id="site_delete")
@@ -416,6 +487,17 @@ class SiteSummaryListAPIView(APIView):
         sites = get_admin_sites(request.user)
         if sites is None:
             return Response(status=status.HTTP_400_BAD_REQUEST)
+        sites = prefetch_site_summary_counts(list(with_site_summary_data(sites)))
+
+        # Warm up the weather of every listed site in bulk for their summary detail page
+        weather_service.schedule_refresh_for_sites({
+            site.pk: (site.coordinate.dd_latitude, site.coordinate.dd_longitude)
+            for site in sites
+            if site.coordinate is not None
+            and site.coordinate.dd_latitude is not None
+            and site.coordinate.dd_longitude is not None
+        })
+
         serializer = SiteSummarySerializer(
             sites,
             many=True,
@@ -429,11 +511,12 @@ class SiteSummaryDetailAPIView(APIView):
     @extend_schema(responses=SiteSummaryDetailSerializer, operation_id="site_summary")
     def get(self, request: Request, siteId):
         try:
-            site = Site.objects.get(pk=siteId)
+            site = with_site_summary_data(Site.objects.all()).get(pk=siteId)
         except Site.DoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
 
         self.check_object_permissions(request, site)
+        prefetch_site_summary_counts([site])
 
         plant_count = 0
         survived_count = 0
@@ -557,18 +640,79 @@ class SiteSocialDetailAPIView(APIView):
 
         self.check_object_permissions(request, site)
 
+        etag = get_etag(site_version_key(site.pk), SITE_TYPES_VERSION_KEY)
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
+
         serializer = SiteSocialSerializer(site)
-        return Response(serializer.data)
+        return Response(serializer.data, headers=conditional_headers(etag))
 
 
 class SiteMapListAPIView(APIView):
     permission_classes = (IsAuthenticatedOrReadOnly,)
 
-    @extend_schema(responses=SiteMapSerializer(many=True), operation_id="site_map")
+    @extend_schema(
+        responses=PolymorphicProxySerializer(
+            component_name="SiteMapResponse",
+            serializers=[SiteMapSerializer(many=True), SiteMapViewportSerializer],
+            resource_type_field_name=None,
+        ),
+        operation_id="site_map",
+        parameters=[
+            OpenApiParameter(
+                name="bbox",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description="Viewport as `west,south,east,north` decimal degrees. "
+                + "Omit it and zoom to list every site.",
+            ),
+            OpenApiParameter(
+                name="zoom",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description=f"Map zoom level. Below {CLUSTER_MAX_ZOOM}, "
+                + "sites sharing a grid cell are returned as clusters.",
+            ),
+        ],
+    )
     def get(self, request: Request):
-        sites = get_public_sites_unless_admin(request.user)
-        serializer = SiteMapSerializer(sites, many=True)
-        return Response(serializer.data)
+        # Visible sites depend on who is asking
+        authorization = get_authorization_context(request.user)
+        etag = get_etag(
+            SITES_VERSION_KEY,
+            SITE_TYPES_VERSION_KEY,
+            extra=(authorization.role_name, sorted(authorization.admin_site_ids)),
+        )
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
+
+        sites = get_public_sites_unless_admin(request.user).select_related(
+            "site_type", "coordinate", "image"
+        )
+        bbox = request.GET.get("bbox")
+        zoom = request.GET.get("zoom")
+        if bbox is None and zoom is None:
+            serializer = SiteMapSerializer(sites, many=True)
+            return Response(serializer.data, headers=conditional_headers(etag))
+
+        viewport = MapViewport.parse(bbox, zoom)
+        if viewport is None:
+            return Response(
+                "bbox and zoom are missing or invalid", status=status.HTTP_400_BAD_REQUEST
+            )
+        sites = sites.in_bounding_box(*viewport.bounding_box)
+        if not viewport.is_clustered:
+            viewport_serializer = SiteMapViewportSerializer({"sites": sites, "clusters": []})
+            return Response(viewport_serializer.data, headers=conditional_headers(etag))
+
+        clusters = list(sites.grid_clusters(viewport.cell_size))
+        # A cluster of one is shown as the site itself
+        lone_site_ids = [cluster["site_id"] for cluster in clusters if cluster["count"] == 1]
+        viewport_serializer = SiteMapViewportSerializer({
+            "sites": sites.filter(id__in=lone_site_ids) if lone_site_ids else [],
+            "clusters": [cluster for cluster in clusters if cluster["count"] > 1],
+        })
+        return Response(viewport_serializer.data, headers=conditional_headers(etag))
 
 
 # Incompatible "request" in base types
@@ -584,40 +728,87 @@ class PostListAPIView(APIView, PageNumberPagination):  # type:ignore[misc] # pyr
                 name="siteId", type=OpenApiTypes.INT, many=True, location=OpenApiParameter.QUERY
             ),
             OpenApiParameter(
-                name="page", type=OpenApiTypes.INT, required=True, location=OpenApiParameter.QUERY
+                name="page",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description="Page number based pagination. Omit it to use cursor pagination.",
+            ),
+            OpenApiParameter(
+                name="cursor",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description="Cursor pagination token, taken from the previous page's next link.",
             ),
             OpenApiParameter(
                 name="size", type=OpenApiTypes.INT, required=True, location=OpenApiParameter.QUERY
             ),
+            OpenApiParameter(
+                name="following",
+                type=OpenApiTypes.BOOL,
+                location=OpenApiParameter.QUERY,
+                description="Only the posts of the sites followed by the current user.",
+            ),
         ],
     )
     def get(self, request: Request):
         site_ids = request.GET.getlist("site_id")
         posts = Post.objects.filter(site__in=site_ids) if site_ids else Post.objects.all()
-        sorted_posts = posts.order_by("-created_at")
+        following = request.GET.get("following") == "true"
+        if following:
+            # Typed as a User, but the view is readable anonymously
+            user = cast(User | AnonymousUser, request.user)
+            if user.is_anonymous:
+                return Response(status=status.HTTP_401_UNAUTHORIZED)
+            followed_site_ids = SiteFollower.objects.filter(user=user).values("site")
+            posts = posts.filter(site__in=followed_site_ids)
 
         page = request.GET.get("page")
         size = request.GET.get("size")
 
         if (
-            not isinstance(page, str)
-            or not page.isnumeric()
+            (page is not None and not page.isnumeric())
             or not isinstance(size, str)
             or not size.isnumeric()
+            or int(size) == 0
         ):
             return Response(
                 "Page and size are missing or invalid", status=status.HTTP_400_BAD_REQUEST
             )
 
+        if page is None:
+            cursor_paginator = CreatedAtCursorPagination(page_size=int(size))
+            if following and FEED_FAN_OUT_ON_WRITE:
+                page_posts = self.paginate_feed_entries(cursor_paginator, request, site_ids)
+            else:
+                page_posts = cursor_paginator.paginate_queryset(posts, request)
+            serializer = PostSerializer(
+                page_posts, many=True, context=PostSerializer.get_context(request, page_posts)
+            )
+            return cursor_paginator.get_paginated_response(serializer.data)
+
+        # Compatibility mode: page numbers need a COUNT and an OFFSET that grows with the page
+        sorted_posts = posts.order_by("-created_at", "-id")
         posts_paginator = Paginator(object_list=sorted_posts, per_page=int(size))
         page_posts = posts_paginator.page(int(page))
 
         self.page = page_posts
         self.page_size = int(size)
 
-        serializer = PostSerializer(page_posts, many=True, context={"request": request})
+        serializer = PostSerializer(
+            page_posts, many=True, context=PostSerializer.get_context(request, page_posts)
+        )
         return self.get_paginated_response(serializer.data)
 
+    @staticmethod
+    def paginate_feed_entries(
+        cursor_paginator: CreatedAtCursorPagination, request: Request, site_ids: list[str]
+    ):
+        """The posts of the followed sites, precomputed in the user's feed entries."""
+        entries = FeedEntry.objects.filter(user=request.user).select_related("post")
+        if site_ids:
+            entries = entries.filter(post__site__in=site_ids)
+        return [entry.post for entry in cursor_paginator.paginate_queryset(entries, request)]
+
     @extend_schema(
         # TODO: Add serializer for multipart/form-data
         # request={"multipart/form-data": PostPostSerializer}
@@ -627,34 +818,158 @@ class PostListAPIView(APIView, PageNumberPagination):  # type:ignore[misc] # pyr
                 "properties": {
                     "site": {"type": "number"},
                     "body": {"type": "string"},
-                    "media": {"type": "array", "items": {"type": "string", "format": "binary"}},
+                    "media": {
+                        "type": "array",
+                        "items": {
+                            # The asset ids of completed uploads, or the files themselves
+                            "oneOf": [
+                                {"type": "integer"},
+                                {"type": "string", "format": "binary"},
+                            ]
+                        },
+                    },
                 },
             },
+            "application/json": PostPostSerializer,
         },
         responses={201: PostSerializer},
         operation_id="post_create",
     )
     def post(self, request: Request):
-        assets = request.data.getlist("media")
-        saved_assets = []
-        for asset_item in assets:
-            q = QueryDict("", mutable=True)
-            q.update({"image": asset_item})
-            asset = AssetSerializer(data=q)
+        media = (
+            request.data.getlist("media")
+            if isinstance(request.data, QueryDict)
+            else request.data.get("media", [])
+        )
+        files = [item for item in media if isinstance(item, UploadedFile)]
+        # Or the ids of the assets of uploads completed beforehand, see ChunkedUploadDetailAPIView
+        try:
+            uploaded_asset_ids = {int(item) for item in media if not isinstance(item, UploadedFile)}
+        except (TypeError, ValueError):
+            return Response(
+                {"media": ["Expected files or asset ids"]}, status=status.HTTP_400_BAD_REQUEST
+            )
+        uploads = ChunkedUpload.objects.filter(user=request.user, asset__in=uploaded_asset_ids)
+        # Each completed upload has its own asset
+        owned_asset_count = uploads.count() if uploaded_asset_ids else 0
+        if owned_asset_count != len(uploaded_asset_ids):
+            return Response(
+                {"media": ["Only your own completed uploads can be attached"]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        serializer = PostPostSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        # All validated before any is saved, so an invalid file doesn't leave the others behind
+        assets = [AssetSerializer(data={"image": asset_item}) for asset_item in files]
+        for asset in assets:
             if not asset.is_valid():
                 return Response(data=asset.errors, status=status.HTTP_400_BAD_REQUEST)
-            asset.save()
-            saved_assets.append(asset)
-        serializer = PostPostSerializer(data=request.data)
-        if serializer.is_valid():
+
+        with transaction.atomic():
             post = serializer.save()
-            for asset_item in saved_assets:
-                post.media.add(asset_item.instance)
-            new_post = PostSerializer(post, context={"request": request})
-            return Response(new_post.data, status=status.HTTP_201_CREATED)
+            for asset in assets:
+                post.media.add(asset.save())
+            if uploaded_asset_ids:
+                post.media.add(*uploaded_asset_ids)
+                # Attached, they won't be deleted as stale anymore
+                uploads.delete()
+        new_post = PostSerializer(post, context={"request": request})
+        return Response(new_post.data, status=status.HTTP_201_CREATED)
+
+
+class ChunkedUploadListAPIView(APIView):
+    @extend_schema(
+        request=ChunkedUploadSerializer,
+        responses={201: ChunkedUploadSerializer},
+        operation_id="upload_create",
+    )
+    def post(self, request: Request):
+        serializer = ChunkedUploadSerializer(data=request.data)
+        if serializer.is_valid():
+            serializer.save(user=request.user)
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class ChunkedUploadDetailAPIView(APIView):
+    """
+    Send the file in chunks of up to `UPLOAD_CHUNK_MAX_SIZE` bytes, each at the offset
+    where the previous one ended. An interrupted upload resumes from its current offset.
+    Once complete, attach its asset to a post by id.
+    """
+
+    @extend_schema(responses=ChunkedUploadSerializer, operation_id="upload_detail")
+    def get(self, request: Request, uploadId):
+        try:
+            upload = ChunkedUpload.objects.get(pk=uploadId, user=request.user)
+        except ChunkedUpload.DoesNotExist:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+
+        return Response(ChunkedUploadSerializer(upload).data)
+
+    @extend_schema(
+        request={"application/offset+octet-stream": {"type": "string", "format": "binary"}},
+        responses={200: ChunkedUploadSerializer, 409: ChunkedUploadSerializer},
+        operation_id="upload_chunk",
+        parameters=[
+            OpenApiParameter(
+                name="Upload-Offset",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.HEADER,
+                required=True,
+                description="Where this chunk starts in the file, the current offset.",
+            ),
+        ],
+    )
+    def patch(self, request: Request, uploadId):
+        offset = request.headers.get("Upload-Offset", "")
+        if not offset.isdecimal():
+            return Response(
+                "Upload-Offset is missing or invalid", status=status.HTTP_400_BAD_REQUEST
+            )
+        # Read straight from the request, bypassing the parsers. Never more than the limit.
+        chunk = request.stream.read(UPLOAD_CHUNK_MAX_SIZE + 1) if request.stream else b""
+        if not chunk:
+            return Response("The chunk is empty", status=status.HTTP_400_BAD_REQUEST)
+
+        # Locked, so concurrent chunks at the same offset can't both be appended
+        with transaction.atomic():
+            try:
+                upload = ChunkedUpload.objects.select_for_update().get(
+                    pk=uploadId, user=request.user
+                )
+            except ChunkedUpload.DoesNotExist:
+                return Response(status=status.HTTP_404_NOT_FOUND)
+
+            if int(offset) != upload.offset:
+                # The client resumes from the offset in the response
+                return Response(
+                    ChunkedUploadSerializer(upload).data, status=status.HTTP_409_CONFLICT
+                )
+            if len(chunk) > UPLOAD_CHUNK_MAX_SIZE or upload.offset + len(chunk) > upload.size:
+                return Response(
+                    f"Chunks are limited to {UPLOAD_CHUNK_MAX_SIZE} bytes and to the file size",
+                    status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                )
+            upload.append_chunk(chunk)
+
+        return Response(ChunkedUploadSerializer(upload).data)
+
+    @extend_schema(operation_id="upload_delete")
+    def delete(self, request: Request, uploadId):
+        try:
+            upload = ChunkedUpload.objects.select_related("asset").get(
+                pk=uploadId, user=request.user
+            )
+        except ChunkedUpload.DoesNotExist:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+
+        upload.cancel()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 class PostDetailAPIView(APIView):
     permission_classes = (IsAuthenticatedOrReadOnly,)
 
@@ -665,7 +980,7 @@ class PostDetailAPIView(APIView):
         except Post.DoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
 
-        serializer = PostSerializer(post, context={"request": request})
+        serializer = PostSerializer(post, context=PostSerializer.get_context(request, [post]))
         return Response(serializer.data)
 
     @extend_schema(operation_id="post_delete")
@@ -684,11 +999,48 @@ class PostDetailAPIView(APIView):
 class CommentListAPIView(APIView):
     permission_classes = (IsAuthenticatedOrReadOnly,)
 
-    @extend_schema(responses=CommentSerializer(many=True), operation_id="comment_all")
+    @extend_schema(
+        responses=PolymorphicProxySerializer(
+            component_name="CommentListResponse",
+            serializers=[CommentSerializer(many=True), CommentPaginationSerializer],
+            resource_type_field_name=None,
+        ),
+        operation_id="comment_all",
+        parameters=[
+            OpenApiParameter(
+                name="size",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description="Cursor pagination page size. Omit it to list every comment.",
+            ),
+            OpenApiParameter(
+                name="cursor",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description="Cursor pagination token, taken from the previous page's next link.",
+            ),
+        ],
+    )
     def get(self, request: Request, postId):
-        comments = Comment.objects.filter(post=postId).order_by("-created_at")
-        serializer = CommentSerializer(comments, many=True)
-        return Response(serializer.data)
+        size = request.GET.get("size")
+        if size is not None and (not size.isnumeric() or int(size) == 0):
+            return Response("Size is invalid", status=status.HTTP_400_BAD_REQUEST)
+
+        # Only the author columns the serializer needs, joined rather than fetched per comment
+        comments = (
+            Comment.objects.filter(post=postId)
+            .select_related("user")
+            .only("body", "created_at", "user__username")
+        )
+        if size is None:
+            # Compatibility mode: every comment of the post at once
+            serializer = CommentSerializer(comments.order_by("-created_at", "-id"), many=True)
+            return Response(serializer.data)
+
+        cursor_paginator = CreatedAtCursorPagination(page_size=int(size))
+        page_comments = cursor_paginator.paginate_queryset(comments, request)
+        serializer = CommentSerializer(page_comments, many=True)
+        return cursor_paginator.get_paginated_response(serializer.data)
 
     @extend_schema(
         request=CreateCommentSerializer,
@@ -738,6 +1090,7 @@ class AnnouncementDetailAPIView(APIView):
         if serializer.is_valid():
             serializer.save()
             Site.objects.filter(pk=siteId).update(announcement=announcement)
+            bump_resource_versions(site_version_key(siteId))
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -808,7 +1161,13 @@ class LikeListAPIView(APIView):
             return Response(status=status.HTTP_404_NOT_FOUND)
         serializer = LikeSerializer(data={"post": post.pk, "user": user.pk})
         if serializer.is_valid():
-            serializer.save()
+            try:
+                serializer.save()
+            except IntegrityError:
+                # Liked concurrently, since validated
+                return Response(
+                    "Current user already likes this post", status=status.HTTP_400_BAD_REQUEST
+                )
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -874,12 +1233,31 @@ BATCH_CREATE_SCHEMA = {
 }
 
 
+def parse_batch_details(request: Request):
+    """
+    The batch's types from its multipart form, checked against the reference data.
+    Raises ValueError, KeyError or TypeError when malformed, or the DoesNotExist of an unknown type.
+    """
+    data = request.data
+    seeds = [json.loads(seed) for seed in data.getlist("seeds", [])]
+    species = [json.loads(specie) for specie in data.getlist("species", [])]
+    details = BatchDetails(
+        fertilizer_ids=frozenset(map(int, data.getlist("fertilizer_ids", []))),
+        mulch_layer_ids=frozenset(map(int, data.getlist("mulch_layer_ids", []))),
+        supported_species_ids=frozenset(map(int, data.getlist("supported_specie_ids", []))),
+        seeds={int(seed["id"]): seed.get("quantity", 0) for seed in seeds},
+        species={int(specie["id"]): specie.get("quantity", 0) for specie in species},
+    )
+    details.validate()
+    return details
+
+
 class BatchListAPIView(APIView):
     parser_classes = (CamelCaseJSONParser, CamelCaseFormParser, CamelCaseMultiPartParser)
 
     @extend_schema(responses=BatchDetailSerializer(many=True), operation_id="batch_all")
     def get(self, request: Request):
-        batches = Batch.objects.all()
+        batches = Batch.objects.with_details()
         serializer = BatchDetailSerializer(batches, many=True)
         return Response(serializer.data)
 
@@ -890,17 +1268,14 @@ class BatchListAPIView(APIView):
         responses={201: BatchDetailSerializer},
         operation_id="batch_create",
     )
+    @transaction.atomic
     def post(self, request: Request):
         errors = []
 
         try:
-            parsed_fertilizer_ids = request.data.getlist("fertilizer_ids", [])
-            parsed_mulch_layer_ids = request.data.getlist("mulch_layer_ids", [])
-            parsed_seeds = [json.loads(seed) for seed in request.data.getlist("seeds", [])]
-            parsed_species = [json.loads(specie) for specie in request.data.getlist("species", [])]
-            parsed_supported_species_ids = request.data.getlist("supported_specie_ids", [])
-        except json.JSONDecodeError as e:
-            return Response(data={"error": e}, status=status.HTTP_400_BAD_REQUEST)
+            details = parse_batch_details(request)
+        except (ValueError, KeyError, TypeError, ObjectDoesNotExist) as e:
+            return Response(data={"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         # HACK to allow handling the image with a AssetSerializer separately
         # TODO: Figure out how to feed the image directly to BatchDetailSerializer
@@ -933,21 +1308,16 @@ class BatchListAPIView(APIView):
             site = Site.objects.get(pk=request.data.get("site", ""))
             batch = batch_serializer.save(site=site, image=image, sponsor=sponsor)
 
-            for fertilizer_id in parsed_fertilizer_ids:
-                batch.add_fertilizer_by_id(fertilizer_id)
-            for mulch_layer_id in parsed_mulch_layer_ids:
-                batch.add_mulch_by_id(mulch_layer_id)
-            for seed in parsed_seeds:
-                batch.add_seed_by_id(seed["id"], seed.get("quantity", 0))
-            for specie in parsed_species:
-                batch.add_specie_by_id(specie["id"], specie.get("quantity", 0))
-            for supported_specie_id in parsed_supported_species_ids:
-                batch.add_supported_specie_by_id(supported_specie_id)
+            batch.set_details(details, created=True)
 
         if errors:
+            # Nothing is kept when any part is invalid
+            transaction.set_rollback(True)
             return Response(data={"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
 
-        return Response(batch_serializer.data, status=status.HTTP_201_CREATED)
+        # Reloaded with its details, instead of a query per detail
+        batch = Batch.objects.with_details().get(pk=batch.pk)
+        return Response(BatchDetailSerializer(batch).data, status=status.HTTP_201_CREATED)
 
 
 BATCH_EDIT_SCHEMA = deepcopy(BATCH_CREATE_SCHEMA)
@@ -966,6 +1336,7 @@ class BatchDetailAPIView(APIView):
         responses=BatchDetailSerializer,
         operation_id="batch_update",
     )
+    @transaction.atomic
     def patch(self, request: Request, batchId):
         try:
             batch = Batch.objects.get(pk=batchId)
@@ -975,13 +1346,9 @@ class BatchDetailAPIView(APIView):
         errors = []
 
         try:
-            parsed_fertilizer_ids = request.data.getlist("fertilizer_ids", [])
-            parsed_mulch_layer_ids = request.data.getlist("mulch_layer_ids", [])
-            parsed_seeds = [json.loads(seed) for seed in request.data.getlist("seeds", [])]
-            parsed_species = [json.loads(specie) for specie in request.data.getlist("species", [])]
-            parsed_supported_species_ids = request.data.getlist("supported_specie_ids", [])
-        except json.JSONDecodeError as e:
-            return Response(data={"error": e}, status=status.HTTP_400_BAD_REQUEST)
+            details = parse_batch_details(request)
+        except (ValueError, KeyError, TypeError, ObjectDoesNotExist) as e:
+            return Response(data={"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         # TODO: On updating an image, we need to delete it too
         # image = None
@@ -1017,27 +1384,16 @@ class BatchDetailAPIView(APIView):
         else:
             batch = batch_serializer.save(sponsor=sponsor)
 
-            # Less efficient, but so much easier to just remove all then recreate mappings.
-            Batchfertilizer.objects.filter(batch=batch).delete()
-            Batchmulchlayer.objects.filter(batch=batch).delete()
-            BatchSeed.objects.filter(batch=batch).delete()
-            BatchSpecies.objects.filter(batch=batch).delete()
-            BatchSupportedSpecies.objects.filter(batch=batch).delete()
-            for fertilizer_id in parsed_fertilizer_ids:
-                batch.add_fertilizer_by_id(fertilizer_id)
-            for mulch_layer_id in parsed_mulch_layer_ids:
-                batch.add_mulch_by_id(mulch_layer_id)
-            for seed in parsed_seeds:
-                batch.add_seed_by_id(seed["id"], seed.get("quantity", 0))
-            for specie in parsed_species:
-                batch.add_specie_by_id(specie["id"], specie.get("quantity", 0))
-            for supported_specie_id in parsed_supported_species_ids:
-                batch.add_supported_specie_by_id(supported_specie_id)
+            batch.set_details(details)
 
         if errors:
+            # Nothing is kept when any part is invalid
+            transaction.set_rollback(True)
             return Response(data={"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
 
-        return Response(batch_serializer.data)
+        # Reloaded with its details, instead of a query per detail
+        batch = Batch.objects.with_details().get(pk=batch.pk)
+        return Response(BatchDetailSerializer(batch).data)
 
     @extend_schema(operation_id="batch_delete")
     def delete(self, request: Request, batchId):
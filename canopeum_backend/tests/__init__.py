@@ -0,0 +1 @@
+# Tests are auto-discovered as long as they're named test*.py
@@ -0,0 +1,156 @@
+from dataclasses import dataclass, fields
+
+from canopeum_backend.models import (
+    Announcement,
+    Batch,
+    BatchSpecies,
+    ChunkedUpload,
+    Comment,
+    Contact,
+    Fertilizertype,
+    Like,
+    Mulchlayertype,
+    Post,
+    RoleName,
+    Site,
+    SiteFollower,
+    Treetype,
+    User,
+    UserInvitation,
+    Widget,
+    count_per_post,
+)
+from tests.fixtures import (
+    add_batch_details,
+    create_batch,
+    create_fertilizer_type,
+    create_mulch_layer_type,
+    create_roles,
+    create_site,
+    create_site_admin,
+    create_site_species,
+    create_site_type,
+    create_tree_type,
+    create_user,
+)
+
+
+@dataclass(frozen=True)
+class DatasetSize:
+    sites: int = 4
+    batches_per_site: int = 3
+    species_per_batch: int = 3
+    posts_per_site: int = 10
+    likes_per_post: int = 3
+    comments_per_post: int = 3
+
+    def __post_init__(self):
+        # Scenarios need at least one of each to point their requests at
+        if min(self.sites, self.batches_per_site, self.posts_per_site) < 1:
+            raise ValueError("Datasets need at least one site, batch per site and post per site")
+
+    @classmethod
+    def parse(cls, value: str):
+        """Parse sizes such as `sites=50,posts_per_site=200`, others keep their default."""
+        known_fields = {field.name for field in fields(cls)}
+        sizes: dict[str, int] = {}
+        for item in filter(None, value.split(",")):
+            name, _, size = item.partition("=")
+            name = name.strip()
+            if name not in known_fields:
+                raise ValueError(f"Unknown dataset size {name!r}, expected one of {known_fields}")
+            sizes[name] = int(size)
+        return cls(**sizes)
+
+
+@dataclass(frozen=True)
+class Dataset:
+    """The seeded rows that scenarios point their requests at."""
+
+    size: DatasetSize
+    mega_admin: User
+    forest_steward: User
+    user: User
+    site: Site
+    batch: Batch
+    tree_type: Treetype
+    fertilizer_type: Fertilizertype
+    mulch_layer_type: Mulchlayertype
+    post: Post
+    comment: Comment
+    upload: ChunkedUpload
+    widget: Widget
+    invitation: UserInvitation
+
+
+def seed_dataset(size: DatasetSize):
+    create_roles()
+    mega_admin = create_user("megaadmin", RoleName.MegaAdmin)
+    mega_admin.is_staff = True
+    mega_admin.save()
+    forest_steward = create_user("steward", RoleName.ForestSteward)
+    users = [create_user(f"user{i}") for i in range(max(size.likes_per_post, 1))]
+
+    site_type = create_site_type("Parc")
+    tree_types = [create_tree_type(f"Tree {i}") for i in range(max(size.species_per_batch, 1))]
+    fertilizer_type = create_fertilizer_type("Manure")
+    mulch_layer_type = create_mulch_layer_type("Compost")
+
+    sites: list[Site] = []
+    for i in range(size.sites):
+        site = create_site(f"Site {i}", site_type, is_public=i % 2 == 0)
+        site.announcement = Announcement.objects.create(body="Planting day")
+        site.contact = Contact.objects.create(email="contact@example.com")
+        site.save()
+        for tree_type in tree_types:
+            create_site_species(site, tree_type, 100)
+        for _ in range(size.batches_per_site):
+            batch = create_batch(site, survived_count=10, total_propagation=5)
+            add_batch_details(batch, tree_types[0], fertilizer_type, mulch_layer_type)
+            BatchSpecies.objects.bulk_create(
+                BatchSpecies(batch=batch, tree_type=tree_type, quantity=10)
+                for tree_type in tree_types[1:]
+            )
+        sites.append(site)
+    create_site_admin(forest_steward, sites[0])
+    SiteFollower.objects.bulk_create(SiteFollower(user=user, site=sites[0]) for user in users)
+    # The first user follows every site, their feed has the posts of all of them
+    SiteFollower.objects.bulk_create(SiteFollower(user=users[0], site=site) for site in sites[1:])
+
+    posts = Post.objects.bulk_create(
+        Post(site=site, body=f"{site.name} post {i}")
+        for site in sites
+        for i in range(size.posts_per_site)
+    )
+    Like.objects.bulk_create(
+        Like(user=user, post=post) for post in posts for user in users[: size.likes_per_post]
+    )
+    Comment.objects.bulk_create(
+        Comment(user=users[i % len(users)], post=post, body=f"Comment {i}")
+        for post in posts
+        for i in range(size.comments_per_post)
+    )
+    # Bulk creation skips the counters that Like and Comment maintain on save
+    Post.objects.update(
+        like_count=count_per_post(Like.objects.all()),
+        comment_count=count_per_post(Comment.objects.all()),
+    )
+
+    post = posts[0]
+    Like.objects.create(user=mega_admin, post=post)
+    return Dataset(
+        size=size,
+        mega_admin=mega_admin,
+        forest_steward=forest_steward,
+        user=users[0],
+        site=sites[0],
+        batch=Batch.objects.filter(site=sites[0]).order_by("pk")[0],
+        tree_type=tree_types[0],
+        fertilizer_type=fertilizer_type,
+        mulch_layer_type=mulch_layer_type,
+        post=post,
+        comment=Comment.objects.create(user=mega_admin, post=post, body="Lovely"),
+        upload=ChunkedUpload.objects.create(user=mega_admin, filename="photo.png", size=8),
+        widget=Widget.objects.create(site=sites[0], title="Volunteers", body="42"),
+        invitation=UserInvitation.objects.create(code="benchmark", email="invited@example.com"),
+    )
@@ -0,0 +1,214 @@
+import gc
+import json
+import statistics
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Literal, TypeAlias
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from canopeum_backend.models import User
+
+from .dataset import Dataset
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+Method: TypeAlias = Literal["get", "post", "patch", "delete"]
+Actor: TypeAlias = Literal["anonymous", "mega_admin", "forest_steward", "user"]
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """
+    One request to benchmark.
+
+    `path`, `data` and `headers` are formatted or built from the seeded dataset.
+    `data` is sent raw when a `content_type` is set, else encoded in `format`.
+    Writes are rolled back after each run, so every run sees the same data.
+    """
+
+    name: str
+    method: Method
+    path: str
+    expected_status: int = 200
+    actor: Actor = "mega_admin"
+    data: Callable[[Dataset], dict[str, Any] | bytes] | None = None
+    format: Literal["json", "multipart"] = "json"
+    content_type: str | None = None
+    headers: Callable[[Dataset], dict[str, str]] | None = None
+
+    def build_path(self, dataset: Dataset):
+        return self.path.format(dataset=dataset)
+
+
+@dataclass(frozen=True)
+class Measurement:
+    queries: int
+    p50_ms: float
+    p95_ms: float
+    payload_bytes: int
+
+
+@dataclass(frozen=True)
+class Budget:
+    """How far from its baseline a measurement may drift before the benchmark fails."""
+
+    # Query counts are deterministic, any extra query is a regression
+    extra_queries: int = 0
+    payload_ratio: float = 1.1
+    # Latency depends on the machine and its load, so it is only checked when asked for.
+    # Even then, only catch order of magnitude regressions of the median.
+    # The p95 of a handful of runs is too noisy to fail on, it is only reported.
+    check_latency: bool = False
+    latency_ratio: float = 5.0
+    latency_floor_ms: float = 50.0
+
+    def check(self, measurement: Measurement, baseline: Measurement):
+        """The list of exceeded budgets, empty when within budget."""
+        exceeded: list[str] = []
+        if measurement.queries > baseline.queries + self.extra_queries:
+            exceeded.append(f"{measurement.queries} queries, baseline is {baseline.queries}")
+        if measurement.payload_bytes > baseline.payload_bytes * self.payload_ratio:
+            exceeded.append(
+                f"{measurement.payload_bytes} bytes, baseline is {baseline.payload_bytes}"
+            )
+        if not self.check_latency:
+            return exceeded
+        latency_budget = max(baseline.p50_ms * self.latency_ratio, self.latency_floor_ms)
+        if measurement.p50_ms > latency_budget:
+            exceeded.append(f"p50 of {measurement.p50_ms}ms, budget is {latency_budget:.1f}ms")
+        return exceeded
+
+
+def get_client(dataset: Dataset, actor: Actor):
+    client = APIClient()
+    if actor != "anonymous":
+        # Through real tokens, so authentication is part of the measurement
+        user: User = getattr(dataset, actor)
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+    return client
+
+
+def percentile(samples: list[float], percent: int):
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[percent - 1]
+
+
+def run_scenario(scenario: Scenario, dataset: Dataset, iterations: int):
+    client = get_client(dataset, scenario.actor)
+    path = scenario.build_path(dataset)
+    durations: list[float] = []
+    query_counts: list[int] = []
+    payload_bytes = 0
+
+    # Like timeit, keep garbage collection pauses out of the timings
+    gc.collect()
+    gc.disable()
+    try:
+        # The first run warms up the in-process caches and isn't measured
+        for run in range(iterations + 1):
+            request_kwargs: dict[str, Any] = {}
+            if scenario.data:
+                request_kwargs["data"] = scenario.data(dataset)
+                if scenario.content_type:
+                    request_kwargs["content_type"] = scenario.content_type
+                else:
+                    request_kwargs["format"] = scenario.format
+            if scenario.headers:
+                request_kwargs["headers"] = scenario.headers(dataset)
+            with transaction.atomic(), CaptureQueriesContext(connection) as queries:
+                started_at = time.perf_counter()
+                response = getattr(client, scenario.method)(path, **request_kwargs)
+                duration = time.perf_counter() - started_at
+                transaction.set_rollback(True)
+
+            if response.status_code != scenario.expected_status:
+                status_message = f"expected {scenario.expected_status}, got {response.status_code}"
+                raise AssertionError(
+                    f"{scenario.name}: {status_message} {response.content[:500]!r}"
+                )
+            if run == 0:
+                continue
+            durations.append(duration * 1000)
+            query_counts.append(len(queries.captured_queries))
+            payload_bytes = max(payload_bytes, len(response.content))
+    finally:
+        gc.enable()
+
+    return Measurement(
+        queries=max(query_counts),
+        p50_ms=round(percentile(durations, 50), 2),
+        p95_ms=round(percentile(durations, 95), 2),
+        payload_bytes=payload_bytes,
+    )
+
+
+def time_call(func: Callable[[Any], Any], argument: Any, iterations: int):
+    """Fastest of `iterations` calls in milliseconds, like `timeit.repeat`."""
+    durations: list[float] = []
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(iterations):
+            started_at = time.perf_counter()
+            func(argument)
+            durations.append((time.perf_counter() - started_at) * 1000)
+    finally:
+        gc.enable()
+    return min(durations)
+
+
+def load_baseline(path: Path = BASELINE_PATH):
+    if not path.is_file():
+        return {}
+    return {
+        name: Measurement(**measurement)
+        for name, measurement in json.loads(path.read_text(encoding="utf-8")).items()
+    }
+
+
+def update_baseline(
+    baseline: dict[str, Measurement],
+    measurements: dict[str, Measurement],
+    budget: Budget,
+):
+    """
+    The measurements to record as the new baseline.
+    Unless the budget checks latency, the entries whose query count and payload size didn't
+    change are kept as they were, so recording a change only touches the entries it affected.
+    Payload sizes may vary a little between runs, like the length of tokens.
+    """
+
+    def is_unchanged(name: str, measurement: Measurement):
+        recorded = baseline.get(name)
+        return (
+            recorded is not None
+            and recorded.queries == measurement.queries
+            and recorded.payload_bytes / budget.payload_ratio
+            <= measurement.payload_bytes
+            <= recorded.payload_bytes * budget.payload_ratio
+        )
+
+    return {
+        name: baseline[name]
+        if not budget.check_latency and is_unchanged(name, measurement)
+        else measurement
+        for name, measurement in measurements.items()
+    }
+
+
+def save_measurements(measurements: dict[str, Measurement], path: Path = BASELINE_PATH):
+    path.write_text(
+        json.dumps(
+            {name: asdict(measurement) for name, measurement in sorted(measurements.items())},
+            indent=2,
+        )
+        + "\n",
+        encoding="utf-8",
+    )
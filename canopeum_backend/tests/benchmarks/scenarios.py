@@ -0,0 +1,335 @@
+import json
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from canopeum_backend.models import site_version_key
+from canopeum_backend.resource_versions import (
+    SITE_TYPES_VERSION_KEY,
+    TREE_TYPES_VERSION_KEY,
+    get_etag,
+)
+
+from .dataset import Dataset
+from .harness import Scenario
+
+# Routes that aren't part of the API
+UNBENCHMARKED_ROUTES = {
+    "admin/": "Django admin",
+    "api/schema/": "Generated API documentation",
+    "api/schema/swagger-ui/": "Generated API documentation",
+    "api/schema/redoc/": "Generated API documentation",
+    "^media/(?P<path>.*)$": "Static media files, only served in debug",
+}
+
+PASSWORD = "password"  # noqa: S105 # MOCK_PASSWORD
+
+
+def upload(name: str):
+    return SimpleUploadedFile(name, b"\x89PNG\r\n\x1a\n", content_type="image/png")
+
+
+def site_form(dataset: Dataset):
+    return {
+        "name": "Benchmark site",
+        "siteType": dataset.site.site_type_id,
+        "latitude": "45°30'06.1\"N",
+        "longitude": "73°34'02.3\"W",
+        "description": "A site created by the benchmarks",
+        "size": "100",
+        "species": [json.dumps({"id": dataset.tree_type.pk, "quantity": 10})],
+        "researchPartnership": True,
+        "visibleMap": True,
+    }
+
+
+def batch_form(dataset: Dataset):
+    return {
+        "name": "Benchmark batch",
+        "sponsorName": "Sponsor",
+        "sponsorWebsiteUrl": "https://example.com",
+        "size": 10,
+        "soilCondition": "Good",
+        "survivedCount": 5,
+        "replaceCount": 1,
+        "totalPropagation": 2,
+        "fertilizerIds": [dataset.fertilizer_type.pk],
+        "mulchLayerIds": [dataset.mulch_layer_type.pk],
+        "seeds": [json.dumps({"id": dataset.tree_type.pk, "quantity": 5})],
+        "species": [json.dumps({"id": dataset.tree_type.pk, "quantity": 10})],
+        "supportedSpecieIds": [dataset.tree_type.pk],
+    }
+
+
+SCENARIOS = (
+    # Auth
+    Scenario(
+        "login",
+        "post",
+        "/auth/login/",
+        actor="anonymous",
+        data=lambda dataset: {"email": dataset.mega_admin.email, "password": PASSWORD},
+    ),
+    Scenario(
+        "register",
+        "post",
+        "/auth/register/",
+        expected_status=201,
+        actor="anonymous",
+        data=lambda _: {
+            "username": "benchmark",
+            "email": "benchmark@example.com",
+            "password": "Tr33s-are-great",
+            "passwordConfirmation": "Tr33s-are-great",
+        },
+    ),
+    Scenario(
+        "token_obtain",
+        "post",
+        "/auth/token/",
+        actor="anonymous",
+        data=lambda dataset: {"email": dataset.mega_admin.email, "password": PASSWORD},
+    ),
+    Scenario(
+        "token_refresh",
+        "post",
+        "/auth/token/refresh/",
+        actor="anonymous",
+        data=lambda dataset: {"refresh": str(RefreshToken.for_user(dataset.mega_admin))},
+    ),
+    # Posts
+    Scenario("post_list", "get", "/social/posts/?siteId={dataset.site.pk}&size=10"),
+    Scenario("post_list_all_sites", "get", "/social/posts/?size=10", actor="user"),
+    Scenario("post_list_page", "get", "/social/posts/?siteId={dataset.site.pk}&page=1&size=10"),
+    Scenario("post_list_following", "get", "/social/posts/?following=true&size=10", actor="user"),
+    Scenario(
+        "post_create",
+        "post",
+        "/social/posts/",
+        expected_status=201,
+        data=lambda dataset: {"site": dataset.site.pk, "body": "New trees planted today!"},
+        format="multipart",
+    ),
+    Scenario("post_detail", "get", "/social/posts/{dataset.post.pk}/"),
+    Scenario("post_delete", "delete", "/social/posts/{dataset.post.pk}/", expected_status=204),
+    # Uploads
+    Scenario(
+        "upload_create",
+        "post",
+        "/social/uploads/",
+        expected_status=201,
+        data=lambda _: {"filename": "video.mp4", "size": 1024 * 1024},
+    ),
+    Scenario("upload_detail", "get", "/social/uploads/{dataset.upload.pk}/"),
+    Scenario(
+        # The only chunk, so the asset is created from it
+        "upload_chunk",
+        "patch",
+        "/social/uploads/{dataset.upload.pk}/",
+        data=lambda dataset: b"\x89PNG\r\n\x1a\n"[: dataset.upload.size],
+        content_type="application/offset+octet-stream",
+        headers=lambda _: {"Upload-Offset": "0"},
+    ),
+    Scenario(
+        "upload_delete", "delete", "/social/uploads/{dataset.upload.pk}/", expected_status=204
+    ),
+    # Comments
+    Scenario("comment_list", "get", "/social/posts/{dataset.post.pk}/comments/"),
+    Scenario("comment_list_page", "get", "/social/posts/{dataset.post.pk}/comments/?size=20"),
+    Scenario(
+        "comment_create",
+        "post",
+        "/social/posts/{dataset.post.pk}/comments/",
+        expected_status=201,
+        actor="user",
+        data=lambda _: {"body": "Beautiful!"},
+    ),
+    Scenario(
+        "comment_delete",
+        "delete",
+        "/social/posts/{dataset.post.pk}/comments/{dataset.comment.pk}/",
+        expected_status=204,
+    ),
+    # Likes
+    Scenario(
+        "like_create",
+        "post",
+        "/social/posts/{dataset.post.pk}/likes/",
+        expected_status=201,
+        actor="forest_steward",
+    ),
+    Scenario(
+        "like_delete", "delete", "/social/posts/{dataset.post.pk}/likes/", expected_status=204
+    ),
+    # Social site page
+    Scenario("site_social_detail", "get", "/social/sites/{dataset.site.pk}/", actor="user"),
+    Scenario(
+        "site_social_detail_not_modified",
+        "get",
+        "/social/sites/{dataset.site.pk}/",
+        expected_status=304,
+        actor="user",
+        headers=lambda dataset: {
+            "If-None-Match": get_etag(site_version_key(dataset.site.pk), SITE_TYPES_VERSION_KEY)
+        },
+    ),
+    Scenario(
+        "site_public_status_update",
+        "patch",
+        "/social/sites/{dataset.site.pk}/public-status",
+        data=lambda _: {"isPublic": True},
+    ),
+    Scenario(
+        "announcement_update",
+        "patch",
+        "/social/sites/{dataset.site.pk}/announcements/",
+        data=lambda _: {"body": "Planting day on Saturday", "link": "https://example.com"},
+    ),
+    Scenario(
+        "contact_update",
+        "patch",
+        "/social/contacts/{dataset.site.contact_id}/",
+        data=lambda _: {"email": "new-contact@example.com"},
+    ),
+    Scenario(
+        "widget_create",
+        "post",
+        "/social/sites/{dataset.site.pk}/widgets/",
+        expected_status=201,
+        data=lambda _: {"title": "Trees", "body": "1000"},
+    ),
+    Scenario(
+        "widget_update",
+        "patch",
+        "/social/sites/{dataset.site.pk}/widgets/{dataset.widget.pk}/",
+        data=lambda _: {"title": "Volunteers", "body": "43"},
+    ),
+    Scenario(
+        "widget_delete",
+        "delete",
+        "/social/sites/{dataset.site.pk}/widgets/{dataset.widget.pk}/",
+        expected_status=204,
+    ),
+    # Analytics
+    Scenario("tree_species", "get", "/analytics/tree-species"),
+    Scenario(
+        "tree_species_not_modified",
+        "get",
+        "/analytics/tree-species",
+        expected_status=304,
+        headers=lambda _: {"If-None-Match": get_etag(TREE_TYPES_VERSION_KEY)},
+    ),
+    Scenario("site_types", "get", "/analytics/site-types"),
+    Scenario("fertilizers", "get", "/analytics/fertilizers"),
+    Scenario("mulch_layers", "get", "/analytics/mulch-layers"),
+    Scenario("site_list", "get", "/analytics/sites/"),
+    Scenario(
+        "site_create",
+        "post",
+        "/analytics/sites/",
+        expected_status=201,
+        data=lambda dataset: {**site_form(dataset), "image": upload("site.png")},
+        format="multipart",
+    ),
+    Scenario("site_detail", "get", "/analytics/sites/{dataset.site.pk}/"),
+    Scenario(
+        "site_update",
+        "patch",
+        "/analytics/sites/{dataset.site.pk}/",
+        data=site_form,
+        format="multipart",
+    ),
+    Scenario("site_delete", "delete", "/analytics/sites/{dataset.site.pk}/", expected_status=204),
+    Scenario("site_summary_list", "get", "/analytics/sites/summary"),
+    Scenario(
+        "site_summary_list_forest_steward",
+        "get",
+        "/analytics/sites/summary",
+        actor="forest_steward",
+    ),
+    Scenario("site_summary_detail", "get", "/analytics/sites/{dataset.site.pk}/summary"),
+    Scenario(
+        "site_admins_update",
+        "patch",
+        "/analytics/sites/{dataset.site.pk}/admins",
+        data=lambda dataset: {"ids": [dataset.forest_steward.pk]},
+    ),
+    Scenario(
+        "site_follow",
+        "post",
+        "/analytics/sites/{dataset.site.pk}/followers/",
+        expected_status=201,
+    ),
+    Scenario(
+        "site_unfollow",
+        "delete",
+        "/analytics/sites/{dataset.site.pk}/followers/",
+        expected_status=204,
+        actor="user",
+    ),
+    Scenario(
+        "site_is_following",
+        "get",
+        "/analytics/sites/{dataset.site.pk}/followers/current-user/",
+        actor="user",
+    ),
+    # Batches
+    Scenario("batch_list", "get", "/analytics/batches/"),
+    Scenario(
+        "batch_create",
+        "post",
+        "/analytics/batches/",
+        expected_status=201,
+        data=lambda dataset: {
+            **batch_form(dataset),
+            "site": dataset.site.pk,
+            "sponsorLogo": upload("logo.png"),
+        },
+        format="multipart",
+    ),
+    Scenario(
+        "batch_update",
+        "patch",
+        "/analytics/batches/{dataset.batch.pk}/",
+        data=batch_form,
+        format="multipart",
+    ),
+    Scenario(
+        "batch_delete", "delete", "/analytics/batches/{dataset.batch.pk}/", expected_status=204
+    ),
+    # Map
+    Scenario("site_map", "get", "/map/sites/", actor="anonymous"),
+    Scenario("site_map_forest_steward", "get", "/map/sites/", actor="forest_steward"),
+    Scenario("site_map_viewport", "get", "/map/sites/?bbox=-80,40,-60,50&zoom=15"),
+    Scenario("site_map_clustered", "get", "/map/sites/?bbox=-180,-90,180,90&zoom=2"),
+    # Users
+    Scenario("user_list", "get", "/users/"),
+    Scenario("forest_steward_list", "get", "/users/forest-stewards"),
+    Scenario("user_detail", "get", "/users/{dataset.mega_admin.pk}/"),
+    Scenario(
+        "user_update",
+        "patch",
+        "/users/{dataset.mega_admin.pk}/",
+        data=lambda dataset: {
+            "username": dataset.mega_admin.username,
+            "email": dataset.mega_admin.email,
+        },
+    ),
+    Scenario("current_user", "get", "/users/current_user/"),
+    Scenario(
+        "user_invitation_create",
+        "post",
+        "/user-invitations/",
+        data=lambda dataset: {"siteIds": [dataset.site.pk], "email": "new-steward@example.com"},
+    ),
+    Scenario(
+        "user_invitation_detail",
+        "get",
+        "/user-invitations/{dataset.invitation.code}",
+        actor="anonymous",
+    ),
+    Scenario("site_admins", "get", "/site-admins/"),
+)
+
+# Measured again with FEED_FAN_OUT_ON_WRITE, to compare the reads it saves with the writes it adds
+FEED_FAN_OUT_SCENARIO_NAMES = ("post_list_following", "post_create", "site_follow", "site_unfollow")
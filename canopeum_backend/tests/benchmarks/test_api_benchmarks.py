@@ -0,0 +1,159 @@
+"""
+Query count, latency and payload size of every API route, against a committed baseline.
+The camelCase translation of response bodies is also timed against the library it replaces,
+and the orjson renderer against the default one.
+The feed scenarios are measured again with the fan-out on write, as `<name>_fan_out_on_write`.
+
+Environment variables:
+- BENCHMARK_DATASET: dataset sizes, such as `sites=50,posts_per_site=200`.
+  Budgets are only enforced with the default sizes, which the baseline was recorded with.
+- BENCHMARK_ITERATIONS: measured runs per scenario, 5 by default.
+- BENCHMARK_TIMINGS=1: also enforce the latency budgets and time the camelCase translation and
+  the orjson renderer. Off by default, timings depend on the machine and how loaded it is.
+- BENCHMARK_UPDATE_BASELINE=1: record the new scenarios and those whose query count or payload
+  size changed in the baseline. With BENCHMARK_TIMINGS=1, re-record every scenario.
+- BENCHMARK_REPORT: path of a JSON file to write the measurements to.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from dataclasses import asdict
+from importlib.util import find_spec
+from pathlib import Path
+from unittest import mock, skipUnless
+
+from django.test import TestCase as DBTestCase, override_settings
+from django.urls import URLPattern, URLResolver, get_resolver, resolve
+from djangorestframework_camel_case import util as camel_case_library
+
+from canopeum_backend import camel_case
+from canopeum_backend.models import FeedEntry
+from canopeum_backend.utils.geocoding_service import FakeGeocoder, GeocodingService
+from canopeum_backend.utils.weather_service import weather_service
+from tests.fixtures import enable_feed_fan_out_on_write
+
+from .dataset import Dataset, DatasetSize, seed_dataset
+from .harness import (
+    Budget,
+    Measurement,
+    get_client,
+    load_baseline,
+    run_scenario,
+    save_measurements,
+    time_call,
+    update_baseline,
+)
+from .scenarios import FEED_FAN_OUT_SCENARIO_NAMES, SCENARIOS, UNBENCHMARKED_ROUTES
+
+DATASET_SIZE = DatasetSize.parse(os.getenv("BENCHMARK_DATASET", ""))
+ITERATIONS = int(os.getenv("BENCHMARK_ITERATIONS", "5"))
+CHECK_TIMINGS = os.getenv("BENCHMARK_TIMINGS") == "1"
+UPDATE_BASELINE = os.getenv("BENCHMARK_UPDATE_BASELINE") == "1"
+REPORT_PATH = os.getenv("BENCHMARK_REPORT")
+MEDIA_ROOT = tempfile.mkdtemp(prefix="canopeum-benchmarks-")
+
+
+def get_routes(patterns: list[URLPattern | URLResolver]):
+    return {str(pattern.pattern) for pattern in patterns}
+
+
+@override_settings(
+    # Hashing is slow by design, keep it from dwarfing everything else in auth scenarios
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+    MEDIA_ROOT=MEDIA_ROOT,
+)
+class APIBenchmarks(DBTestCase):
+    dataset: Dataset
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = seed_dataset(DATASET_SIZE)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        # Nothing may reach external services
+        self.enterContext(mock.patch.object(weather_service, "schedule_refresh"))
+        self.enterContext(
+            mock.patch(
+                "canopeum_backend.models.geocoding_service", GeocodingService(FakeGeocoder())
+            )
+        )
+
+    def test_every_route_is_benchmarked(self):
+        benchmarked_routes = {
+            resolve(scenario.build_path(self.dataset).partition("?")[0]).route
+            for scenario in SCENARIOS
+        }
+        unbenchmarked_routes = (
+            get_routes(get_resolver().url_patterns)
+            - benchmarked_routes
+            - UNBENCHMARKED_ROUTES.keys()
+        )
+        assert not unbenchmarked_routes, f"Add scenarios for {sorted(unbenchmarked_routes)}"
+
+    def test_endpoints_are_within_budget(self):
+        measurements: dict[str, Measurement] = {}
+        for scenario in SCENARIOS:
+            measurements[scenario.name] = run_scenario(scenario, self.dataset, ITERATIONS)
+        # Last, the feeds stay enabled until the end of the test
+        enable_feed_fan_out_on_write(self)
+        FeedEntry.rebuild()
+        for scenario in SCENARIOS:
+            if scenario.name in FEED_FAN_OUT_SCENARIO_NAMES:
+                measurements[f"{scenario.name}_fan_out_on_write"] = run_scenario(
+                    scenario, self.dataset, ITERATIONS
+                )
+
+        if REPORT_PATH:
+            save_measurements(measurements, Path(REPORT_PATH))
+        if DatasetSize() != DATASET_SIZE:
+            self.skipTest("The baseline was recorded with the default dataset sizes")
+        baseline = load_baseline()
+        budget = Budget(check_latency=CHECK_TIMINGS)
+        if UPDATE_BASELINE:
+            save_measurements(update_baseline(baseline, measurements, budget))
+            return
+
+        for name, measurement in measurements.items():
+            with self.subTest(name):
+                assert name in baseline, "No baseline, run with BENCHMARK_UPDATE_BASELINE=1"
+                exceeded = budget.check(measurement, baseline[name])
+                assert not exceeded, f"{asdict(measurement)} exceeds its budget: {exceeded}"
+
+    def get_summaries_payload(self):
+        summaries = get_client(self.dataset, "mega_admin").get("/analytics/sites/summary").data
+        # About the summaries of a few hundred sites, whatever the dataset size
+        return list(summaries) * max(1, 300 // len(summaries))
+
+    @skipUnless(CHECK_TIMINGS, "Timings are only checked with BENCHMARK_TIMINGS=1")
+    def test_camel_case_translation_beats_the_library(self):
+        payload = self.get_summaries_payload()
+        assert camel_case.camelize(payload) == camel_case_library.camelize(payload)
+
+        library_ms = time_call(camel_case_library.camelize, payload, ITERATIONS)
+        compiled_ms = time_call(camel_case.camelize, payload, ITERATIONS)
+
+        assert compiled_ms < library_ms, (
+            f"{compiled_ms:.1f}ms, the library takes {library_ms:.1f}ms"
+        )
+
+    @skipUnless(CHECK_TIMINGS, "Timings are only checked with BENCHMARK_TIMINGS=1")
+    @skipUnless(find_spec("orjson"), "orjson isn't installed")
+    def test_orjson_renderer_beats_the_json_renderer(self):
+        payload = self.get_summaries_payload()
+        json_renderer = camel_case.CamelCaseJSONRenderer()
+        orjson_renderer = camel_case.CamelCaseORJSONRenderer()
+        assert json.loads(orjson_renderer.render(payload)) == json.loads(
+            json_renderer.render(payload)
+        )
+
+        json_ms = time_call(json_renderer.render, payload, ITERATIONS)
+        orjson_ms = time_call(orjson_renderer.render, payload, ITERATIONS)
+
+        assert orjson_ms < json_ms, f"{orjson_ms:.1f}ms, the json renderer takes {json_ms:.1f}ms"
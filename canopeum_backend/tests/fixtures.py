@@ -0,0 +1,154 @@
+from collections.abc import Callable
+from concurrent.futures import Executor, Future
+from typing import Any, override
+from unittest import TestCase, mock
+
+from canopeum_backend.models import (
+    Asset,
+    Batch,
+    Batchfertilizer,
+    Batchmulchlayer,
+    BatchSeed,
+    BatchSpecies,
+    BatchSponsor,
+    BatchSupportedSpecies,
+    Coordinate,
+    Fertilizertype,
+    Internationalization,
+    Mulchlayertype,
+    Post,
+    Role,
+    RoleName,
+    Site,
+    Siteadmin,
+    Sitetreespecies,
+    Sitetype,
+    Treetype,
+    User,
+)
+from canopeum_backend.utils.weather_service import weather_service
+
+
+def create_roles():
+    # User.role defaults to pk 1, so create them in RoleName order like initialize_database
+    return {role: Role.objects.create(name=role) for role in RoleName}
+
+
+def create_user(username: str, role: RoleName = RoleName.User):
+    return User.objects.create_user(
+        username=username,
+        email=f"{username}@example.com",
+        password="password",  # noqa: S106 # MOCK_PASSWORD
+        role=Role.objects.get(name=role),
+    )
+
+
+def create_site_type(name: str):
+    return Sitetype.objects.create(name=Internationalization.objects.create(en=name, fr=name))
+
+
+def create_tree_type(name: str):
+    return Treetype.objects.create(name=Internationalization.objects.create(en=name, fr=name))
+
+
+def create_fertilizer_type(name: str):
+    return Fertilizertype.objects.create(name=Internationalization.objects.create(en=name, fr=name))
+
+
+def create_mulch_layer_type(name: str):
+    return Mulchlayertype.objects.create(name=Internationalization.objects.create(en=name, fr=name))
+
+
+def create_site(name: str, site_type: Sitetype | None = None, *, is_public: bool = True):
+    return Site.objects.create(
+        name=name,
+        is_public=is_public,
+        site_type=site_type,
+        coordinate=Coordinate.objects.create(
+            dms_latitude="45°30'06.1\"N",
+            dms_longitude="73°34'02.3\"W",
+            dd_latitude=45.5017,
+            dd_longitude=-73.5673,
+            address="Montréal",
+        ),
+        visitor_count=0,
+    )
+
+
+def create_post(site: Site, body: str = "New trees planted today!"):
+    return Post.objects.create(site=site, body=body)
+
+
+def create_site_species(site: Site, tree_type: Treetype, quantity: int):
+    return Sitetreespecies.objects.create(site=site, tree_type=tree_type, quantity=quantity)
+
+
+def create_batch(
+    site: Site, *, survived_count: int | None = None, total_propagation: int | None = None
+):
+    sponsor = BatchSponsor.objects.create(
+        name=f"{site.name} sponsor",
+        url="https://example.com",
+        logo=Asset.objects.create(asset="logo.png"),
+    )
+    return Batch.objects.create(
+        site=site,
+        name=f"{site.name} batch",
+        sponsor=sponsor,
+        survived_count=survived_count,
+        total_propagation=total_propagation,
+    )
+
+
+def create_batch_species(batch: Batch, tree_type: Treetype, quantity: int):
+    return BatchSpecies.objects.create(batch=batch, tree_type=tree_type, quantity=quantity)
+
+
+def create_site_admin(user: User, site: Site):
+    return Siteadmin.objects.create(user=user, site=site)
+
+
+def add_batch_details(
+    batch: Batch,
+    tree_type: Treetype,
+    fertilizer_type: Fertilizertype,
+    mulch_layer_type: Mulchlayertype,
+):
+    """Fill every child relation of a batch, as the batch create endpoint would."""
+    Batchfertilizer.objects.create(batch=batch, fertilizer_type=fertilizer_type)
+    Batchmulchlayer.objects.create(batch=batch, mulch_layer_type=mulch_layer_type)
+    BatchSupportedSpecies.objects.create(batch=batch, tree_type=tree_type)
+    BatchSeed.objects.create(batch=batch, tree_type=tree_type, quantity=5)
+    BatchSpecies.objects.create(batch=batch, tree_type=tree_type, quantity=10)
+
+
+def disable_weather_refresh(test_case: TestCase):
+    """Keep listings from reaching Open-Meteo in the background during the test."""
+    patcher = mock.patch.object(weather_service, "schedule_refresh_for_sites")
+    test_case.addCleanup(patcher.stop)
+    return patcher.start()
+
+
+class DeferredExecutor(Executor):
+    """Holds submitted refreshes until `run_pending`, standing in for the background threads."""
+
+    def __init__(self):
+        self.pending: list[Callable[[], Any]] = []
+
+    @override
+    def submit(self, fn, /, *args, **kwargs):
+        self.pending.append(lambda: fn(*args, **kwargs))
+        return Future()
+
+    def run_pending(self):
+        pending, self.pending = self.pending, []
+        for call in pending:
+            call()
+
+
+def enable_feed_fan_out_on_write(test_case: TestCase):
+    """Maintain and read the precomputed feeds of followed sites during the test."""
+    for module in ("models", "views"):
+        patcher = mock.patch(f"canopeum_backend.{module}.FEED_FAN_OUT_ON_WRITE", True)
+        test_case.addCleanup(patcher.stop)
+        patcher.start()
@@ -0,0 +1,118 @@
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase as DBTestCase, override_settings
+
+from canopeum_backend.models import Asset, AssetBlob, Batch, BatchSponsor, PostAsset
+from canopeum_backend.serializers import BatchSponsorSerializer
+from canopeum_backend.utils.image_variant_service import (
+    FakeResizer,
+    ImageVariantService,
+    variant_name,
+)
+
+from .fixtures import DeferredExecutor, create_batch, create_post, create_site
+from .test_image_variants import IN_MEMORY_STORAGES
+
+
+def upload(content: bytes, file_name: str = "logo.png"):
+    return Asset.objects.create(asset=ContentFile(content, name=file_name))
+
+
+@override_settings(STORAGES=IN_MEMORY_STORAGES)
+class ContentAddressedAssetTests(DBTestCase):
+    def setUp(self):
+        self.executor = DeferredExecutor()
+        patcher = mock.patch(
+            "canopeum_backend.models.image_variant_service",
+            ImageVariantService(FakeResizer(), storage=default_storage, executor=self.executor),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_ref_count(self, name: str):
+        return AssetBlob.objects.get(pk=name).ref_count
+
+    def test_identical_uploads_share_one_stored_file(self):
+        logo = upload(b"logo", "logo.PNG")
+        copy = upload(b"logo", "sponsor-logo.png")
+        other = upload(b"other logo")
+
+        assert logo.asset.name == copy.asset.name
+        assert logo.asset.name.startswith("blobs/")
+        assert logo.asset.name.endswith(".png")
+        assert other.asset.name != logo.asset.name
+        assert self.get_ref_count(logo.asset.name) == 2
+        with default_storage.open(logo.asset.name) as stored_file:
+            assert stored_file.read() == b"logo"
+
+    def test_identical_uploads_share_their_variants(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            logo = upload(b"logo")
+        self.executor.run_pending()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            copy = upload(b"logo")
+        assert copy.variant_widths == [160, 480]
+        assert self.executor.pending == []
+        assert logo.pk != copy.pk
+
+    def test_stored_file_is_deleted_with_its_last_asset(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            logo = upload(b"logo")
+        self.executor.run_pending()
+        copy = upload(b"logo")
+        name = logo.asset.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            logo.delete()
+        assert default_storage.exists(name)
+        assert self.get_ref_count(name) == 1
+
+        with self.captureOnCommitCallbacks(execute=True):
+            copy.delete()
+        assert not default_storage.exists(name)
+        assert not default_storage.exists(variant_name(name, 160))
+        assert not AssetBlob.objects.filter(pk=name).exists()
+
+        # Uploaded again after being dropped
+        assert default_storage.exists(upload(b"logo").asset.name)
+
+    def test_deleting_a_post_asset_keeps_a_shared_file(self):
+        post = create_post(create_site("Site"))
+        logo = upload(b"image")
+        post_asset = PostAsset.objects.create(post=post, asset=upload(b"image"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            post_asset.delete()
+        assert default_storage.exists(logo.asset.name)
+        assert self.get_ref_count(logo.asset.name) == 1
+
+    def test_replacing_a_sponsor_logo_keeps_the_sponsor(self):
+        batch = create_batch(create_site("Site"))
+        sponsor = batch.sponsor
+        old_logo = upload(b"old logo")
+        sponsor.logo = old_logo
+        sponsor.save()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            BatchSponsorSerializer().update(
+                sponsor, {"logo": {"asset": ContentFile(b"new logo", name="new.png")}}
+            )
+
+        sponsor = BatchSponsor.objects.get(pk=sponsor.pk)
+        with sponsor.logo.asset.open() as logo:
+            assert logo.read() == b"new logo"
+        assert Batch.objects.filter(pk=batch.pk, sponsor=sponsor).exists()
+        assert not Asset.objects.filter(pk=old_logo.pk).exists()
+        assert not default_storage.exists(old_logo.asset.name)
+
+    def test_references_are_counted_again_after_bulk_creation(self):
+        logo = upload(b"logo")
+        Asset.objects.bulk_create([Asset(asset=logo.asset.name), Asset(asset="legacy.png")])
+
+        AssetBlob.count_references()
+
+        assert self.get_ref_count(logo.asset.name) == 2
+        assert self.get_ref_count("legacy.png") == 1
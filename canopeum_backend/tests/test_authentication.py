@@ -0,0 +1,68 @@
+from django.db import connection
+from django.test import TestCase as DBTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from canopeum_backend.authentication import CachedUserJWTAuthentication, authenticated_users
+from canopeum_backend.authorization import invalidate_authorization_context
+from canopeum_backend.models import RoleName, User
+
+from .fixtures import create_roles, create_site, create_site_admin, create_user
+
+AUTHENTICATION_TABLES = (
+    "canopeum_backend_user",
+    "canopeum_backend_role",
+    "canopeum_backend_siteadmin",
+)
+
+
+class CachedUserJWTAuthenticationTests(DBTestCase):
+    forest_steward: User
+    client: APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        create_roles()
+        cls.forest_steward = create_user("steward", RoleName.ForestSteward)
+        create_site_admin(cls.forest_steward, create_site("Private site", is_public=False))
+
+    def setUp(self):
+        authenticated_users.pop(self.forest_steward.pk)
+        invalidate_authorization_context(self.forest_steward.pk)
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.forest_steward)}"
+        )
+
+    def get_authentication_queries(self, url: str):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        assert response.status_code == 200, response.content
+        return [
+            query["sql"]
+            for query in context.captured_queries
+            if any(table in query["sql"] for table in AUTHENTICATION_TABLES)
+        ]
+
+    def test_hot_endpoints_need_no_authentication_queries(self):
+        # User with its role, then the role name and admin site ids of the authorization context
+        assert len(self.get_authentication_queries("/map/sites/")) == 3
+        assert self.get_authentication_queries("/map/sites/") == []
+        assert self.get_authentication_queries("/social/posts/?size=5") == []
+
+    def test_user_changes_are_seen_right_away(self):
+        self.client.get("/map/sites/")
+        self.forest_steward.is_active = False
+        self.forest_steward.save()
+        assert self.client.get("/map/sites/").status_code == 401
+
+    def test_requests_get_their_own_user_instance(self):
+        authentication = CachedUserJWTAuthentication()
+        token = AccessToken.for_user(self.forest_steward)
+        user = authentication.get_user(token)
+        assert user.username == "steward"
+        cached_user = authenticated_users.get(self.forest_steward.pk)
+        assert cached_user is not None
+        assert user is not cached_user
+        assert authentication.get_user(token) is not user
@@ -0,0 +1,82 @@
+from django.test import TestCase as DBTestCase
+from rest_framework.test import APIClient
+
+from canopeum_backend.authorization import (
+    ANONYMOUS_CONTEXT,
+    get_authorization_context,
+    invalidate_authorization_context,
+)
+from canopeum_backend.models import Role, RoleName, Site, Siteadmin, User
+from canopeum_backend.views import get_admin_sites, get_public_sites_unless_admin
+
+from .fixtures import create_roles, create_site, create_site_admin, create_user
+
+
+class AuthorizationContextTests(DBTestCase):
+    forest_steward: User
+    public_site: Site
+    private_site: Site
+    other_private_site: Site
+
+    @classmethod
+    def setUpTestData(cls):
+        create_roles()
+        cls.forest_steward = create_user("steward", RoleName.ForestSteward)
+        cls.public_site = create_site("Public site")
+        cls.private_site = create_site("Private site", is_public=False)
+        cls.other_private_site = create_site("Other private site", is_public=False)
+
+    def setUp(self):
+        invalidate_authorization_context(self.forest_steward.pk)
+        create_site_admin(self.forest_steward, self.private_site)
+
+    def test_context_is_loaded_once(self):
+        user = User.objects.get(pk=self.forest_steward.pk)
+        # Role and admin site ids
+        with self.assertNumQueries(2):
+            context = get_authorization_context(user)
+        assert context.is_forest_steward
+        assert context.admin_site_ids == {self.private_site.pk}
+        other_request_user = User.objects.get(pk=user.pk)
+        with self.assertNumQueries(0):
+            assert get_authorization_context(other_request_user) == context
+
+    def test_siteadmin_changes_invalidate_the_context(self):
+        get_authorization_context(self.forest_steward)
+        create_site_admin(self.forest_steward, self.other_private_site)
+        assert get_authorization_context(self.forest_steward).admin_site_ids == {
+            self.private_site.pk,
+            self.other_private_site.pk,
+        }
+
+        Siteadmin.objects.filter(site=self.private_site).delete()
+        assert get_authorization_context(self.forest_steward).admin_site_ids == {
+            self.other_private_site.pk
+        }
+
+        self.other_private_site.delete()
+        assert get_authorization_context(self.forest_steward).admin_site_ids == set()
+
+    def test_role_changes_invalidate_the_context(self):
+        get_authorization_context(self.forest_steward)
+        self.forest_steward.role = Role.objects.get(name=RoleName.MegaAdmin)
+        self.forest_steward.save()
+        assert get_authorization_context(self.forest_steward).is_mega_admin
+
+    def test_anonymous_users_have_no_rights(self):
+        assert get_authorization_context(None) is ANONYMOUS_CONTEXT
+        assert not ANONYMOUS_CONTEXT.is_site_admin(self.public_site.pk)
+
+    def test_site_scoping(self):
+        assert set(get_public_sites_unless_admin(self.forest_steward)) == {
+            self.public_site,
+            self.private_site,
+        }
+        assert list(get_admin_sites(self.forest_steward) or []) == [self.private_site]
+        assert set(get_public_sites_unless_admin(None)) == {self.public_site}
+
+    def test_private_site_permission(self):
+        client = APIClient()
+        client.force_authenticate(self.forest_steward)
+        assert client.get(f"/social/sites/{self.private_site.pk}/").status_code == 200
+        assert client.get(f"/social/sites/{self.other_private_site.pk}/").status_code == 403
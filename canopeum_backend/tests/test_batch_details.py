@@ -0,0 +1,205 @@
+import json
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase as DBTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from canopeum_backend.authorization import invalidate_authorization_context
+from canopeum_backend.models import (
+    Batch,
+    BatchSpecies,
+    Fertilizertype,
+    Mulchlayertype,
+    RoleName,
+    Treetype,
+    User,
+)
+from canopeum_backend.reference_data import reference_data
+from canopeum_backend.serializers import BatchDetailSerializer
+
+from .fixtures import (
+    add_batch_details,
+    create_batch,
+    create_fertilizer_type,
+    create_mulch_layer_type,
+    create_roles,
+    create_site,
+    create_tree_type,
+    create_user,
+    disable_weather_refresh,
+)
+
+
+class BatchDetailsQueryCountTests(DBTestCase):
+    mega_admin: User
+    tree_type: Treetype
+    fertilizer_type: Fertilizertype
+    mulch_layer_type: Mulchlayertype
+
+    @classmethod
+    def setUpTestData(cls):
+        create_roles()
+        cls.mega_admin = create_user("admin", RoleName.MegaAdmin)
+        cls.tree_type = create_tree_type("Red Maple")
+        cls.fertilizer_type = create_fertilizer_type("Manure")
+        cls.mulch_layer_type = create_mulch_layer_type("Compost")
+
+    def setUp(self):
+        disable_weather_refresh(self)
+        self.client = APIClient()
+        self.client.force_authenticate(self.mega_admin)
+
+    def create_detailed_sites(self, count: int):
+        for i in range(count):
+            site = create_site(f"Site {i}")
+            for _ in range(2):
+                add_batch_details(
+                    create_batch(site), self.tree_type, self.fertilizer_type, self.mulch_layer_type
+                )
+
+    def count_queries(self, url: str):
+        # Compare cold requests, the authorization context is otherwise cached after the first
+        invalidate_authorization_context(self.mega_admin.pk)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        assert response.status_code == 200, response.content
+        return len(context.captured_queries)
+
+    def test_batch_list_query_count_is_constant(self):
+        self.create_detailed_sites(1)
+        query_count = self.count_queries("/analytics/batches/")
+        self.create_detailed_sites(5)
+        assert self.count_queries("/analytics/batches/") == query_count
+
+    def test_site_summary_list_query_count_is_constant(self):
+        self.create_detailed_sites(1)
+        query_count = self.count_queries("/analytics/sites/summary")
+        self.create_detailed_sites(5)
+        assert self.count_queries("/analytics/sites/summary") == query_count
+
+    def test_batch_list_content(self):
+        self.create_detailed_sites(1)
+        batch = self.client.get("/analytics/batches/").json()[0]
+        assert [fertilizer["en"] for fertilizer in batch["fertilizers"]] == ["Manure"]
+        assert [mulch_layer["en"] for mulch_layer in batch["mulchLayers"]] == ["Compost"]
+        assert [specie["en"] for specie in batch["supportedSpecies"]] == ["Red Maple"]
+        assert batch["seeds"][0]["treeType"]["en"] == "Red Maple"
+        assert batch["species"][0]["quantity"] == 10
+        assert batch["totalNumberSeeds"] == 5
+        assert batch["plantCount"] == 10
+        assert batch["sponsor"]["name"] == "Site 0 sponsor"
+
+    def test_serializer_reads_only_prefetched_data(self):
+        self.create_detailed_sites(3)
+        batches = list(Batch.objects.with_details())
+        # The type names are resolved from the in-memory reference data
+        reference_data.get()
+        with self.assertNumQueries(0):
+            BatchDetailSerializer(batches, many=True).data  # noqa: B018 # Evaluates serialization
+
+
+class BatchWriteTests(DBTestCase):
+    mega_admin: User
+    tree_types: list[Treetype]
+    fertilizer_type: Fertilizertype
+    mulch_layer_type: Mulchlayertype
+    client: APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        create_roles()
+        cls.mega_admin = create_user("admin", RoleName.MegaAdmin)
+        cls.tree_types = [create_tree_type(f"Tree {i}") for i in range(6)]
+        cls.fertilizer_type = create_fertilizer_type("Manure")
+        cls.mulch_layer_type = create_mulch_layer_type("Compost")
+
+    def setUp(self):
+        disable_weather_refresh(self)
+        self.client = APIClient()
+        self.client.force_authenticate(self.mega_admin)
+        self.batch = create_batch(create_site("Site"))
+        add_batch_details(
+            self.batch, self.tree_types[0], self.fertilizer_type, self.mulch_layer_type
+        )
+
+    def patch_batch(self, species: dict[int, int], **data: object):
+        return self.client.patch(
+            f"/analytics/batches/{self.batch.pk}/",
+            {
+                "sponsorName": "Site sponsor",
+                "sponsorWebsiteUrl": "https://example.com",
+                "species": [
+                    json.dumps({"id": pk, "quantity": quantity}) for pk, quantity in species.items()
+                ],
+                **data,
+            },
+            format="multipart",
+        )
+
+    def test_create_inserts_details_in_bulk(self):
+        response = self.client.post(
+            "/analytics/batches/",
+            {
+                "site": self.batch.site_id,
+                "sponsorName": "Sponsor",
+                "sponsorWebsiteUrl": "https://example.com",
+                "sponsorLogo": SimpleUploadedFile("logo.png", b"\x89PNG", content_type="image/png"),
+                "fertilizerIds": [self.fertilizer_type.pk],
+                "species": [
+                    json.dumps({"id": tree_type.pk, "quantity": 3}) for tree_type in self.tree_types
+                ],
+            },
+            format="multipart",
+        )
+
+        assert response.status_code == 201, response.content
+        batch = Batch.objects.get(pk=response.json()["id"])
+        assert batch.get_plant_count() == 3 * 6
+        assert batch.batchfertilizer_set.count() == 1
+
+    def test_patch_only_touches_changed_rows(self):
+        kept_species = BatchSpecies.objects.get(batch=self.batch)
+
+        response = self.patch_batch(
+            {self.tree_types[0].pk: 12, self.tree_types[1].pk: 4},
+            supportedSpecieIds=[self.tree_types[0].pk],
+        )
+
+        assert response.status_code == 200, response.content
+        species = dict(
+            BatchSpecies.objects.filter(batch=self.batch).values_list("tree_type_id", "quantity")
+        )
+        assert species == {self.tree_types[0].pk: 12, self.tree_types[1].pk: 4}
+        assert BatchSpecies.objects.filter(pk=kept_species.pk, quantity=12).exists()
+        assert self.batch.batchsupportedspecies_set.count() == 1
+        # Left out of the form, so removed like before
+        assert not self.batch.batchfertilizer_set.exists()
+
+    def test_patch_query_count_does_not_grow_with_species(self):
+        # Warms up the in-process caches
+        self.patch_batch({self.tree_types[0].pk: 1})
+        # Both update then insert some species
+        with CaptureQueriesContext(connection) as few:
+            self.patch_batch({self.tree_types[0].pk: 2, self.tree_types[1].pk: 1})
+        with CaptureQueriesContext(connection) as many:
+            self.patch_batch({tree_type.pk: 3 for tree_type in self.tree_types})
+
+        assert len(many.captured_queries) == len(few.captured_queries)
+
+    def test_unknown_types_are_rejected_before_writing(self):
+        response = self.patch_batch({0: 1}, name="Renamed")
+
+        assert response.status_code == 400
+        self.batch.refresh_from_db()
+        assert self.batch.name != "Renamed"
+        assert self.batch.get_plant_count() == 10
+
+    def test_invalid_forms_are_rolled_back(self):
+        # The sponsor is saved before the batch is validated
+        response = self.patch_batch({}, sponsorName="Renamed", size="not a number")
+
+        assert response.status_code == 400
+        self.batch.sponsor.refresh_from_db()
+        assert self.batch.sponsor.name == "Site sponsor"
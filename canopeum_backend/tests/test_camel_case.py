@@ -0,0 +1,105 @@
+import json
+from datetime import UTC, datetime
+from decimal import Decimal
+from importlib.util import find_spec
+from typing import Any
+from unittest import TestCase, skipUnless
+
+from django.http import QueryDict
+from django.test import TestCase as DBTestCase
+from django.utils.datastructures import MultiValueDict
+from django.utils.translation import gettext_lazy
+from djangorestframework_camel_case import util as library
+from rest_framework import serializers
+from rest_framework.test import APIClient
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from canopeum_backend import camel_case
+from canopeum_backend.models import Post
+
+from .fixtures import create_roles, create_site, create_user
+
+KEYS = (
+    "id",
+    "site_type",
+    "dd_latitude",
+    "image_1_url",
+    "_private",
+    "trailing_",
+    "double__underscore",
+    "already_camelCase",
+)
+CAMEL_KEYS = ("id", "siteType", "ddLatitude", "image1Url", "HTTPResponse", "area2D", "v2Api")
+
+
+class KeyTranslationTests(TestCase):
+    def test_keys_are_camelized_like_the_library(self):
+        data = {
+            key: [{key: 1}, (gettext_lazy("Site"), None)] for key in (*KEYS, 1, gettext_lazy("x_y"))
+        }
+
+        assert camel_case.camelize(data) == library.camelize(data)
+
+    def test_keys_are_underscoreized_like_the_library(self):
+        data = {key: [{key: "value"}, 1.5] for key in CAMEL_KEYS}
+
+        assert camel_case.underscoreize(data) == library.underscoreize(data)
+
+    def test_query_parameters_and_files_are_underscoreized_like_the_library(self):
+        query = QueryDict("siteType=1&siteType=2&pageSize=3")
+        files = MultiValueDict({"mediaFile": ["first", "second"]})
+
+        assert list(camel_case.underscoreize(query).lists()) == list(
+            library.underscoreize(query).lists()
+        )
+        assert list(camel_case.underscoreize(files).lists()) == list(
+            library.underscoreize(files).lists()
+        )
+
+
+@skipUnless(find_spec("orjson"), "orjson isn't installed")
+class ORJSONRendererTests(TestCase):
+    def test_content_is_the_same_as_the_json_renderer(self):
+        serializer = serializers.Serializer[Any]()
+        data = ReturnList(
+            [
+                ReturnDict(
+                    {
+                        "dd_latitude": Decimal("45.50884"),
+                        "created_at": datetime(2024, 5, 1, 12, 30, 15, 250000, tzinfo=UTC),
+                        "site_type": {1: gettext_lazy("Park")},
+                    },
+                    serializer=serializer,
+                )
+            ],
+            serializer=serializer,
+        )
+
+        rendered = camel_case.CamelCaseORJSONRenderer().render(data)
+
+        assert json.loads(rendered) == json.loads(camel_case.CamelCaseJSONRenderer().render(data))
+        assert b'"createdAt":"2024-05-01T12:30:15.250000Z"' in rendered
+        assert camel_case.CamelCaseORJSONRenderer().render(None) == b""
+
+    def test_indent_is_requested_like_the_json_renderer(self):
+        rendered = camel_case.CamelCaseORJSONRenderer().render(
+            {"site_id": 1}, "application/json; indent=4"
+        )
+
+        assert rendered == b'{\n  "siteId": 1\n}'
+
+
+class CamelCaseAPITests(DBTestCase):
+    def test_request_and_response_bodies_are_camel_case(self):
+        create_roles()
+        client = APIClient()
+        client.force_authenticate(create_user("user"))
+        site = create_site("Site")
+
+        response = client.post(
+            "/social/posts/", {"site": site.pk, "body": "New trees!"}, format="json"
+        )
+
+        assert response.status_code == 201, response.content
+        assert {"likeCount", "commentCount", "hasLiked"} <= response.json().keys()
+        assert Post.objects.filter(site=site).exists()
@@ -0,0 +1,163 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase as DBTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from canopeum_backend.models import Asset, ChunkedUpload, Post, RoleName, Site, User
+from canopeum_backend.utils.image_variant_service import FakeResizer, ImageVariantService
+
+from .fixtures import DeferredExecutor, create_roles, create_site, create_user
+from .test_image_variants import IN_MEMORY_STORAGES
+
+
+@override_settings(STORAGES=IN_MEMORY_STORAGES)
+class ChunkedUploadTests(DBTestCase):
+    user: User
+    other_user: User
+    site: Site
+    client: APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        create_roles()
+        cls.user = create_user("uploader")
+        cls.other_user = create_user("other", RoleName.MegaAdmin)
+        cls.site = create_site("Site")
+
+    def setUp(self):
+        patcher = mock.patch(
+            "canopeum_backend.models.image_variant_service",
+            ImageVariantService(
+                FakeResizer(), storage=default_storage, executor=DeferredExecutor()
+            ),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def start_upload(self, size: int):
+        response = self.client.post(
+            "/social/uploads/", {"filename": "video.mp4", "size": size}, format="json"
+        )
+        assert response.status_code == 201, response.content
+        return response.json()["id"]
+
+    def send_chunk(self, upload_id: str, offset: int, chunk: bytes):
+        return self.client.patch(
+            f"/social/uploads/{upload_id}/",
+            chunk,
+            content_type="application/offset+octet-stream",
+            headers={"Upload-Offset": str(offset)},
+        )
+
+    def upload(self, content: bytes):
+        upload_id = self.start_upload(len(content))
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.send_chunk(upload_id, 0, content)
+        return response.json()["asset"]
+
+    def test_chunks_are_joined_into_an_asset(self):
+        upload_id = self.start_upload(10)
+
+        response = self.send_chunk(upload_id, 0, b"first")
+        assert response.status_code == 200, response.content
+        assert response.json()["offset"] == 5
+        assert response.json()["asset"] is None
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.send_chunk(upload_id, 5, b"-last")
+
+        asset = Asset.objects.get(pk=response.json()["asset"])
+        with asset.asset.open() as stored_file:
+            assert stored_file.read() == b"first-last"
+        assert asset.asset.name.endswith(".mp4")
+        assert not default_storage.exists(f"uploads/{upload_id}/000000")
+
+    def test_resumes_from_the_current_offset(self):
+        upload_id = self.start_upload(10)
+        self.send_chunk(upload_id, 0, b"first")
+
+        # The client lost the response of its first chunk and sends it again
+        response = self.send_chunk(upload_id, 0, b"first")
+        assert response.status_code == 409
+        assert response.json()["offset"] == 5
+
+        assert self.client.get(f"/social/uploads/{upload_id}/").json()["offset"] == 5
+
+    def test_chunks_are_limited(self):
+        upload_id = self.start_upload(10)
+
+        with mock.patch("canopeum_backend.views.UPLOAD_CHUNK_MAX_SIZE", 4):
+            assert self.send_chunk(upload_id, 0, b"first").status_code == 413
+        assert self.send_chunk(upload_id, 0, b"first-and-more").status_code == 413
+        assert self.send_chunk(upload_id, 0, b"").status_code == 400
+        assert ChunkedUpload.objects.get(pk=upload_id).offset == 0
+
+    def test_uploads_are_only_visible_to_their_uploader(self):
+        upload_id = self.start_upload(10)
+        self.client.force_authenticate(self.other_user)
+
+        assert self.client.get(f"/social/uploads/{upload_id}/").status_code == 404
+        assert self.send_chunk(upload_id, 0, b"first").status_code == 404
+
+    def test_posts_reference_completed_uploads(self):
+        asset_id = self.upload(b"photo")
+
+        response = self.client.post(
+            "/social/posts/",
+            {"site": self.site.pk, "body": "New trees!", "media": [asset_id]},
+            format="json",
+        )
+
+        assert response.status_code == 201, response.content
+        post = Post.objects.get(pk=response.json()["id"])
+        assert list(post.media.values_list("pk", flat=True)) == [asset_id]
+        assert not ChunkedUpload.objects.exists()
+
+    def test_posts_cannot_reference_the_uploads_of_others(self):
+        asset_id = self.upload(b"photo")
+        self.client.force_authenticate(self.other_user)
+
+        response = self.client.post(
+            "/social/posts/",
+            {"site": self.site.pk, "body": "New trees!", "media": [asset_id]},
+            format="json",
+        )
+
+        assert response.status_code == 400
+        assert not Post.objects.exists()
+
+    def test_invalid_files_save_none_of_the_post_media(self):
+        response = self.client.post(
+            "/social/posts/",
+            {
+                "site": self.site.pk,
+                "body": "New trees!",
+                "media": [
+                    SimpleUploadedFile("photo.png", b"photo"),
+                    SimpleUploadedFile("empty.png", b""),
+                ],
+            },
+        )
+
+        assert response.status_code == 400
+        assert not Asset.objects.exists()
+        assert not Post.objects.exists()
+
+    def test_stale_uploads_are_deleted(self):
+        stale_asset_id = self.upload(b"photo")
+        self.start_upload(10)
+        ChunkedUpload.objects.update(created_at=timezone.now() - timedelta(days=2))
+        self.start_upload(10)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("delete_stale_uploads", stdout=StringIO())
+
+        assert ChunkedUpload.objects.count() == 1
+        assert not Asset.objects.filter(pk=stale_asset_id).exists()
@@ -0,0 +1,75 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase as DBTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from canopeum_backend.models import Comment, Post, User
+
+from .fixtures import create_post, create_roles, create_site, create_user
+
+
+class CommentCursorPaginationTests(DBTestCase):
+    user: User
+    post: Post
+    expected_ids: list[int]
+    client: APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        create_roles()
+        cls.user = create_user("user")
+        cls.post = create_post(create_site("Site"))
+        authors = [cls.user, create_user("other")]
+        now = timezone.now()
+        comments = [
+            Comment.objects.create(post=cls.post, user=authors[i % 2], body=f"Comment {i}")
+            for i in range(7)
+        ]
+        # Some comments share the same created_at to exercise the id tie-breaker
+        for i, comment in enumerate(comments):
+            comment.created_at = now - timedelta(minutes=i // 2)
+        Comment.objects.bulk_update(comments, ["created_at"])
+        cls.expected_ids = [
+            comment.pk
+            for comment in sorted(comments, key=lambda c: (c.created_at, c.pk), reverse=True)
+        ]
+        Comment.objects.create(post=create_post(create_site("Other site")), user=cls.user, body="")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.path = f"/social/posts/{self.post.pk}/comments/"
+
+    def test_cursor_pages_cover_the_comments_in_order(self):
+        comment_ids = []
+        response = self.client.get(self.path, {"size": 3})
+        while True:
+            assert response.status_code == 200
+            page = response.json()
+            comment_ids += [comment["id"] for comment in page["results"]]
+            if page["next"] is None:
+                break
+            response = self.client.get(page["next"])
+        assert comment_ids == self.expected_ids
+
+    def test_authors_are_joined_in_a_single_query(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.path, {"size": 10})
+
+        assert len(context.captured_queries) == 1
+        assert {comment["authorUsername"] for comment in response.json()["results"]} == {
+            "user",
+            "other",
+        }
+
+    def test_every_comment_without_a_size(self):
+        response = self.client.get(self.path)
+
+        assert [comment["id"] for comment in response.json()] == self.expected_ids
+
+    def test_invalid_size(self):
+        assert self.client.get(self.path, {"size": 0}).status_code == 400
+        assert self.client.get(self.path, {"size": "all"}).status_code == 400
@@ -0,0 +1,110 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase as DBTestCase
+from rest_framework.test import APIClient
+
+from canopeum_backend.models import FeedEntry, Site, SiteFollower, User
+
+from .fixtures import (
+    create_post,
+    create_roles,
+    create_site,
+    create_user,
+    enable_feed_fan_out_on_write,
+)
+
+
+class FollowedSitesFeedTests(DBTestCase):
+    user: User
+    followed_site: Site
+    other_followed_site: Site
+    unfollowed_site: Site
+    client: APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        create_roles()
+        cls.user = create_user("follower")
+        cls.followed_site = create_site("Followed")
+        cls.other_followed_site = create_site("Also followed")
+        cls.unfollowed_site = create_site("Unfollowed")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def follow(self, site: Site):
+        return self.client.post(f"/analytics/sites/{site.pk}/followers/")
+
+    def get_feed_post_ids(self, **params: int):
+        post_ids: list[int] = []
+        query: dict[str, int | str] = {"size": 2, "following": "true", **params}
+        response = self.client.get("/social/posts/", query)
+        while True:
+            assert response.status_code == 200, response.content
+            page = response.json()
+            post_ids += [post["id"] for post in page["results"]]
+            if page["next"] is None:
+                return post_ids
+            response = self.client.get(page["next"])
+
+    def create_posts(self):
+        posts = [
+            create_post(site)
+            for site in (self.followed_site, self.unfollowed_site, self.other_followed_site)
+            for _ in range(2)
+        ]
+        return [post.pk for post in reversed(posts) if post.site_id != self.unfollowed_site.pk]
+
+    def test_only_followed_sites_are_in_the_feed(self):
+        self.follow(self.followed_site)
+        self.follow(self.other_followed_site)
+        expected_post_ids = self.create_posts()
+
+        assert self.get_feed_post_ids() == expected_post_ids
+        assert self.get_feed_post_ids(siteId=self.followed_site.pk) == expected_post_ids[2:]
+
+    def test_posts_are_fanned_out_to_followers(self):
+        enable_feed_fan_out_on_write(self)
+        self.follow(self.followed_site)
+        expected_post_ids = self.create_posts()
+        # Posts from before the follow are added too
+        self.follow(self.other_followed_site)
+
+        assert self.get_feed_post_ids() == expected_post_ids
+        assert FeedEntry.objects.filter(user=self.user).count() == 4
+
+        self.client.delete(f"/analytics/sites/{self.other_followed_site.pk}/followers/")
+        assert self.get_feed_post_ids() == expected_post_ids[2:]
+
+    def test_feeds_are_rebuilt_when_enabling_the_fan_out(self):
+        self.follow(self.followed_site)
+        self.follow(self.other_followed_site)
+        expected_post_ids = self.create_posts()
+        assert not FeedEntry.objects.exists()
+
+        enable_feed_fan_out_on_write(self)
+        call_command("rebuild_feeds", stdout=StringIO())
+
+        assert self.get_feed_post_ids() == expected_post_ids
+
+    def test_duplicate_follows_keep_the_feed(self):
+        enable_feed_fan_out_on_write(self)
+        self.follow(self.followed_site)
+        SiteFollower.objects.create(user=self.user, site=self.followed_site)
+        expected_post_ids = self.create_posts()[2:]
+
+        duplicate_follow = SiteFollower.objects.filter(site=self.followed_site).first()
+        assert duplicate_follow is not None
+        duplicate_follow.delete()
+
+        assert self.get_feed_post_ids() == expected_post_ids
+
+    def test_anonymous_users_follow_nothing(self):
+        self.client.force_authenticate(None)
+
+        query: dict[str, int | str] = {"size": 2, "following": "true"}
+        response = self.client.get("/social/posts/", query)
+
+        assert response.status_code == 401
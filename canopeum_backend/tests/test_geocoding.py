@@ -0,0 +1,85 @@
+from decimal import Decimal
+from unittest import TestCase, mock
+
+from django.core.cache import cache
+from django.test import TestCase as DBTestCase
+
+from canopeum_backend.models import Coordinate
+from canopeum_backend.utils.geocoding_service import PENDING_ADDRESS, FakeGeocoder, GeocodingService
+
+from .fixtures import DeferredExecutor
+
+MONTREAL_DMS = ("45°30'06.1\"N", "73°34'02.3\"W")
+
+
+class GeocodingServiceTests(TestCase):
+    def setUp(self):
+        self.geocoder = FakeGeocoder()
+        self.executor = DeferredExecutor()
+        self.service = GeocodingService(self.geocoder, executor=self.executor, cache_size=2)
+
+    def test_nearby_coordinates_share_a_cached_address(self):
+        address = self.service.reverse_geocode(Decimal("45.501694"), Decimal("-73.567306"))
+        assert self.service.reverse_geocode(45.50171, -73.56728) == address
+        assert self.geocoder.lookups == [(45.5017, -73.5673)]
+
+    def test_least_recently_used_addresses_are_evicted(self):
+        self.service.reverse_geocode(45.5, -73.6)
+        self.service.reverse_geocode(46.8, -71.2)
+        self.service.reverse_geocode(45.5, -73.6)
+        self.service.reverse_geocode(43.7, -79.4)
+        assert self.service.get_cached_address(45.5, -73.6) is not None
+        assert self.service.get_cached_address(46.8, -71.2) is None
+
+    def test_background_failure_is_logged(self):
+        on_address = mock.Mock()
+        with mock.patch.object(self.geocoder, "reverse_geocode", side_effect=ConnectionError):
+            self.service.reverse_geocode_in_background(45.5, -73.6, on_address)
+            with self.assertLogs("canopeum_backend.utils.geocoding_service"):
+                self.executor.run_pending()
+        on_address.assert_not_called()
+
+    def test_shared_addresses_are_geocoded_once_across_processes(self):
+        cache.clear()
+        other_process_service = GeocodingService(self.geocoder, shared=True)
+        address = other_process_service.reverse_geocode(45.5, -73.6)
+
+        service = GeocodingService(self.geocoder, shared=True)
+
+        assert service.reverse_geocode(45.50001, -73.6) == address
+        assert self.geocoder.lookups == [(45.5, -73.6)]
+
+
+class CoordinateGeocodingTests(DBTestCase):
+    def setUp(self):
+        self.geocoder = FakeGeocoder()
+        self.executor = DeferredExecutor()
+        patcher = mock.patch(
+            "canopeum_backend.models.geocoding_service",
+            GeocodingService(self.geocoder, executor=self.executor),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_address_is_geocoded_synchronously(self):
+        coordinate = Coordinate.from_dms_lat_long(*MONTREAL_DMS, geocode_in_background=False)
+        assert coordinate.address == "Near 45.5017, -73.5673"
+        Coordinate.from_dms_lat_long(*MONTREAL_DMS, geocode_in_background=False)
+        assert len(self.geocoder.lookups) == 1
+
+    def test_pending_address_is_filled_in_the_background(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            coordinate = Coordinate.from_dms_lat_long(*MONTREAL_DMS, geocode_in_background=True)
+        assert coordinate.address == PENDING_ADDRESS
+        assert self.geocoder.lookups == []
+
+        self.executor.run_pending()
+        coordinate.refresh_from_db()
+        assert coordinate.address == "Near 45.5017, -73.5673"
+
+    def test_cached_address_is_not_left_pending(self):
+        Coordinate.from_dms_lat_long(*MONTREAL_DMS, geocode_in_background=False)
+        with self.captureOnCommitCallbacks() as callbacks:
+            coordinate = Coordinate.from_dms_lat_long(*MONTREAL_DMS, geocode_in_background=True)
+        assert coordinate.address == "Near 45.5017, -73.5673"
+        assert callbacks == []
@@ -0,0 +1,112 @@
+from io import BytesIO
+from unittest import TestCase, mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import InMemoryStorage, default_storage
+from django.test import TestCase as DBTestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIRequestFactory
+
+from canopeum_backend.models import Asset, ResourceVersion, site_version_key
+from canopeum_backend.serializers import AssetSerializer
+from canopeum_backend.utils.image_variant_service import (
+    FakeResizer,
+    ImageVariantService,
+    PillowResizer,
+    variant_name,
+)
+
+from .fixtures import DeferredExecutor, create_site
+
+IN_MEMORY_STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
+
+def create_png(width: int, height: int):
+    output = BytesIO()
+    Image.new("RGB", (width, height), "green").save(output, "PNG")
+    return output.getvalue()
+
+
+class PillowResizerTests(TestCase):
+    def test_only_downsizes(self):
+        variants = PillowResizer().resize(BytesIO(create_png(600, 300)), (160, 480, 1280))
+
+        assert list(variants) == [160, 480]
+        with Image.open(BytesIO(variants[160])) as variant:
+            assert (variant.format, variant.size) == ("WEBP", (160, 80))
+
+    def test_ignores_files_that_are_not_images(self):
+        assert PillowResizer().resize(BytesIO(b"%PDF-1.7"), (160,)) == {}
+
+
+class ImageVariantServiceTests(TestCase):
+    def setUp(self):
+        self.storage = InMemoryStorage()
+        self.executor = DeferredExecutor()
+        self.service = ImageVariantService(
+            FakeResizer(), storage=self.storage, executor=self.executor
+        )
+        self.storage.save("photo.png", ContentFile(b"photo"))
+
+    def test_variants_are_stored_next_to_each_other(self):
+        assert self.service.generate("photo.png") == [160, 480]
+        with self.storage.open(variant_name("photo.png", 160)) as variant:
+            assert variant.read() == b"160w photo"
+        assert not self.storage.exists(variant_name("photo.png", 1280))
+
+    def test_generating_again_replaces_the_variants(self):
+        self.service.generate("photo.png")
+        self.service.generate("photo.png")
+        _, files = self.storage.listdir("variants")
+        assert sorted(files) == ["photo.png-160w.webp", "photo.png-480w.webp"]
+
+    def test_background_failure_is_logged(self):
+        on_widths = mock.Mock()
+        self.service.generate_in_background("missing.png", on_widths)
+        with self.assertLogs("canopeum_backend.utils.image_variant_service"):
+            self.executor.run_pending()
+        on_widths.assert_not_called()
+
+
+@override_settings(STORAGES=IN_MEMORY_STORAGES)
+class AssetVariantsTests(DBTestCase):
+    def setUp(self):
+        self.executor = DeferredExecutor()
+        patcher = mock.patch(
+            "canopeum_backend.models.image_variant_service",
+            ImageVariantService(FakeResizer(), storage=default_storage, executor=self.executor),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_variants_are_generated_in_the_background_after_upload(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            asset = Asset.objects.create(asset=ContentFile(b"photo", name="photo.png"))
+        assert asset.variant_widths == []
+
+        self.executor.run_pending()
+        asset.refresh_from_db()
+        assert asset.variant_widths == [160, 480]
+
+    def test_sites_showing_the_image_are_invalidated(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            asset = Asset.objects.create(asset=ContentFile(b"photo", name="photo.png"))
+        site = create_site("Site")
+        site.image = asset
+        site.save()
+        version = ResourceVersion.objects.get(key=site_version_key(site.pk)).version
+
+        self.executor.run_pending()
+        assert ResourceVersion.objects.get(key=site_version_key(site.pk)).version == version + 1
+
+    def test_variant_urls_are_serialized(self):
+        asset = Asset.objects.create(asset="photo.png", variant_widths=[160, 480])
+        request = APIRequestFactory().get("/")
+
+        assert AssetSerializer(asset, context={"request": request}).data["variants"] == [
+            {"width": 160, "url": "http://testserver/media/variants/photo.png-160w.webp"},
+            {"width": 480, "url": "http://testserver/media/variants/photo.png-480w.webp"},
+        ]
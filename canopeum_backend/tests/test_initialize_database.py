@@ -0,0 +1,100 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase as DBTestCase, override_settings
+
+from canopeum_backend.management.commands.initialize_database import (
+    Command,
+    SyntheticDataGenerator,
+    batch_logo_file_names,
+    site_image_file_names,
+    to_dms,
+)
+from canopeum_backend.models import (
+    Asset,
+    Batch,
+    BatchSpecies,
+    Comment,
+    Coordinate,
+    Like,
+    Post,
+    Site,
+    Sitetreespecies,
+    User,
+)
+
+MEDIA_ROOT = tempfile.mkdtemp(prefix="canopeum-initialize-database-")
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class SyntheticDataGeneratorTests(DBTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        command = Command()
+        command.create_fertilizer_types()
+        command.create_mulch_layer_types()
+        command.create_tree_types()
+        command.create_site_types()
+        command.create_roles()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def generate(self, **kwargs: int):
+        sizes = {
+            "sites": 7,
+            "batches_per_site": 3,
+            "species_per_batch": 2,
+            "posts_per_site": 4,
+            "likes_per_post": 2,
+            "comments_per_post": 3,
+            "users": 5,
+            # Small enough to spread the sites over several groups
+            "chunk_size": 10,
+            **kwargs,
+        }
+        return SyntheticDataGenerator(**sizes).generate()
+
+    def test_generates_the_requested_cardinalities(self):
+        row_counts = self.generate()
+
+        assert Site.objects.count() == 7
+        assert Batch.objects.count() == 7 * 3
+        assert BatchSpecies.objects.count() == 7 * 3 * 2
+        assert Post.objects.count() == 7 * 4
+        assert Like.objects.count() == 7 * 4 * 2
+        assert Comment.objects.count() == 7 * 4 * 3
+        assert User.objects.count() == 5
+        assert row_counts["Post"] == 7 * 4
+        # Every batch species is part of its site's species
+        assert Sitetreespecies.objects.filter(site__batch__batchspecies__isnull=False).exists()
+
+    def test_post_counters_match_likes_and_comments(self):
+        self.generate()
+
+        output = StringIO()
+        call_command("recompute_post_counters", "--dry-run", stdout=output)
+        assert output.getvalue().startswith("0 post(s) with drifted counters")
+
+    def test_assets_share_the_stored_seeding_images(self):
+        self.generate()
+
+        stored_file_count = Asset.objects.values("asset").distinct().count()
+        assert stored_file_count <= len(site_image_file_names) + len(batch_logo_file_names)
+        assert Asset.objects.count() == 7 + 7 * 3
+
+    def test_generated_coordinates_match_their_dms(self):
+        self.generate(sites=1)
+
+        coordinate = Coordinate.objects.get()
+        assert coordinate.dms_latitude == to_dms(float(coordinate.dd_latitude or 0), "N", "S")
+        assert coordinate.dms_longitude == to_dms(float(coordinate.dd_longitude or 0), "E", "W")
+        assert coordinate.dms_longitude.endswith('"W')
+
+    def test_to_dms(self):
+        assert to_dms(45.5017, "N", "S") == "45°30'06.1\"N"
+        assert to_dms(-73.5673, "E", "W") == "73°34'02.3\"W"
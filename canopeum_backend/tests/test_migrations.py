@@ -1,5 +1,3 @@
-# This should preferably go in a test folder. But we only have a single test for now
-# Tests are auto-discovered as long as they're named test*.py
 from io import StringIO
 
 from django.core.management import call_command
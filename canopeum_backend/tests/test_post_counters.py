@@ -0,0 +1,82 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase as DBTestCase
+from rest_framework.test import APIClient
+
+from canopeum_backend.models import Comment, Like, Post, RoleName, User
+
+from .fixtures import create_post, create_roles, create_site, create_user
+
+
+class PostCountersTests(DBTestCase):
+    user: User
+    mega_admin: User
+    post: Post
+    client: APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        create_roles()
+        cls.user = create_user("user")
+        cls.mega_admin = create_user("admin", RoleName.MegaAdmin)
+        cls.post = create_post(create_site("Site"))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get_post(self):
+        return self.client.get(f"/social/posts/{self.post.pk}/").json()
+
+    def test_like_and_unlike_update_like_count(self):
+        self.client.post(f"/social/posts/{self.post.pk}/likes/")
+        assert self.get_post()["likeCount"] == 1
+
+        self.client.delete(f"/social/posts/{self.post.pk}/likes/")
+        assert self.get_post()["likeCount"] == 0
+
+    def test_comment_create_and_delete_update_comment_count(self):
+        response = self.client.post(
+            f"/social/posts/{self.post.pk}/comments/", {"body": "Great!"}, format="json"
+        )
+        assert self.get_post()["commentCount"] == 1
+
+        self.client.delete(f"/social/posts/{self.post.pk}/comments/{response.json()['id']}/")
+        assert self.get_post()["commentCount"] == 0
+
+    def test_deleting_twice_decrements_once(self):
+        like = Like.objects.create(user=self.user, post=self.post)
+        comment = Comment.objects.create(user=self.user, post=self.post, body="Great!")
+        stale_like = Like.objects.get(pk=like.pk)
+        stale_comment = Comment.objects.get(pk=comment.pk)
+
+        like.delete()
+        stale_like.delete()
+        comment.delete()
+        stale_comment.delete()
+
+        self.post.refresh_from_db()
+        assert (self.post.like_count, self.post.comment_count) == (0, 0)
+
+    def test_feed_reads_counters_without_counting(self):
+        Like.objects.create(user=self.user, post=self.post)
+        Comment.objects.create(user=self.user, post=self.post, body="Great!")
+        response = self.client.get("/social/posts/", {"page": 1, "size": 10})
+        (post,) = response.json()["results"]
+        assert (post["likeCount"], post["commentCount"]) == (1, 1)
+
+    def test_recompute_post_counters_fixes_drift(self):
+        Like.objects.create(user=self.user, post=self.post)
+        Like.objects.create(user=self.mega_admin, post=self.post)
+        Post.objects.filter(pk=self.post.pk).update(like_count=7, comment_count=3)
+
+        out = StringIO()
+        call_command("recompute_post_counters", "--dry-run", stdout=out)
+        assert "1 post(s) with drifted counters" in out.getvalue()
+        self.post.refresh_from_db()
+        assert self.post.like_count == 7
+
+        call_command("recompute_post_counters", stdout=StringIO())
+        self.post.refresh_from_db()
+        assert (self.post.like_count, self.post.comment_count) == (2, 0)
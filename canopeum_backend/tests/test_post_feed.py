@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase as DBTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from canopeum_backend.models import Post, User
+
+from .fixtures import create_post, create_roles, create_site, create_user
+
+
+class PostFeedCursorPaginationTests(DBTestCase):
+    user: User
+    expected_ids: list[int]
+    client: APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        create_roles()
+        cls.user = create_user("user")
+        site = create_site("Site")
+        now = timezone.now()
+        posts = [create_post(site, f"Post {i}") for i in range(7)]
+        # Some posts share the same created_at to exercise the id tie-breaker
+        for i, post in enumerate(posts):
+            post.created_at = now - timedelta(minutes=i // 2)
+        Post.objects.bulk_update(posts, ["created_at"])
+        cls.expected_ids = [
+            post.pk for post in sorted(posts, key=lambda p: (p.created_at, p.pk), reverse=True)
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_cursor_pages_cover_the_feed_in_order(self):
+        post_ids = []
+        response = self.client.get("/social/posts/", {"size": 3})
+        while True:
+            assert response.status_code == 200
+            page = response.json()
+            post_ids += [post["id"] for post in page["results"]]
+            if page["next"] is None:
+                break
+            response = self.client.get(page["next"])
+        assert post_ids == self.expected_ids
+
+    def test_cursor_pages_do_not_count(self):
+        first_page = self.client.get("/social/posts/", {"size": 3}).json()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(first_page["next"])
+        assert response.status_code == 200
+        assert "count" not in response.json()
+        assert not any("COUNT(" in query["sql"] for query in context.captured_queries)
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/social/posts/", {"size": "3", "cursor": "not-a-cursor"})
+        assert response.status_code == 404
+
+    def test_page_number_compatibility_mode(self):
+        response = self.client.get("/social/posts/", {"page": 2, "size": 3})
+        page = response.json()
+        assert page["count"] == 7
+        assert [post["id"] for post in page["results"]] == self.expected_ids[3:6]
+
+    def test_missing_size(self):
+        assert self.client.get("/social/posts/", {"page": 1}).status_code == 400
@@ -0,0 +1,65 @@
+from django.db import connection
+from django.test import TestCase as DBTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from canopeum_backend.models import Like, Post, User
+
+from .fixtures import create_post, create_roles, create_site, create_user
+
+
+class PostLikesTests(DBTestCase):
+    user: User
+    other_user: User
+    posts: list[Post]
+    client: APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        create_roles()
+        cls.user = create_user("user")
+        cls.other_user = create_user("other")
+        site = create_site("Site")
+        cls.posts = [create_post(site, f"Post {i}") for i in range(4)]
+        Like.objects.create(user=cls.user, post=cls.posts[1])
+        Like.objects.create(user=cls.user, post=cls.posts[3])
+        Like.objects.create(user=cls.other_user, post=cls.posts[0])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get_feed(self, size: int):
+        return self.client.get("/social/posts/", {"size": size}).json()["results"]
+
+    def test_has_liked_is_resolved_for_the_whole_page(self):
+        feed = self.get_feed(4)
+
+        assert {post["id"]: post["hasLiked"] for post in feed} == {
+            self.posts[0].pk: False,
+            self.posts[1].pk: True,
+            self.posts[2].pk: False,
+            self.posts[3].pk: True,
+        }
+        with CaptureQueriesContext(connection) as context:
+            self.get_feed(4)
+        like_queries = [
+            query["sql"]
+            for query in context.captured_queries
+            if 'FROM "canopeum_backend_like"' in query["sql"]
+        ]
+        assert len(like_queries) == 1
+        assert '"canopeum_backend_like"."post_id" IN' in like_queries[0]
+
+    def test_anonymous_users_liked_nothing(self):
+        self.client.force_authenticate(None)
+
+        assert not any(post["hasLiked"] for post in self.get_feed(4))
+
+    def test_posts_are_liked_once(self):
+        post = self.posts[2]
+        assert self.client.post(f"/social/posts/{post.pk}/likes/").status_code == 201
+
+        assert self.client.post(f"/social/posts/{post.pk}/likes/").status_code == 400
+        assert Like.objects.filter(user=self.user, post=post).count() == 1
+        assert Post.objects.get(pk=post.pk).like_count == 1
@@ -0,0 +1,148 @@
+from unittest import TestCase
+
+from django.test import TestCase as DBTestCase
+from rest_framework.test import APIClient
+
+from canopeum_backend.models import (
+    BatchDetails,
+    Fertilizertype,
+    RoleName,
+    Sitetreespecies,
+    Treetype,
+    User,
+)
+from canopeum_backend.reference_data import reference_data
+from canopeum_backend.serializers import SitetreespeciesSerializer
+from canopeum_backend.utils.versioned_registry import VersionedRegistry
+
+from .fixtures import (
+    create_batch,
+    create_fertilizer_type,
+    create_roles,
+    create_site,
+    create_tree_type,
+    create_user,
+)
+
+
+class ReferenceDataTests(DBTestCase):
+    mega_admin: User
+    maple: Treetype
+    oak: Treetype
+    manure: Fertilizertype
+
+    @classmethod
+    def setUpTestData(cls):
+        create_roles()
+        cls.mega_admin = create_user("admin", RoleName.MegaAdmin)
+        cls.maple = create_tree_type("Maple")
+        cls.oak = create_tree_type("Oak")
+        cls.manure = create_fertilizer_type("Manure")
+
+    def setUp(self):
+        # Rolled back rows of other tests don't send any signal
+        reference_data.invalidate()
+        self.client = APIClient()
+        self.client.force_authenticate(self.mega_admin)
+
+    def get_tree_species(self):
+        response = self.client.get("/analytics/tree-species")
+        assert response.status_code == 200, response.content
+        return response.json()
+
+    def test_lists_tree_species_from_memory(self):
+        self.get_tree_species()
+
+        # Only the ETag's versions are read
+        with self.assertNumQueries(1):
+            tree_species = self.get_tree_species()
+
+        assert tree_species == [
+            {"id": self.maple.pk, "en": "Maple", "fr": "Maple"},
+            {"id": self.oak.pk, "en": "Oak", "fr": "Oak"},
+        ]
+
+    def test_writes_invalidate_the_reference_data(self):
+        self.get_tree_species()
+
+        self.maple.name.en = "Sugar Maple"
+        self.maple.name.save()
+        create_tree_type("Birch")
+
+        assert [tree_type["en"] for tree_type in self.get_tree_species()] == [
+            "Sugar Maple",
+            "Oak",
+            "Birch",
+        ]
+
+    def test_batch_details_are_validated_from_memory(self):
+        batch = create_batch(create_site("Site"))
+        reference_data.get()
+
+        # Only the inserts
+        with self.assertNumQueries(2):
+            batch.set_details(
+                BatchDetails(fertilizer_ids=frozenset({self.manure.pk}), species={self.oak.pk: 3}),
+                created=True,
+            )
+
+        with self.assertRaises(Treetype.DoesNotExist):  # noqa: PT027 # Not using pytest
+            BatchDetails(seeds={0: 3}).validate()
+
+    def test_site_tree_species_are_translated(self):
+        site_tree_species = Sitetreespecies.objects.create(
+            site=create_site("Site"), tree_type=self.oak, quantity=3
+        )
+
+        assert SitetreespeciesSerializer(site_tree_species).data == {
+            "id": self.oak.pk,
+            "quantity": 3,
+            "en": "Oak",
+            "fr": "Oak",
+        }
+
+
+class VersionedRegistryTests(TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.version = 1
+        self.loads = 0
+        self.registry = VersionedRegistry(
+            self.load, lambda: self.version, revalidate_after=30, clock=lambda: self.now
+        )
+
+    def load(self):
+        self.loads += 1
+        return (self.loads, self.version)
+
+    def test_loads_once(self):
+        assert self.registry.get() == (1, 1)
+        assert self.registry.get() == (1, 1)
+
+    def test_only_reloads_when_the_version_changed(self):
+        self.registry.get()
+        self.now = 30
+        assert self.registry.get() == (1, 1)
+
+        self.version = 2
+        self.now = 45
+        # Revalidated at 30, still considered fresh
+        assert self.registry.get() == (1, 1)
+        self.now = 60
+        assert self.registry.get() == (2, 2)
+
+    def test_invalidate(self):
+        self.registry.get()
+        self.registry.invalidate()
+        assert self.registry.get() == (2, 1)
+
+    def test_load_started_before_an_invalidation_is_not_kept(self):
+        def invalidated_while_loading():
+            self.registry.invalidate()
+            return self.load()
+
+        self.registry.load = invalidated_while_loading
+        self.registry.get()
+        self.registry.load = self.load
+
+        assert self.registry.get() == (2, 1)
@@ -0,0 +1,145 @@
+from django.test import TestCase as DBTestCase
+from rest_framework.test import APIClient
+
+from canopeum_backend.authorization import invalidate_authorization_context
+from canopeum_backend.models import (
+    Coordinate,
+    ResourceVersion,
+    RoleName,
+    Site,
+    Treetype,
+    User,
+    Widget,
+    bump_resource_versions,
+)
+from canopeum_backend.utils.geocoding_service import PENDING_ADDRESS
+
+from .fixtures import create_batch, create_roles, create_site, create_tree_type, create_user
+
+
+class ConditionalGetTests(DBTestCase):
+    mega_admin: User
+    tree_type: Treetype
+    site: Site
+    private_site: Site
+    client: APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        create_roles()
+        cls.mega_admin = create_user("admin", RoleName.MegaAdmin)
+        cls.tree_type = create_tree_type("Maple")
+        cls.site = create_site("Site")
+        cls.private_site = create_site("Private", is_public=False)
+
+    def setUp(self):
+        invalidate_authorization_context(self.mega_admin.pk)
+        self.client = APIClient()
+        self.client.force_authenticate(self.mega_admin)
+
+    def get_etag(self, url: str):
+        response = self.client.get(url)
+        assert response.status_code == 200, response.content
+        assert response["Cache-Control"] == "private, no-cache"
+        return response["ETag"]
+
+    def assert_not_modified(self, url: str, if_none_match: str, *, expected: bool = True):
+        response = self.client.get(url, headers={"If-None-Match": if_none_match})
+        assert response.status_code == (304 if expected else 200)
+        if expected:
+            assert response["ETag"] in if_none_match or if_none_match == "*"
+            assert not response.content
+
+    def test_unchanged_tree_species_only_read_their_version(self):
+        etag = self.get_etag("/analytics/tree-species")
+
+        with self.assertNumQueries(1):
+            self.assert_not_modified("/analytics/tree-species", etag)
+
+    def test_renaming_a_tree_type_changes_the_etag(self):
+        etag = self.get_etag("/analytics/tree-species")
+
+        self.tree_type.name.en = "Sugar Maple"
+        self.tree_type.name.save()
+
+        self.assert_not_modified("/analytics/tree-species", etag, expected=False)
+
+    def test_etag_matching(self):
+        etag = self.get_etag("/analytics/site-types")
+
+        self.assert_not_modified("/analytics/site-types", f"W/{etag}")
+        self.assert_not_modified("/analytics/site-types", f'"outdated", {etag}')
+        self.assert_not_modified("/analytics/site-types", "*")
+        self.assert_not_modified("/analytics/site-types", '"outdated"', expected=False)
+
+    def test_site_social_detail_changes_with_its_widgets_and_batches(self):
+        url = f"/social/sites/{self.site.pk}/"
+        etag = self.get_etag(url)
+        self.assert_not_modified(url, etag)
+
+        widget = Widget.objects.create(site=self.site, title="Trees", body="10")
+        self.assert_not_modified(url, etag, expected=False)
+        etag = self.get_etag(url)
+
+        # Other sites don't change its version
+        create_batch(self.private_site)
+        self.assert_not_modified(url, etag)
+
+        widget.delete()
+        self.assert_not_modified(url, etag, expected=False)
+
+    def test_site_social_detail_changes_with_its_announcement(self):
+        url = f"/social/sites/{self.site.pk}/"
+        etag = self.get_etag(url)
+
+        response = self.client.patch(
+            f"/social/sites/{self.site.pk}/announcements/",
+            {"body": "Planting day", "link": "https://example.com"},
+            format="json",
+        )
+        assert response.status_code == 200
+
+        self.assert_not_modified(url, etag, expected=False)
+
+    def test_site_map_etag_depends_on_who_is_asking(self):
+        mega_admin_etag = self.get_etag("/map/sites/")
+        self.client.force_authenticate(None)
+        anonymous_etag = self.get_etag("/map/sites/")
+
+        assert mega_admin_etag != anonymous_etag
+        self.assert_not_modified("/map/sites/", anonymous_etag)
+        self.assert_not_modified("/map/sites/", mega_admin_etag, expected=False)
+
+    def test_site_map_only_changes_with_the_fields_it_shows(self):
+        etag = self.get_etag("/map/sites/")
+        site = Site.objects.get(pk=self.site.pk)
+
+        site.description = "Not on the map"
+        site.save()
+        self.assert_not_modified("/map/sites/", etag)
+
+        site.name = "Renamed"
+        site.save()
+        self.assert_not_modified("/map/sites/", etag, expected=False)
+        etag = self.get_etag("/map/sites/")
+
+        create_site("New site")
+        self.assert_not_modified("/map/sites/", etag, expected=False)
+
+    def test_site_map_changes_when_a_pending_address_is_filled(self):
+        coordinate = Coordinate.objects.get(site=self.site)
+        Coordinate.objects.filter(pk=coordinate.pk).update(address=PENDING_ADDRESS)
+        etag = self.get_etag("/map/sites/")
+
+        coordinate.fill_pending_address("Montréal")
+
+        self.assert_not_modified("/map/sites/", etag, expected=False)
+
+
+class BumpResourceVersionsTests(DBTestCase):
+    def test_creates_then_increments_versions(self):
+        bump_resource_versions("a")
+        bump_resource_versions("a", "b", "b")
+
+        versions = dict(ResourceVersion.objects.values_list("key", "version"))
+        assert versions == {"a": 2, "b": 1}
@@ -0,0 +1,99 @@
+from collections.abc import Callable
+from unittest import TestCase
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase as DBTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from canopeum_backend.models import Batch, RoleName, Site, User, site_namespace
+from canopeum_backend.utils.versioned_cache import (
+    CacheKey,
+    get_namespace_versions,
+    invalidate_namespaces,
+)
+
+from .fixtures import create_roles, create_tree_type, create_user, disable_weather_refresh
+from .test_site_summary import create_summarized_site
+
+
+class VersionedCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_values_are_loaded_once(self):
+        key: CacheKey[int] = CacheKey("site:1", "value", 60)
+        loaded_values = iter((1, 2))
+
+        assert key.get_or_set(lambda: next(loaded_values)) == 1
+        assert key.get_or_set(lambda: next(loaded_values)) == 1
+
+    def test_invalidating_a_namespace_misses_all_of_its_keys(self):
+        keys: list[CacheKey[str]] = [
+            CacheKey("site:1", "first", 60),
+            CacheKey("site:1", "second", 60),
+        ]
+        other_key: CacheKey[str] = CacheKey("site:2", "first", 60)
+        for key in (*keys, other_key):
+            key.get_or_set(lambda: "old")
+
+        invalidate_namespaces("site:1")
+
+        assert [key.get_or_set(lambda: "new") for key in keys] == ["new", "new"]
+        assert other_key.get_or_set(lambda: "new") == "old"
+
+    def test_invalidating_while_loading_wins(self):
+        key: CacheKey[str] = CacheKey("site:1", "value", 60)
+
+        def load_then_get_invalidated():
+            invalidate_namespaces("site:1")
+            return "stale"
+
+        assert key.get_or_set(load_then_get_invalidated) == "stale"
+        assert key.get_or_set(lambda: "fresh") == "fresh"
+
+
+class InvalidationHooksTests(DBTestCase):
+    mega_admin: User
+    site: Site
+    client: APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        create_roles()
+        cls.mega_admin = create_user("admin", RoleName.MegaAdmin)
+        cls.site = create_summarized_site("Site", [create_tree_type("Red Maple")], 2)
+
+    def setUp(self):
+        cache.clear()
+        disable_weather_refresh(self)
+        self.client = APIClient()
+        self.client.force_authenticate(self.mega_admin)
+
+    def get_survived_count(self):
+        (summary,) = self.client.get("/analytics/sites/summary").json()
+        return summary["survivedCount"]
+
+    def assert_invalidated_by(self, namespace: str, *writes: Callable[[], object]):
+        for write in writes:
+            version = get_namespace_versions([namespace])[namespace]
+            write()
+            assert get_namespace_versions([namespace])[namespace] != version
+
+    def test_summary_counts_are_cached_until_a_batch_changes(self):
+        assert self.get_survived_count() == 4
+        with CaptureQueriesContext(connection) as context:
+            assert self.get_survived_count() == 4
+        assert not any("SUM(" in query["sql"] for query in context.captured_queries)
+
+        batch = Batch.objects.filter(site=self.site).first()
+        assert batch is not None
+        batch.survived_count = 3
+        batch.save()
+
+        assert self.get_survived_count() == 5
+
+    def test_site_writes_invalidate_the_site(self):
+        batch = Batch.objects.filter(site=self.site)[0]
+        self.assert_invalidated_by(site_namespace(self.site.pk), self.site.save, batch.delete)
@@ -0,0 +1,115 @@
+from unittest import TestCase
+
+from django.test import TestCase as DBTestCase
+from rest_framework.test import APIClient
+
+from canopeum_backend.models import Coordinate, Site
+from canopeum_backend.site_map import MapViewport
+
+from .fixtures import create_site, create_site_type
+
+MONTREAL_BBOX = "-74,45,-73,46"
+
+
+def place_site(site: Site, latitude: float, longitude: float):
+    assert site.coordinate_id is not None
+    Coordinate.objects.filter(pk=site.coordinate_id).update(
+        dd_latitude=latitude, dd_longitude=longitude
+    )
+    return site
+
+
+class SiteMapViewportTests(DBTestCase):
+    montreal_site: Site
+    montreal_neighbour: Site
+    quebec_site: Site
+    fiji_site: Site
+    private_site: Site
+
+    @classmethod
+    def setUpTestData(cls):
+        site_type = create_site_type("Parc")
+        # Two sites a few hundred meters apart in Montréal, one in Quebec City
+        cls.montreal_site = place_site(create_site("Montréal", site_type), 45.5017, -73.5673)
+        cls.montreal_neighbour = place_site(
+            create_site("Montréal neighbour", site_type), 45.5040, -73.5650
+        )
+        cls.quebec_site = place_site(create_site("Québec", site_type), 46.8093, -71.3111)
+        cls.fiji_site = place_site(create_site("Fiji", site_type), -17.7134, 178.0650)
+        cls.private_site = place_site(
+            create_site("Private", site_type, is_public=False), 45.5017, -73.5673
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def get_map(self, **params: str):
+        response = self.client.get("/map/sites/", params)
+        assert response.status_code == 200, response.content
+        return response.json()
+
+    def test_without_viewport_lists_every_visible_site(self):
+        sites = self.get_map()
+
+        assert {site["id"] for site in sites} == {
+            self.montreal_site.pk,
+            self.montreal_neighbour.pk,
+            self.quebec_site.pk,
+            self.fiji_site.pk,
+        }
+
+    def test_only_returns_the_sites_inside_the_bbox(self):
+        viewport = self.get_map(bbox=MONTREAL_BBOX, zoom="15")
+
+        assert {site["id"] for site in viewport["sites"]} == {
+            self.montreal_site.pk,
+            self.montreal_neighbour.pk,
+        }
+        assert viewport["clusters"] == []
+        assert viewport["sites"][0]["coordinate"]["ddLatitude"] == 45.5017
+
+    def test_bbox_crossing_the_antimeridian(self):
+        viewport = self.get_map(bbox="170,-20,-170,-10", zoom="15")
+
+        assert [site["id"] for site in viewport["sites"]] == [self.fiji_site.pk]
+
+    def test_clusters_nearby_sites_at_low_zoom(self):
+        viewport = self.get_map(bbox="-80,40,-60,50", zoom="6")
+
+        # Montréal's sites share a cell, Québec is alone in its own
+        assert [site["id"] for site in viewport["sites"]] == [self.quebec_site.pk]
+        [cluster] = viewport["clusters"]
+        assert cluster["count"] == 2
+        assert 45.5017 < cluster["latitude"] < 45.5040
+        assert -73.5673 < cluster["longitude"] < -73.5650
+
+    def test_query_count_does_not_grow_with_sites(self):
+        # Versions, then sites
+        with self.assertNumQueries(2):
+            self.get_map(bbox=MONTREAL_BBOX, zoom="15")
+        # Versions, clusters, then lone sites
+        with self.assertNumQueries(3):
+            self.get_map(bbox="-80,40,-60,50", zoom="6")
+
+    def test_rejects_invalid_viewports(self):
+        for params in (
+            {"bbox": MONTREAL_BBOX},
+            {"zoom": "6"},
+            {"bbox": "-74,45,-73", "zoom": "6"},
+            {"bbox": "-74,46,-73,45", "zoom": "6"},
+            {"bbox": "-74,45,-73,nan", "zoom": "6"},
+            {"bbox": MONTREAL_BBOX, "zoom": "-1"},
+            {"bbox": MONTREAL_BBOX, "zoom": "99"},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get("/map/sites/", params)
+                assert response.status_code == 400
+
+
+class MapViewportTests(TestCase):
+    def test_parse(self):
+        assert MapViewport.parse("-74,45.5,-73,46", "7") == MapViewport(-74, 45.5, -73, 46, 7)
+
+    def test_cell_size_halves_with_every_zoom_level(self):
+        assert MapViewport(-180, -90, 180, 90, 0).cell_size == 90
+        assert MapViewport(-180, -90, 180, 90, 1).cell_size == 45
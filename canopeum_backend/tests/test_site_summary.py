@@ -0,0 +1,122 @@
+from decimal import Decimal
+
+from django.test import TestCase as DBTestCase
+from rest_framework.test import APIClient
+
+from canopeum_backend.models import RoleName, Site, Treetype, User
+
+from .fixtures import (
+    create_batch,
+    create_batch_species,
+    create_roles,
+    create_site,
+    create_site_admin,
+    create_site_species,
+    create_site_type,
+    create_tree_type,
+    create_user,
+    disable_weather_refresh,
+)
+
+
+def create_summarized_site(name: str, tree_types, multiplier: int):
+    site = create_site(name, create_site_type(f"{name} type"))
+    for tree_type in tree_types:
+        create_site_species(site, tree_type, 10 * multiplier)
+    for _ in range(multiplier):
+        batch = create_batch(site, survived_count=multiplier, total_propagation=2 * multiplier)
+        for tree_type in tree_types:
+            create_batch_species(batch, tree_type, multiplier)
+    return site
+
+
+class SiteSummaryCountsTests(DBTestCase):
+    tree_types: list[Treetype]
+    sites: list[Site]
+
+    @classmethod
+    def setUpTestData(cls):
+        create_roles()
+        cls.tree_types = [create_tree_type("Red Maple"), create_tree_type("White Birch")]
+        cls.sites = [create_summarized_site(f"Site {i}", cls.tree_types, i) for i in range(1, 4)]
+        create_site("Empty site")
+
+    def test_annotated_counts_match_per_site_queries(self):
+        annotated_sites = {site.pk: site for site in Site.objects.with_summary_counts()}
+        for site in Site.objects.all():
+            annotated_site = annotated_sites[site.pk]
+            with self.assertNumQueries(0):
+                annotated_counts = (
+                    annotated_site.get_plant_count(),
+                    annotated_site.get_sponsored_plant_count(),
+                    annotated_site.get_survived_count(),
+                    annotated_site.get_propagation_count(),
+                    annotated_site.get_sponsor_progress(),
+                )
+            assert annotated_counts == (
+                site.get_plant_count(),
+                site.get_sponsored_plant_count(),
+                site.get_survived_count(),
+                site.get_propagation_count(),
+                site.get_sponsor_progress(),
+            )
+
+    def test_annotated_counts_values(self):
+        site = Site.objects.with_summary_counts().get(pk=self.sites[2].pk)
+        # 2 tree types * 30 plants, 3 batches * 2 tree types * 3 plants
+        assert site.get_plant_count() == 60
+        assert site.get_sponsored_plant_count() == 18
+        assert site.get_survived_count() == 9
+        assert site.get_propagation_count() == 18
+        assert site.get_sponsor_progress() == 30
+
+        empty_site = Site.objects.with_summary_counts().get(name="Empty site")
+        assert empty_site.get_plant_count() == 0
+        assert empty_site.get_sponsor_progress() == 0
+
+    def test_summary_counts_are_a_single_query(self):
+        with self.assertNumQueries(1):
+            sites = list(Site.objects.with_summary_counts())
+            for site in sites:
+                site.get_sponsor_progress()
+                site.get_survived_count()
+                site.get_propagation_count()
+
+
+class SiteSummaryListAPIViewTests(DBTestCase):
+    mega_admin: User
+    forest_steward: User
+    tree_types: list[Treetype]
+    site: Site
+
+    @classmethod
+    def setUpTestData(cls):
+        create_roles()
+        cls.mega_admin = create_user("admin", RoleName.MegaAdmin)
+        cls.forest_steward = create_user("steward", RoleName.ForestSteward)
+        cls.tree_types = [create_tree_type("Red Maple")]
+        cls.site = create_summarized_site("Site", cls.tree_types, 2)
+        create_site_admin(cls.forest_steward, cls.site)
+
+    def setUp(self):
+        self.schedule_weather_refresh = disable_weather_refresh(self)
+
+    def test_summary_list_counts(self):
+        client = APIClient()
+        client.force_authenticate(self.mega_admin)
+        response = client.get("/analytics/sites/summary")
+        assert response.status_code == 200
+        (summary,) = response.json()
+        assert summary["plantCount"] == 20
+        assert summary["sponsorProgress"] == 20
+        assert summary["survivedCount"] == 4
+        assert summary["propagationCount"] == 8
+        assert summary["admins"][0]["user"]["adminSiteIds"] == [self.site.pk]
+
+    def test_summary_list_refreshes_the_sites_weather_in_bulk(self):
+        client = APIClient()
+        client.force_authenticate(self.mega_admin)
+        client.get("/analytics/sites/summary")
+        self.schedule_weather_refresh.assert_called_once_with({
+            self.site.pk: (Decimal("45.5017"), Decimal("-73.5673"))
+        })
@@ -0,0 +1,126 @@
+import json
+from unittest import mock
+
+from django.test import TestCase as DBTestCase
+from rest_framework.test import APIClient
+
+from canopeum_backend.models import (
+    Announcement,
+    Contact,
+    RoleName,
+    Site,
+    Sitetreespecies,
+    Sitetype,
+    Treetype,
+    User,
+)
+from canopeum_backend.utils.geocoding_service import FakeGeocoder, GeocodingService
+
+from .fixtures import (
+    DeferredExecutor,
+    create_roles,
+    create_site,
+    create_site_type,
+    create_tree_type,
+    create_user,
+)
+from .test_geocoding import MONTREAL_DMS
+
+QUEBEC_DMS = ("46°48'33.5\"N", "71°18'40.0\"W")
+
+
+class SiteUpdateTests(DBTestCase):
+    mega_admin: User
+    site_type: Sitetype
+    maple: Treetype
+    oak: Treetype
+    birch: Treetype
+    client: APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        create_roles()
+        cls.mega_admin = create_user("admin", RoleName.MegaAdmin)
+        cls.site_type = create_site_type("Parc")
+        cls.maple, cls.oak, cls.birch = (
+            create_tree_type(name) for name in ("Maple", "Oak", "Birch")
+        )
+
+    def setUp(self):
+        self.geocoder = FakeGeocoder()
+        patcher = mock.patch(
+            "canopeum_backend.models.geocoding_service",
+            GeocodingService(self.geocoder, executor=DeferredExecutor()),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = APIClient()
+        self.client.force_authenticate(self.mega_admin)
+
+        self.site = create_site("Site", self.site_type)
+        Site.objects.filter(pk=self.site.pk).update(
+            announcement=Announcement.objects.create(body="Planting day"),
+            contact=Contact.objects.create(email="site@example.com"),
+        )
+        self.site.refresh_from_db()
+        self.maple_species = Sitetreespecies.objects.create(
+            site=self.site, tree_type=self.maple, quantity=10
+        )
+        Sitetreespecies.objects.create(site=self.site, tree_type=self.oak, quantity=5)
+
+    def patch_site(self, species: dict[int, int], dms: tuple[str, str] = MONTREAL_DMS):
+        return self.client.patch(
+            f"/analytics/sites/{self.site.pk}/",
+            {
+                "name": "Site",
+                "siteType": self.site_type.pk,
+                "latitude": dms[0],
+                "longitude": dms[1],
+                "description": "New description",
+                "species": [
+                    json.dumps({"id": pk, "quantity": quantity}) for pk, quantity in species.items()
+                ],
+            },
+            format="multipart",
+        )
+
+    def test_editing_the_description_keeps_the_related_rows(self):
+        response = self.patch_site({self.maple.pk: 10, self.oak.pk: 5})
+
+        assert response.status_code == 200, response.content
+        site = Site.objects.get(pk=self.site.pk)
+        assert site.description == "New description"
+        assert (site.coordinate_id, site.announcement_id, site.contact_id) == (
+            self.site.coordinate_id,
+            self.site.announcement_id,
+            self.site.contact_id,
+        )
+        assert response.json()["announcement"]["body"] == "Planting day"
+        # Not moved, so not geocoded again
+        assert self.geocoder.lookups == []
+
+    def test_moving_the_site_geocodes_its_coordinate_again(self):
+        response = self.patch_site({}, QUEBEC_DMS)
+
+        assert response.status_code == 200, response.content
+        site = Site.objects.select_related("coordinate").get(pk=self.site.pk)
+        assert site.coordinate_id == self.site.coordinate_id
+        assert site.coordinate is not None
+        assert site.coordinate.address == "Near 46.8093, -71.3111"
+        assert len(self.geocoder.lookups) == 1
+
+    def test_species_are_diffed(self):
+        response = self.patch_site({self.maple.pk: 12, self.birch.pk: 3})
+
+        assert response.status_code == 200, response.content
+        species = dict(
+            Sitetreespecies.objects.filter(site=self.site).values_list("tree_type_id", "quantity")
+        )
+        assert species == {self.maple.pk: 12, self.birch.pk: 3}
+        assert Sitetreespecies.objects.filter(pk=self.maple_species.pk, quantity=12).exists()
+
+    def test_unknown_tree_types_are_rejected_before_writing(self):
+        response = self.patch_site({0: 1})
+
+        assert response.status_code == 400
+        assert Site.objects.get(pk=self.site.pk).description is None
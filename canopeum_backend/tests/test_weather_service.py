@@ -0,0 +1,156 @@
+from collections.abc import Sequence
+from decimal import Decimal
+from unittest import TestCase, mock
+
+from django.core.cache import cache
+
+from canopeum_backend.utils.weather_service import (
+    UNKNOWN_WEATHER,
+    GridCell,
+    OpenMeteoTransport,
+    Weather,
+    WeatherService,
+)
+
+from .fixtures import DeferredExecutor
+
+
+class StubTransport:
+    def __init__(self):
+        self.calls: list[list[GridCell]] = []
+        self.fail = False
+
+    @property
+    def fetched(self):
+        return [cell for cells in self.calls for cell in cells]
+
+    def fetch(self, cells: Sequence[GridCell]) -> list[Weather]:
+        if self.fail:
+            raise ConnectionError("Upstream is down")
+        self.calls.append(list(cells))
+        return [
+            Weather(temperature=len(self.calls), humidity=50, description="Clear sky")
+            for _ in cells
+        ]
+
+
+class WeatherServiceTests(TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.transport = StubTransport()
+        self.executor = DeferredExecutor()
+        self.service = WeatherService(
+            self.transport, ttl=60, executor=self.executor, clock=lambda: self.now
+        )
+
+    def test_miss_schedules_a_refresh_without_waiting(self):
+        assert self.service.get_cached_weather(45.5017, -73.5673) is None
+        assert self.transport.fetched == []
+        self.executor.run_pending()
+        assert self.transport.fetched == [(45.5, -73.6)]
+        assert self.service.get_cached_weather(45.5017, -73.5673) is not None
+
+    def test_refreshes_are_deduplicated(self):
+        self.service.get_cached_weather(45.5, -73.6)
+        self.service.get_cached_weather(45.5, -73.6)
+        assert len(self.executor.pending) == 1
+
+    def test_nearby_coordinates_share_a_grid_cell(self):
+        self.service.refresh(Decimal("45.5017"), Decimal("-73.5673"))
+        weather = self.service.get_cached_weather(45.52, -73.58)
+        assert weather is not None
+        assert weather["description"] == "Clear sky"
+        assert self.executor.pending == []
+        assert self.transport.fetched == [(45.5, -73.6)]
+
+    def test_stale_entries_are_served_while_refreshing(self):
+        self.service.refresh(45.5, -73.6)
+        self.now = 60
+        stale_weather = self.service.get_cached_weather(45.5, -73.6)
+        assert stale_weather is not None
+        assert stale_weather["temperature"] == 1
+
+        self.executor.run_pending()
+        fresh_weather = self.service.get_cached_weather(45.5, -73.6)
+        assert fresh_weather is not None
+        assert fresh_weather["temperature"] == 2
+
+    def test_fresh_entries_are_not_refreshed(self):
+        self.service.refresh(45.5, -73.6)
+        self.now = 59
+        self.service.get_cached_weather(45.5, -73.6)
+        assert self.executor.pending == []
+
+    def test_upstream_failure_keeps_the_stale_entry(self):
+        self.service.refresh(45.5, -73.6)
+        self.transport.fail = True
+        self.now = 60
+        self.service.get_cached_weather(45.5, -73.6)
+        with self.assertLogs("canopeum_backend.utils.weather_service"):
+            self.executor.run_pending()
+
+        weather = self.service.get_cached_weather(45.5, -73.6)
+        assert weather is not None
+        assert weather["temperature"] == 1
+        with self.assertLogs("canopeum_backend.utils.weather_service"):
+            assert self.service.refresh(45.5, -73.6) == UNKNOWN_WEATHER
+
+    def test_sites_weather_is_fetched_in_bulk_once_per_grid_cell(self):
+        weathers = self.service.get_weather_for_sites({
+            1: (Decimal("45.5017"), Decimal("-73.5673")),
+            2: (45.52, -73.58),
+            3: (46.81, -71.21),
+        })
+
+        assert self.transport.calls == [[(45.5, -73.6), (46.8, -71.2)]]
+        assert set(weathers) == {1, 2, 3}
+        assert weathers[1] == weathers[2]
+        assert weathers[3]["description"] == "Clear sky"
+
+    def test_sites_weather_only_fetches_stale_cells(self):
+        self.service.refresh(45.5, -73.6)
+        self.service.get_weather_for_sites({1: (45.5, -73.6), 2: (46.8, -71.2)})
+        assert self.transport.calls == [[(45.5, -73.6)], [(46.8, -71.2)]]
+
+    def test_sites_weather_is_refreshed_in_one_background_job(self):
+        self.service.schedule_refresh_for_sites({1: (45.5, -73.6), 2: (46.8, -71.2)})
+        self.service.schedule_refresh_for_sites({1: (45.5, -73.6)})
+        assert len(self.executor.pending) == 1
+        self.executor.run_pending()
+        assert self.transport.calls == [[(45.5, -73.6), (46.8, -71.2)]]
+
+    def test_sites_weather_upstream_failure_is_unknown(self):
+        self.transport.fail = True
+        with self.assertLogs("canopeum_backend.utils.weather_service"):
+            weathers = self.service.get_weather_for_sites({1: (45.5, -73.6)})
+        assert weathers == {1: UNKNOWN_WEATHER}
+
+    def test_shared_cells_are_fetched_once_across_processes(self):
+        cache.clear()
+        other_process_service = WeatherService(self.transport, ttl=60, shared=True)
+        other_process_service.refresh(45.5, -73.6)
+
+        service = WeatherService(self.transport, ttl=60, executor=self.executor, shared=True)
+        weathers = service.get_weather_for_sites({1: (45.5, -73.6), 2: (46.8, -71.2)})
+
+        assert self.transport.calls == [[(45.5, -73.6)], [(46.8, -71.2)]]
+        assert weathers[1]["temperature"] == 1
+
+
+class OpenMeteoTransportTests(TestCase):
+    def test_locations_are_chunked_into_multi_location_calls(self):
+        transport = OpenMeteoTransport(url="http://weather.test")
+        client = mock.Mock()
+        client.weather_api.side_effect = lambda _url, params: [
+            mock.Mock(**{"Current.return_value": None}) for _ in params["latitude"]
+        ]
+        transport._client = client  # noqa: SLF001
+        cells = [(float(latitude), 0.0) for latitude in range(5)]
+
+        with mock.patch("canopeum_backend.utils.weather_service.LOCATIONS_PER_REQUEST", 2):
+            weathers = transport.fetch(cells)
+
+        assert len(weathers) == 5
+        assert [
+            call.kwargs["params"]["latitude"] for call in client.weather_api.call_args_list
+        ] == [[0.0, 1.0], [2.0, 3.0], [4.0]]